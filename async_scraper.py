@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Asyncio scraping engine for PA Kennel Inspections
+Alternative to the thread workers in scraper.py: one event loop drives every
+search, details and PDF request, capped by a global and a per-host limit on
+in-flight requests. Parsing and database writes reuse scraper.py; details
+pages can be parsed in a process pool (parse_pool.py) to keep the loop free.
+"""
+
+import asyncio
+import time
+from typing import Optional
+from contextlib import asynccontextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+from rich.progress import (
+    Progress,
+    SpinnerColumn,
+    BarColumn,
+    TextColumn,
+    TimeElapsedColumn,
+    TaskProgressColumn,
+    MofNCompleteColumn
+)
+from rich.panel import Panel
+
+from scraper import (
+    BASE_URL,
+    SEARCH_PATH,
+    OUTPUT_DIR,
+    DB_FILE,
+    Stats,
+    KennelPage,
+    PageValidators,
+    console,
+    log,
+    init_database,
+    sanitize_filename,
+    search_form_data,
+    parse_search_results,
+    details_from_extract,
+    conditional_headers,
+    page_validators,
+    load_page_validators,
+    DBWriter,
+    AdaptiveRateLimiter,
+    parse_retry_after,
+    DOWNLOAD_RETRIES,
+    SEARCH_RETRIES,
+    COUNTIES,
+    is_valid_pdf,
+    part_path,
+    backoff_delay,
+    finish_download,
+    is_valid_pdf_bytes,
+    load_stored_inspections,
+    watch_crawl,
+)
+from pdf_store import PdfStore, STORE_DIR
+from parse_pool import ParsePool, StageClock
+from html_archive import get_archive, search_key
+from telemetry import get_telemetry, url_kind
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+
+def file_size(path: Path) -> int:
+    """Size of a file, 0 when it does not exist."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+class HostLimiter:
+    """Caps in-flight requests globally and per host, optionally paced by a rate limiter."""
+    def __init__(self, concurrency: int, per_host: int, rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        self.global_slots = asyncio.Semaphore(concurrency)
+        self.per_host = per_host
+        self.rate_limiter = rate_limiter
+        self.host_slots: dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+
+    def record(self, status: Optional[int], latency: float, retry_after: Optional[float] = None,
+               kind: str = ''):
+        if self.rate_limiter:
+            self.rate_limiter.record(status, latency, retry_after, kind)
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlsplit(url).netloc
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(self.per_host)
+
+        async with self.global_slots:
+            async with self.host_slots[host]:
+                if self.rate_limiter:
+                    wait = self.rate_limiter.reserve()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                self.in_flight += 1
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+
+
+class AsyncScraper:
+    """Crawls counties, kennel details pages and PDFs on a single event loop."""
+    def __init__(self, session: aiohttp.ClientSession, limiter: HostLimiter, stats: Stats,
+                 writer: DBWriter, base_url: str = BASE_URL, output_dir: Path = OUTPUT_DIR,
+                 store: Optional[PdfStore] = None, stored: set = None, parser: Optional[ParsePool] = None,
+                 clock: Optional[StageClock] = None):
+        self.session = session
+        self.parser = parser or ParsePool(0, clock)
+        self.clock = clock
+        self.store = store
+        self.stored = stored or set()
+        self.limiter = limiter
+        self.stats = stats
+        self.writer = writer
+        self.base_url = base_url
+        self.output_dir = output_dir
+        self.timeout = aiohttp.ClientTimeout(total=30)
+        self.pdf_timeout = aiohttp.ClientTimeout(total=60)
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, timeout: aiohttp.ClientTimeout, attempt: int = 0, **kwargs):
+        """Send a request inside a limiter slot and report its outcome to the rate limiter.
+        
+        Telemetry times the request until the caller is done with the
+        response, body included, and sizes it by Content-Length; `attempt`
+        is the retry number it reports.
+        """
+        async with self.limiter.slot(url):
+            telemetry = get_telemetry()
+            kind = telemetry.request_started(url) if telemetry else None
+            started = time.monotonic()
+            status, nbytes, error = None, 0, None
+            try:
+                async with self.session.request(method, url, timeout=timeout, **kwargs) as response:
+                    status, nbytes = response.status, response.content_length or 0
+                    self.limiter.record(response.status, time.monotonic() - started,
+                                        parse_retry_after(response.headers.get('Retry-After')), url_kind(url))
+                    yield response
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = type(e).__name__
+                if status is None:
+                    self.limiter.record(None, time.monotonic() - started, kind=url_kind(url))
+                raise
+            finally:
+                if self.clock is not None:
+                    self.clock.add('fetch', time.monotonic() - started)
+                if telemetry:
+                    telemetry.request_finished(kind, method, url, status, nbytes, time.monotonic() - started, error,
+                                               attempt)
+
+    async def search_county(self, county_id: int, retries: int = SEARCH_RETRIES) -> Optional[list[dict]]:
+        """Async counterpart of scraper.search_county: retried, None once every attempt failed."""
+        url = self.base_url + SEARCH_PATH
+        error = None
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(backoff_delay(attempt - 1))
+            try:
+                async with self.request('POST', url, self.timeout, attempt, data=search_form_data(county_id)) as response:
+                    response.raise_for_status()
+                    html = await response.text()
+            except aiohttp.ClientResponseError as e:
+                error = e
+                if 400 <= e.status < 500 and e.status not in (408, 429):
+                    break
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                continue
+
+            archive = get_archive()
+            if archive is not None:
+                await asyncio.to_thread(archive.put, 'search', search_key(url, county_id), url, html.encode('utf-8'),
+                                        {'county_id': county_id})
+            kennels = parse_search_results(html, county_id, self.base_url)
+            telemetry = get_telemetry()
+            if telemetry:
+                telemetry.event('county_searched', county_id=county_id, kennels=len(kennels))
+            return kennels
+
+        log(f"  [red]✗[/red] Error searching {COUNTIES.get(county_id, f'County_{county_id}')}: "
+            f"{str(error) or type(error).__name__}")
+        telemetry = get_telemetry()
+        if telemetry:
+            telemetry.event('county_search_failed', county_id=county_id)
+        return None
+
+    async def fetch_kennel_page(self, details_url: str, county_name: str,
+                                validators: Optional[PageValidators] = None,
+                                retries: int = DOWNLOAD_RETRIES) -> Optional[KennelPage]:
+        """Async counterpart of scraper.fetch_kennel_page, including revalidation.
+
+        Failed requests are retried with backoff, as the thread engine's
+        frontier retries a kennel; None once every attempt failed.
+        """
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(backoff_delay(attempt - 1))
+            try:
+                async with self.request('GET', details_url, self.timeout, attempt,
+                                        headers=conditional_headers(validators)) as response:
+                    if response.status == 304:
+                        return KennelPage(None, [], validators, unchanged=True)
+                    if 400 <= response.status < 500 and response.status not in (408, 429):
+                        return None
+                    response.raise_for_status()
+                    body = await response.read()
+                    headers = response.headers
+                    encoding = response.charset
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                continue
+        else:
+            return None
+        archive = get_archive()
+        if archive is not None:
+            await asyncio.to_thread(archive.put, 'details', details_url, details_url, body, {'county_name': county_name})
+
+        new_validators = page_validators(headers, body)
+        if validators and validators.content_hash == new_validators.content_hash:
+            return KennelPage(None, [], new_validators, unchanged=True)
+
+        extract = await self.parser.details_async(body, encoding)
+        details, pdfs = details_from_extract(extract, details_url, county_name, self.base_url)
+        return KennelPage(details, pdfs, new_validators)
+
+    async def download_pdf(self, url: str, filepath: Path, retries: int = DOWNLOAD_RETRIES) -> bool:
+        """Async counterpart of scraper.download_pdf: .part file, Range resume, retries.
+
+        Every file operation runs in a worker thread, so a slow disk never
+        stalls the other requests in flight.
+        """
+        await asyncio.to_thread(filepath.parent.mkdir, parents=True, exist_ok=True)
+        part = part_path(filepath)
+
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(backoff_delay(attempt - 1))
+
+            offset = await asyncio.to_thread(file_size, part)
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+            try:
+                async with self.request('GET', url, self.pdf_timeout, attempt, headers=headers) as response:
+                    if response.status == 416:
+                        if await asyncio.to_thread(finish_download, part, filepath):
+                            return True
+                        continue
+                    if 400 <= response.status < 500 and response.status not in (408, 429):
+                        return False
+                    response.raise_for_status()
+
+                    mode = 'ab' if offset and response.status == 206 else 'wb'
+                    f = await asyncio.to_thread(open, part, mode)
+                    try:
+                        async for chunk in response.content.iter_chunked(65536):
+                            await asyncio.to_thread(f.write, chunk)
+                    finally:
+                        await asyncio.to_thread(f.close)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                continue
+
+            if await asyncio.to_thread(finish_download, part, filepath):
+                return True
+
+        return False
+
+    async def fetch_pdf_bytes(self, url: str, retries: int = DOWNLOAD_RETRIES) -> Optional[bytes]:
+        """Async counterpart of scraper.fetch_pdf_bytes."""
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(backoff_delay(attempt - 1))
+            try:
+                async with self.request('GET', url, self.pdf_timeout, attempt) as response:
+                    if 400 <= response.status < 500 and response.status not in (408, 429):
+                        return None
+                    response.raise_for_status()
+                    data = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                continue
+            if is_valid_pdf_bytes(data):
+                return data
+        return None
+
+    async def store_one(self, kennel: dict, pdf: dict, filepath: Path) -> bool:
+        """Fetch one listed PDF into the pack store unless it is already there."""
+        if (kennel['kennel_id'], pdf['date']) in self.stored:
+            self.stats.add(skipped=1)
+            return True
+
+        # A valid file left by the original tree layout is packed instead of downloaded again
+        # (file reads go to a thread so they never stall the event loop)
+        data = None
+        if await asyncio.to_thread(is_valid_pdf, filepath):
+            data = await asyncio.to_thread(filepath.read_bytes)
+        if data is None:
+            data = await self.fetch_pdf_bytes(pdf['url'])
+        pdf_sha256 = await asyncio.to_thread(self.store.put, data) if data else None
+        self.stats.add(downloaded=1 if data else 0, failed=0 if data else 1)
+        self.writer.save_inspection(kennel['kennel_id'], pdf['date'], pdf['url'], "", bool(data), pdf_sha256)
+        return bool(data)
+
+    async def download_one(self, kennel: dict, pdf: dict, kennel_dir: Path) -> bool:
+        """Download one listed PDF unless it is already on disk; False on failure."""
+        date_clean = pdf['date'].replace('/', '-')
+        filepath = kennel_dir / f"inspection_{date_clean}.pdf"
+        if self.store is not None:
+            return await self.store_one(kennel, pdf, filepath)
+
+        if await asyncio.to_thread(is_valid_pdf, filepath):
+            self.writer.save_inspection(kennel['kennel_id'], pdf['date'], pdf['url'], str(filepath), True)
+            self.stats.add(skipped=1)
+            return True
+
+        downloaded = await self.download_pdf(pdf['url'], filepath)
+        if downloaded:
+            self.stats.add(downloaded=1)
+        else:
+            self.stats.add(failed=1)
+        self.writer.save_inspection(kennel['kennel_id'], pdf['date'], pdf['url'], str(filepath), downloaded)
+        return downloaded
+
+    async def process_kennel(self, kennel: dict, validators: Optional[PageValidators] = None):
+        """Async counterpart of scraper.process_kennel."""
+        county_name = kennel['county_name']
+
+        page = await self.fetch_kennel_page(kennel['details_url'], county_name, validators)
+        if page is None:
+            self.stats.add(kennels=1, kennels_failed=1)
+            return
+        if page.unchanged:
+            self.writer.mark_checked(kennel['kennel_id'])
+            self.stats.add(kennels=1, unchanged=1)
+            return
+
+        if page.details:
+            self.writer.save_kennel(page.details)
+
+        county_dir = self.output_dir / sanitize_filename(county_name)
+        kennel_folder = f"{sanitize_filename(kennel['license_number'])}_{sanitize_filename(kennel['name'])}"
+        kennel_dir = county_dir / kennel_folder
+        if self.store is None:
+            await asyncio.to_thread(kennel_dir.mkdir, parents=True, exist_ok=True)
+
+        results = await asyncio.gather(*(self.download_one(kennel, pdf, kennel_dir) for pdf in page.pdfs))
+        if all(results):
+            self.writer.save_validators(kennel['kennel_id'], page.validators)
+        self.stats.add(kennels=1)
+
+
+async def crawl(writer: DBWriter, start_county: int = 1, end_county: int = 69, concurrency: int = 100,
+                per_host: int = 20, rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                base_url: str = BASE_URL, output_dir: Path = OUTPUT_DIR, progress: Progress = None,
+                known_validators: dict[int, PageValidators] = None, store: Optional[PdfStore] = None,
+                stored: set = None, parser: Optional[ParsePool] = None,
+                clock: Optional[StageClock] = None, stats: Optional[Stats] = None) -> Stats:
+    """Run both crawl phases on the current event loop and return the stats.
+    
+    Database rows go to `writer`, a started DBWriter that the caller closes.
+    Without a rate limiter only the concurrency caps bound the crawl. With a
+    store, PDFs are packed into it (skipping the `stored` ones) instead of
+    written under `output_dir`. Details pages are parsed by `parser` (on the
+    loop without one), and request and parse time go to `clock`. Counts go to
+    `stats` (a new Stats without one).
+    """
+    stats = stats or Stats()
+    known_validators = known_validators or {}
+    limiter = HostLimiter(concurrency, per_host, rate_limiter)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        scraper = AsyncScraper(session, limiter, stats, writer, base_url, output_dir, store, stored, parser, clock)
+
+        task = progress.add_task("[bold magenta]Processing Kennels[/bold magenta]", total=0) if progress else None
+        kennel_tasks = []
+
+        telemetry = get_telemetry()
+        if telemetry:
+            watch_crawl(telemetry, stats, rate_limiter, writer,
+                        queues=lambda: {'kennels_pending': sum(1 for t in list(kennel_tasks) if not t.done())},
+                        clock=clock)
+
+        async def run(kennel: dict):
+            # Like the thread engine's workers: one kennel's failure is logged, never fatal to the crawl
+            try:
+                await scraper.process_kennel(kennel, known_validators.get(kennel['kennel_id']))
+            except Exception as e:
+                log(f"[red]Worker error on {kennel['details_url']}: {e}[/red]")
+                stats.add(kennels=1, kennels_failed=1)
+            if progress:
+                rate = f", {rate_limiter.rate:.0f} req/s" if rate_limiter else ""
+                progress.update(task, description=f"[bold magenta]Processing Kennels[/bold magenta] [dim]{limiter.in_flight} in flight{rate}[/dim]")
+                progress.advance(task)
+
+        # Phase 1 feeds Phase 2: each county's kennels are scheduled as soon as its search returns
+        async def search_and_dispatch(county_id: int):
+            kennels = await scraper.search_county(county_id)
+            if kennels is None:
+                stats.add(counties_failed=1)
+                return
+            if progress:
+                progress.update(task, total=progress.tasks[task].total + len(kennels))
+            kennel_tasks.extend(asyncio.create_task(run(kennel)) for kennel in kennels)
+
+        await asyncio.gather(*(
+            search_and_dispatch(county_id)
+            for county_id in range(start_county, end_county + 1)
+        ))
+        await asyncio.gather(*kennel_tasks)
+
+    return stats
+
+
+def scrape_all_async(concurrency: int = 100, per_host: int = 20, start_county: int = 1,
+                     end_county: int = 69, delay: float = 0.5, base_url: str = BASE_URL,
+                     delta: bool = False, db_batch: int = 500, max_rate: float = 10.0,
+                     pdf_store: str = 'pack', parse_workers: int = 0):
+    """Main entry point for the asyncio engine, mirroring scrape_all_parallel.
+    
+    With `parse_workers`, details pages are parsed in that many processes
+    instead of on the event loop.
+    """
+    rate_limiter = AdaptiveRateLimiter(rate=1 / delay if delay > 0 else max_rate, max_rate=max_rate,
+                                       increase=1.0, burst=per_host)
+    init_database()
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    known_validators = load_page_validators() if delta else {}
+    store = PdfStore() if pdf_store == 'pack' else None
+    stored = load_stored_inspections() if store is not None else set()
+    clock = StageClock()
+    clock.set_slots('fetch', concurrency)
+    if not parse_workers:
+        clock.set_slots('parse', 1)
+    parser = ParsePool(parse_workers, clock)
+
+    total_counties = end_county - start_county + 1
+
+    console.print()
+    console.print(Panel.fit(
+        "[bold cyan]🐕 PA Kennel Inspection Scraper (async)[/bold cyan]\n"
+        f"Counties: {start_county}-{end_county} ({total_counties} total)\n"
+        f"Concurrency: {concurrency} | Per host: {per_host} | Max rate: {max_rate}/s"
+        + (f" | Parse processes: {parse_workers}" if parse_workers else "")
+        + (f"\nDelta: revalidating {len(known_validators)} known kennel pages" if delta else ""),
+        border_style="cyan"
+    ))
+    console.print("\n[bold cyan]Phase 1+2:[/bold cyan] Searching counties and processing kennels concurrently...\n")
+
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(bar_width=40),
+        TaskProgressColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=console,
+        expand=False
+    )
+
+    telemetry = get_telemetry()
+    if telemetry:
+        telemetry.event('crawl_start', engine='async', start_county=start_county, end_county=end_county,
+                        concurrency=concurrency, per_host=per_host)
+    started = time.monotonic()
+    with progress:
+        writer_task = progress.add_task("[blue]💾 DB writer[/blue]", total=None)
+        stats = Stats()
+        writer = DBWriter(batch_size=db_batch, stats=stats, on_flush=lambda w: progress.update(
+            writer_task, description=f"[blue]💾 DB writer[/blue] [dim]{w.depth} queued, {w.rows_written} written[/dim]"
+        )).start()
+        try:
+            stats = asyncio.run(crawl(writer, start_county, end_county, concurrency, per_host, rate_limiter,
+                                      base_url, OUTPUT_DIR, progress, known_validators, store, stored,
+                                      parser, clock, stats))
+        finally:
+            writer.close()
+            parser.close()
+            if store is not None:
+                store.close()
+    elapsed = time.monotonic() - started
+    if telemetry:
+        telemetry.event('crawl_end', engine='async', seconds=round(elapsed, 3), **stats.snapshot(),
+                        rows=writer.row_counts,
+                        utilisation={k: round(v, 3) for k, v in clock.utilisation().items()})
+
+    console.print()
+    console.print(Panel(
+        f"[bold green]✓ Scraping Complete![/bold green]\n\n"
+        f"📊 [bold]Statistics:[/bold]\n"
+        f"   Kennels processed: [cyan]{stats.kennels_found}[/cyan]\n"
+        f"   PDFs downloaded: [green]{stats.pdfs_downloaded}[/green]\n"
+        f"   PDFs skipped (existing): [yellow]{stats.pdfs_skipped}[/yellow]\n"
+        f"   PDFs failed: [red]{stats.pdfs_failed}[/red]\n"
+        f"   Pages unchanged: [dim]{stats.pages_unchanged}[/dim]\n"
+        f"   Gave up after retries: [red]{stats.counties_failed}[/red] county searches, "
+        f"[red]{stats.kennels_failed}[/red] kennels\n"
+        f"   Rows: [dim]{writer.rows_summary()}[/dim]\n"
+        f"   Elapsed: [cyan]{elapsed:.1f}s[/cyan]\n\n"
+        f"💾 [bold]Output:[/bold]\n"
+        f"   Database: [cyan]{DB_FILE}[/cyan]\n"
+        f"   PDFs: [cyan]{STORE_DIR if store is not None else OUTPUT_DIR}/[/cyan]",
+        title="[bold]Summary[/bold]",
+        border_style="green"
+    ))
+    console.print(clock.table())
+    return stats
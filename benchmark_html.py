@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+HTML parsing microbenchmark
+Times each html_backends backend on the saved search results page and on a
+synthetic details page, or on real pages from the HTML archive
+(html_archive.py), checks they extract the same values, and reports
+pages/sec and rows/sec.
+"""
+
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+import html_backends
+from standin_server import SyntheticSite
+
+console = Console()
+
+SEARCH_FIXTURE = Path("PA Department of Agriculture - Kennel Inspections Public Search.html")
+
+
+def time_backend(fn, html, min_seconds: float) -> tuple[int, float]:
+    """Run fn(html) repeatedly for at least min_seconds; returns (iterations, elapsed)."""
+    fn(html)  # warm up
+    iterations = 0
+    started = time.perf_counter()
+    while True:
+        fn(html)
+        iterations += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return iterations, elapsed
+
+
+def run(pages: dict, min_seconds: float) -> list[dict]:
+    """Time every backend on each page; a page may also be a list of pages (an archive sample)."""
+    results = []
+    for page, (html, kind) in pages.items():
+        htmls = html if isinstance(html, list) else [html]
+        reference = None
+        for backend, fns in html_backends.BACKENDS.items():
+            parse = fns[0] if kind == 'search' else fns[1]
+            fn = lambda pages, parse=parse: [parse(h) for h in pages]
+            output = fn(htmls)
+            rows = sum(len(o) if kind == 'search' else len(o.pdf_links) for o in output)
+            if reference is None:
+                reference = output
+            iterations, elapsed = time_backend(fn, htmls, min_seconds)
+            results.append({
+                'page': page,
+                'backend': backend,
+                'rows': rows,
+                'pages_per_sec': iterations * len(htmls) / elapsed,
+                'rows_per_sec': iterations * rows / elapsed,
+                'matches': output == reference,
+            })
+    return results
+
+
+def archive_pages(archive_dir: Path, limit: int) -> dict:
+    """Up to `limit` of the newest archived search and details pages, by kind."""
+    from html_archive import HtmlArchive
+
+    archive = HtmlArchive(archive_dir)
+    pages = {}
+    for kind in ('search', 'details'):
+        htmls = []
+        for snapshot in archive.latest(kind):
+            htmls.append(snapshot['body'].decode('utf-8', errors='replace'))
+            if len(htmls) >= limit:
+                break
+        if htmls:
+            pages[f'archive {kind} ({len(htmls)})'] = (htmls, kind)
+    archive.close()
+    return pages
+
+
+def results_table(results: list[dict]) -> Table:
+    table = Table(title="HTML parsing backends")
+    table.add_column("Page", style="cyan")
+    table.add_column("Backend", style="cyan")
+    table.add_column("Rows", justify="right")
+    table.add_column("Pages/s", justify="right", style="green")
+    table.add_column("Rows/s", justify="right", style="green")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Same output", justify="center")
+
+    baseline = {r['page']: r['pages_per_sec'] for r in results if r['backend'] == 'bs4'}
+    for r in results:
+        table.add_row(
+            r['page'],
+            r['backend'],
+            f"{r['rows']:,}",
+            f"{r['pages_per_sec']:,.1f}",
+            f"{r['rows_per_sec']:,.0f}",
+            f"{r['pages_per_sec'] / baseline[r['page']]:.1f}x",
+            "[green]✓[/green]" if r['matches'] else "[red]✗[/red]"
+        )
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Compare HTML parsing backends on saved and synthetic pages')
+    parser.add_argument('--search-html', type=Path, default=SEARCH_FIXTURE,
+                        help='Saved search results page (default: the fixture in the repo root)')
+    parser.add_argument('--pdfs-per-kennel', type=int, default=20,
+                        help='Inspection rows on the synthetic details page (default: 20)')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Minimum time per measurement (default: 1.0)')
+    parser.add_argument('--archive', type=Path, metavar='DIR',
+                        help='Time real pages from this HTML archive (e.g. html_archive) instead')
+    parser.add_argument('--sample', type=int, default=200, help='Archived pages per kind to time (default: 200)')
+
+    args = parser.parse_args()
+
+    pages = {'details': (SyntheticSite(pdfs_per_kennel=args.pdfs_per_kennel).details_page(10001), 'details')}
+    if args.archive:
+        pages = archive_pages(args.archive, args.sample)
+        if not pages:
+            console.print(f"[red]No archived pages in {args.archive}[/red]")
+            sys.exit(1)
+    elif args.search_html.exists():
+        pages = {'search': (args.search_html.read_text(encoding='utf-8', errors='replace'), 'search'), **pages}
+    else:
+        console.print(f"[yellow]{args.search_html} not found; timing the details page only[/yellow]")
+
+    console.print(f"[dim]Backends: {', '.join(html_backends.BACKENDS)}[/dim]")
+    results = run(pages, args.seconds)
+    console.print(results_table(results))
+
+    if not all(r['matches'] for r in results):
+        console.print("[red]Backends disagree on at least one page[/red]")
+        sys.exit(1)
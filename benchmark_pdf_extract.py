@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+PDF text extraction benchmark
+Times each pdf_parser extractor (a pdftotext process per PDF, or the poppler
+bindings in-process) on a sample of stored PDFs at one or more worker counts,
+bypassing the text cache, checks they produce the same text and parse to the
+same InspectionData, and reports files/sec.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+import pdf_parser
+from pdf_store import PdfStore
+from text_cache import prewarm_items, DB_FILE, INSPECTIONS_DIR
+
+console = Console()
+
+CHUNK_SIZE = 8  # PDFs per task sent to a worker
+
+
+def sample_pdfs(source: str, limit: int, db_path: str = DB_FILE, directory: Path = INSPECTIONS_DIR) -> list[bytes]:
+    """Bytes of up to `limit` stored PDFs (read once, not timed)."""
+    store = None
+    pdfs = []
+    for kind, key in prewarm_items(source, db_path, directory)[:limit]:
+        if kind == 'blob':
+            if store is None:
+                store = PdfStore(db_path=db_path, readonly=True)
+            data = store.get(key)
+        else:
+            data = Path(key).read_bytes()
+        if data:
+            pdfs.append(data)
+    if store is not None:
+        store.close()
+    return pdfs
+
+
+def _extract_chunk(extractor: str, chunk: list[bytes]) -> int:
+    return sum(1 for pdf_bytes in chunk if pdf_parser.extract_layout(pdf_bytes, extractor))
+
+
+def _ready(_) -> int:
+    return os.getpid()
+
+
+def time_extractor(extractor: str, pdfs: list[bytes], workers: int) -> tuple[int, float]:
+    """Extract every PDF with `workers` processes; returns (PDFs with text, elapsed).
+
+    Worker processes are started before the clock does, as the import's
+    long-lived pool would be.
+    """
+    if workers == 1:
+        started = time.perf_counter()
+        return _extract_chunk(extractor, pdfs), time.perf_counter() - started
+    chunks = [pdfs[i:i + CHUNK_SIZE] for i in range(0, len(pdfs), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_ready, range(workers)))
+        started = time.perf_counter()
+        extracted = sum(executor.map(_extract_chunk, [extractor] * len(chunks), chunks))
+        return extracted, time.perf_counter() - started
+
+
+def differences(pdfs: list[bytes], extractor: str) -> tuple[int, int]:
+    """(PDFs whose text differs, PDFs whose parsed data differs) between `extractor` and pdftotext."""
+    texts = others = 0
+    for pdf_bytes in pdfs:
+        reference = pdf_parser.extract_layout(pdf_bytes, 'pdftotext')
+        text = pdf_parser.extract_layout(pdf_bytes, extractor)
+        if text != reference:
+            texts += 1
+            if pdf_parser.parse_inspection_text(text) != pdf_parser.parse_inspection_text(reference):
+                others += 1
+    return texts, others
+
+
+def run(pdfs: list[bytes], worker_counts: list[int]) -> list[dict]:
+    """Time every extractor at each worker count."""
+    results = []
+    for name in pdf_parser.EXTRACTORS:
+        different = differences(pdfs, name) if name != 'pdftotext' else (0, 0)
+        for workers in worker_counts:
+            extracted, elapsed = time_extractor(name, pdfs, workers)
+            results.append({
+                'extractor': name,
+                'workers': workers,
+                'pdfs': len(pdfs),
+                'extracted': extracted,
+                'files_per_sec': len(pdfs) / elapsed,
+                'different_text': different[0],
+                'different_data': different[1],
+            })
+    return results
+
+
+def results_table(results: list[dict]) -> Table:
+    table = Table(title="PDF text extractors")
+    table.add_column("Extractor", style="cyan")
+    table.add_column("Workers", justify="right")
+    table.add_column("PDFs", justify="right")
+    table.add_column("Files/s", justify="right", style="green")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Same text", justify="center")
+    table.add_column("Same data", justify="center")
+
+    baseline = {r['workers']: r['files_per_sec'] for r in results if r['extractor'] == 'pdftotext'}
+
+    def same(count: int) -> str:
+        return "[green]✓[/green]" if not count else f"[red]✗ {count}[/red]"
+
+    for r in results:
+        table.add_row(
+            r['extractor'],
+            str(r['workers']),
+            f"{r['extracted']:,}/{r['pdfs']:,}",
+            f"{r['files_per_sec']:,.1f}",
+            f"{r['files_per_sec'] / baseline[r['workers']]:.1f}x" if baseline.get(r['workers']) else "-",
+            same(r['different_text']),
+            same(r['different_data'])
+        )
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Compare the pdftotext and poppler PDF text extractors')
+    parser.add_argument('--source', choices=['pack', 'tree', 'both'], default='both',
+                        help='PDFs from the pack store, the kennel_inspections/ tree or both (default: both)')
+    parser.add_argument('--sample', type=int, default=200, help='PDFs to extract (default: 200)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help='Worker process counts to time, one run each (default: 1 and CPU count)')
+    parser.add_argument('--db', default=DB_FILE, help=f'Database with the PDF store index (default: {DB_FILE})')
+
+    args = parser.parse_args()
+
+    if pdf_parser.pdftotext_version() is None:
+        console.print("[red]pdftotext is not installed; it is the baseline[/red]")
+        sys.exit(1)
+    if 'poppler' not in pdf_parser.EXTRACTORS:
+        console.print("[yellow]poppler bindings not installed (pip install python-poppler); "
+                      "timing pdftotext only[/yellow]")
+
+    pdfs = sample_pdfs(args.source, args.sample, args.db)
+    if not pdfs:
+        console.print("[red]No stored PDFs found[/red]")
+        sys.exit(1)
+
+    results = run(pdfs, sorted(set(args.workers)))
+    console.print(results_table(results))
+    if any(r['different_data'] for r in results):
+        console.print("[red]Extractors disagree on the data of at least one report[/red]")
+        sys.exit(1)
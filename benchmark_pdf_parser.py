@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Inspection report parser microbenchmark
+Times the single-pass and legacy pdf_parser parsers on synthetic report text,
+or on the text of real PDFs, checks they extract the same InspectionData, and
+reports reports/sec and lines/sec.
+"""
+
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+import pdf_parser
+from standin_server import SyntheticSite
+
+console = Console()
+
+
+def time_parser(parse, texts: list[str], min_seconds: float) -> tuple[int, float]:
+    """Parse every text repeatedly for at least min_seconds; returns (iterations, elapsed)."""
+    for text in texts:
+        parse(text)  # warm up
+    iterations = 0
+    started = time.perf_counter()
+    while True:
+        for text in texts:
+            parse(text)
+        iterations += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return iterations, elapsed
+
+
+def synthetic_texts(items: int, reports: int) -> list[str]:
+    site = SyntheticSite()
+    return [site.report_text(10001 + n, n + 1, items=items) for n in range(reports)]
+
+
+def pdf_texts(directory: Path, limit: int) -> list[str]:
+    """pdftotext output of up to `limit` inspection PDFs under `directory` (extracted once, not timed)."""
+    texts = []
+    for pdf in sorted(directory.glob("**/inspection_*.pdf")):
+        text = pdf_parser.extract_pdf_text(str(pdf))
+        if text:
+            texts.append(text)
+            if len(texts) >= limit:
+                break
+    return texts
+
+
+def mismatches(texts: list[str]) -> list[tuple[int, str]]:
+    """(text index, field) of every field where the parsers disagree."""
+    found = []
+    for index, text in enumerate(texts):
+        outputs = [parse(text) for parse in pdf_parser.PARSERS.values()]
+        reference = outputs[0]
+        for output in outputs[1:]:
+            if output != reference:
+                fields = [f for f in vars(reference) if getattr(reference, f) != getattr(output, f)] \
+                    if reference is not None and output is not None else ['(no result)']
+                found.extend((index, f) for f in fields)
+    return found
+
+
+def run(corpora: dict, min_seconds: float) -> list[dict]:
+    """Time every parser on each corpus (a list of report texts)."""
+    results = []
+    for corpus, texts in corpora.items():
+        lines = sum(text.count('\n') + 1 for text in texts)
+        disagreements = mismatches(texts)
+        for name, parse in pdf_parser.PARSERS.items():
+            iterations, elapsed = time_parser(parse, texts, min_seconds)
+            results.append({
+                'corpus': corpus,
+                'parser': name,
+                'reports': len(texts),
+                'reports_per_sec': iterations * len(texts) / elapsed,
+                'lines_per_sec': iterations * lines / elapsed,
+                'mismatches': disagreements,
+            })
+    return results
+
+
+def results_table(results: list[dict]) -> Table:
+    table = Table(title="Inspection report parsers")
+    table.add_column("Corpus", style="cyan")
+    table.add_column("Parser", style="cyan")
+    table.add_column("Reports", justify="right")
+    table.add_column("Reports/s", justify="right", style="green")
+    table.add_column("Lines/s", justify="right", style="green")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Same output", justify="center")
+
+    baseline = {r['corpus']: r['reports_per_sec'] for r in results if r['parser'] == 'legacy'}
+    for r in results:
+        table.add_row(
+            r['corpus'],
+            r['parser'],
+            f"{r['reports']:,}",
+            f"{r['reports_per_sec']:,.0f}",
+            f"{r['lines_per_sec']:,.0f}",
+            f"{r['reports_per_sec'] / baseline[r['corpus']]:.1f}x",
+            "[green]✓[/green]" if not r['mismatches'] else f"[red]✗ {len(r['mismatches'])}[/red]"
+        )
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Compare the single-pass and legacy inspection report parsers')
+    parser.add_argument('--items', type=int, nargs='+', default=[30, 120],
+                        help='Inspection items per synthetic report, one corpus each (default: 30 120)')
+    parser.add_argument('--reports', type=int, default=20, help='Synthetic reports per corpus (default: 20)')
+    parser.add_argument('--pdfs', type=Path, metavar='DIR',
+                        help='Time the text of real inspection PDFs under DIR instead (needs pdftotext)')
+    parser.add_argument('--sample', type=int, default=200, help='PDFs to take from --pdfs (default: 200)')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Minimum time per measurement (default: 1.0)')
+
+    args = parser.parse_args()
+
+    if args.pdfs:
+        texts = pdf_texts(args.pdfs, args.sample)
+        if not texts:
+            console.print(f"[red]No readable inspection PDFs under {args.pdfs}[/red]")
+            sys.exit(1)
+        corpora = {f'{args.pdfs} ({len(texts)})': texts}
+    else:
+        corpora = {f'synthetic, {items} items': synthetic_texts(items, args.reports) for items in args.items}
+
+    results = run(corpora, args.seconds)
+    console.print(results_table(results))
+
+    disagreements = [m for r in results if r['parser'] == 'legacy' for m in r['mismatches']]
+    if disagreements:
+        for index, field in disagreements[:20]:
+            console.print(f"  [red]✗[/red] report {index}: {field}")
+        console.print("[red]Parsers disagree on at least one report[/red]")
+        sys.exit(1)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the scraper engines
+Starts the local stand-in server, runs each engine against it in a scratch
+directory and reports kennels/sec, PDFs/sec and bytes/sec.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+
+from rich.table import Table
+
+from scraper import console, scrape_all_parallel, use_transport
+from standin_server import StandInServer, SyntheticSite
+from transport import Cassette, forwarding
+
+ENGINES = ('threads', 'async')
+
+
+def run_engine(engine: str, server: StandInServer, args) -> dict:
+    """Crawl counties start..end through the stand-in server; returns the measured rates."""
+    workdir = tempfile.mkdtemp(prefix=f"scraper-bench-{engine}-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    server.reset_counters()
+    console.quiet = not args.verbose
+    try:
+        started = time.perf_counter()
+        if engine == 'threads':
+            use_transport(forwarding(server.url))
+            try:
+                stats = scrape_all_parallel(
+                    num_workers=args.workers,
+                    start_county=args.start,
+                    end_county=args.end,
+                    delay=0,
+                    max_rate=args.max_rate
+                )
+            finally:
+                use_transport(None)
+        else:
+            from async_scraper import scrape_all_async
+            stats = scrape_all_async(
+                concurrency=args.concurrency,
+                per_host=args.per_host,
+                start_county=args.start,
+                end_county=args.end,
+                base_url=server.url,
+                delay=0,
+                max_rate=args.max_rate
+            )
+        elapsed = time.perf_counter() - started
+    finally:
+        console.quiet = False
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'engine': engine,
+        'seconds': elapsed,
+        'kennels': stats.kennels_found,
+        'pdfs': stats.pdfs_downloaded,
+        'failed': stats.pdfs_failed,
+        'kennels_failed': stats.kennels_failed,
+        'counties_failed': stats.counties_failed,
+        'requests': server.requests,
+        'errors': server.errors,
+        'bytes': server.bytes_sent,
+    }
+
+
+def results_table(results: list[dict]) -> Table:
+    table = Table(title="Scraper throughput (stand-in server)")
+    table.add_column("Engine", style="cyan")
+    table.add_column("Time", justify="right")
+    table.add_column("Searches failed", justify="right", style="red")
+    table.add_column("Kennels", justify="right")
+    table.add_column("Kennels/s", justify="right", style="green")
+    table.add_column("PDFs", justify="right")
+    table.add_column("PDFs/s", justify="right", style="green")
+    table.add_column("MB/s", justify="right", style="green")
+    table.add_column("Requests", justify="right")
+    table.add_column("Injected errors", justify="right", style="red")
+
+    for r in results:
+        seconds = r['seconds'] or 1e-9
+        table.add_row(
+            r['engine'],
+            f"{r['seconds']:.2f}s",
+            f"{r['counties_failed']:,}",
+            f"{r['kennels']:,}" + (f" ({r['kennels_failed']} failed)" if r['kennels_failed'] else ""),
+            f"{r['kennels'] / seconds:,.1f}",
+            f"{r['pdfs']:,}" + (f" ({r['failed']} failed)" if r['failed'] else ""),
+            f"{r['pdfs'] / seconds:,.1f}",
+            f"{r['bytes'] / seconds / 1_000_000:,.2f}",
+            f"{r['requests']:,}",
+            f"{r['errors']:,}"
+        )
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark scraper engines against a local stand-in server')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES),
+                        help='Engines to run (default: all)')
+    parser.add_argument('--start', type=int, default=1, help='First county ID to crawl (default: 1)')
+    parser.add_argument('--end', type=int, default=3, help='Last county ID to crawl (default: 3)')
+    parser.add_argument('--cassette', help='Replay a recorded cassette instead of the synthetic site')
+    parser.add_argument('--kennels-per-county', type=int, default=20, help='Synthetic kennels per county (default: 20)')
+    parser.add_argument('--pdfs-per-kennel', type=int, default=3, help='Synthetic PDFs per kennel (default: 3)')
+    parser.add_argument('--pdf-size', type=int, default=50_000, help='Synthetic PDF size in bytes (default: 50000)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per response in seconds (default: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 503 (default: 0)')
+    parser.add_argument('--workers', type=int, default=5, help='Threads engine workers (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=100, help='Async engine in-flight limit (default: 100)')
+    parser.add_argument('--per-host', type=int, default=20, help='Async engine per-host limit (default: 20)')
+    parser.add_argument('--max-rate', type=float, default=1000.0,
+                        help='Ceiling for the adaptive request rate (default: 1000, effectively unpaced)')
+    parser.add_argument('--verbose', action='store_true', help='Show the engines\' own progress output')
+
+    args = parser.parse_args()
+
+    server = StandInServer(
+        site=SyntheticSite(args.kennels_per_county, args.pdfs_per_kennel, args.pdf_size),
+        cassette=Cassette(args.cassette) if args.cassette else None,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate
+    )
+    server.start()
+    console.print(f"[dim]Stand-in server on {server.url}, latency {args.latency}s, "
+                  f"error rate {args.error_rate:.0%}, source: {args.cassette or 'synthetic'}[/dim]")
+
+    results = []
+    try:
+        for engine in args.engines:
+            console.print(f"[cyan]Running {engine} engine...[/cyan]")
+            results.append(run_engine(engine, server, args))
+    finally:
+        server.stop()
+
+    console.print(results_table(results))
@@ -6,6 +6,7 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+from pdf_store import store_in_use
 
 DB_FILE = "kennel_inspections.db"
 INSPECTIONS_DIR = Path("kennel_inspections")
@@ -13,13 +14,17 @@ INSPECTIONS_DIR = Path("kennel_inspections")
 console = Console()
 
 def main():
-    # Count total PDFs
-    total_pdfs = len(list(INSPECTIONS_DIR.glob("**/inspection_*.pdf")))
-    
     # Get database stats
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
     
+    # Count total PDFs (from the pack store index when in use, no directory walk)
+    if store_in_use(DB_FILE):
+        cursor.execute("SELECT COUNT(*) FROM inspections WHERE pdf_sha256 IS NOT NULL")
+        total_pdfs = cursor.fetchone()[0]
+    else:
+        total_pdfs = len(list(INSPECTIONS_DIR.glob("**/inspection_*.pdf")))
+    
     # Count imported inspections
     cursor.execute("SELECT COUNT(*) FROM inspections WHERE inspector_name IS NOT NULL")
     imported = cursor.fetchone()[0]
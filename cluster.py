@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+Multi-node crawling for the PA Kennel Inspection scraper
+Splits a crawl into shards - one per county, or kennel_id hash buckets - that
+nodes lease from a coordinator. The coordinator is a SQLite file, used
+directly by nodes that can reach it or served over HTTP to other machines.
+Leases carry heartbeats and expire, so a shard held by a dead node is handed
+out again. Each node crawls into its own directory (database and PDFs); the
+merge step folds the node outputs into kennel_inspections.db.
+"""
+
+import os
+import time
+import shutil
+import socket
+import sqlite3
+from pathlib import Path
+from threading import Lock, Thread, Event
+from typing import Optional
+
+import requests
+
+COORDINATOR_DB = "crawl_shards.db"
+NODES_DIR = Path("nodes")
+DEFAULT_PORT = 8766
+LEASE_SECONDS = 120
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ShardCoordinator:
+    """Shard table in SQLite; safe for several threads and processes on one machine."""
+    def __init__(self, db_path: str = COORDINATOR_DB, lease_seconds: float = LEASE_SECONDS, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS shards (
+                shard_id INTEGER PRIMARY KEY,
+                start_county INTEGER NOT NULL,
+                end_county INTEGER NOT NULL,
+                hash_index INTEGER,
+                hash_count INTEGER,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                owner TEXT,
+                lease_until REAL,
+                heartbeat_at REAL,
+                kennels INTEGER DEFAULT 0,
+                pdfs INTEGER DEFAULT 0,
+                pdfs_failed INTEGER DEFAULT 0,
+                started_at REAL,
+                finished_at REAL
+            )
+        ''')
+
+    def _transaction(self, fn):
+        """Run fn(cursor) inside one IMMEDIATE transaction (safe across processes)."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(cursor)
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+            return result
+
+    def plan(self, start_county: int = 1, end_county: int = 69, by: str = 'county', shards: int = 0) -> int:
+        """Replace the shard table with a new crawl plan; returns the number of shards.
+
+        `by='county'` makes one shard per county. `by='hash'` makes `shards`
+        buckets of kennel_id over the whole county range, which balances
+        better (county sizes vary a lot) at the cost of every node searching
+        every county.
+        """
+        if by == 'county':
+            rows = [(c, c, None, None) for c in range(start_county, end_county + 1)]
+        else:
+            rows = [(start_county, end_county, i, shards) for i in range(shards)]
+
+        def run(cursor):
+            cursor.execute('DELETE FROM shards')
+            cursor.executemany('''
+                INSERT INTO shards (start_county, end_county, hash_index, hash_count) VALUES (?, ?, ?, ?)
+            ''', rows)
+        self._transaction(run)
+        return len(rows)
+
+    def lease(self, owner: str) -> Optional[dict]:
+        """Lease the next pending (or abandoned) shard, or None when none is available."""
+        now = time.time()
+
+        def run(cursor):
+            # Abandoned shards that are out of attempts are given up on
+            cursor.execute('''
+                UPDATE shards SET state = ?, owner = NULL, lease_until = NULL
+                WHERE state = ? AND lease_until < ? AND attempts >= ?
+            ''', (FAILED, LEASED, now, self.max_attempts))
+            cursor.execute('''
+                SELECT * FROM shards
+                WHERE state = ? OR (state = ? AND lease_until < ?)
+                ORDER BY shard_id LIMIT 1
+            ''', (PENDING, LEASED, now))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            shard = dict(zip([c[0] for c in cursor.description], row))
+            cursor.execute('''
+                UPDATE shards SET state = ?, attempts = attempts + 1, owner = ?, lease_until = ?,
+                    heartbeat_at = ?, started_at = ?
+                WHERE shard_id = ?
+            ''', (LEASED, owner, now + self.lease_seconds, now, now, shard['shard_id']))
+            shard.update(state=LEASED, attempts=shard['attempts'] + 1, owner=owner,
+                         lease_until=now + self.lease_seconds, lease_seconds=self.lease_seconds)
+            return shard
+
+        return self._transaction(run)
+
+    def heartbeat(self, shard_id: int, owner: str) -> bool:
+        """Extend a lease; False if `owner` no longer holds it."""
+        now = time.time()
+
+        def run(cursor):
+            cursor.execute('''
+                UPDATE shards SET lease_until = ?, heartbeat_at = ?
+                WHERE shard_id = ? AND owner = ? AND state = ?
+            ''', (now + self.lease_seconds, now, shard_id, owner, LEASED))
+            return cursor.rowcount == 1
+        return self._transaction(run)
+
+    def complete(self, shard_id: int, owner: str, kennels: int = 0, pdfs: int = 0, pdfs_failed: int = 0) -> bool:
+        """Mark a shard done; False if the lease had already passed to another node."""
+        def run(cursor):
+            cursor.execute('''
+                UPDATE shards SET state = ?, owner = ?, lease_until = NULL, finished_at = ?,
+                    kennels = ?, pdfs = ?, pdfs_failed = ?
+                WHERE shard_id = ? AND owner = ? AND state = ?
+            ''', (DONE, owner, time.time(), kennels, pdfs, pdfs_failed, shard_id, owner, LEASED))
+            return cursor.rowcount == 1
+        return self._transaction(run)
+
+    def fail(self, shard_id: int, owner: str):
+        """Give a shard back after an error; it fails for good once out of attempts."""
+        def run(cursor):
+            cursor.execute('''
+                UPDATE shards SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    owner = NULL, lease_until = NULL
+                WHERE shard_id = ? AND owner = ? AND state = ?
+            ''', (self.max_attempts, FAILED, PENDING, shard_id, owner, LEASED))
+        self._transaction(run)
+
+    def outstanding(self) -> int:
+        """Shards not yet done or failed (pending or held by some node)."""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT COUNT(*) FROM shards WHERE state IN (?, ?)', (PENDING, LEASED)
+            ).fetchone()[0]
+
+    def status(self) -> list[dict]:
+        with self.lock:
+            cursor = self.conn.execute('SELECT * FROM shards ORDER BY shard_id')
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        self.conn.close()
+
+
+class RemoteCoordinator:
+    """Client for a coordinator served with `cluster.py serve`; same methods as ShardCoordinator."""
+    def __init__(self, url: str, timeout: float = 30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _call(self, name: str, **params):
+        response = self.session.post(f"{self.url}/{name}", json=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['result']
+
+    def lease(self, owner: str) -> Optional[dict]:
+        return self._call('lease', owner=owner)
+
+    def heartbeat(self, shard_id: int, owner: str) -> bool:
+        return self._call('heartbeat', shard_id=shard_id, owner=owner)
+
+    def complete(self, shard_id: int, owner: str, kennels: int = 0, pdfs: int = 0, pdfs_failed: int = 0) -> bool:
+        return self._call('complete', shard_id=shard_id, owner=owner, kennels=kennels, pdfs=pdfs,
+                          pdfs_failed=pdfs_failed)
+
+    def fail(self, shard_id: int, owner: str):
+        return self._call('fail', shard_id=shard_id, owner=owner)
+
+    def outstanding(self) -> int:
+        return self._call('outstanding')
+
+    def status(self) -> list[dict]:
+        return self._call('status')
+
+    def close(self):
+        self.session.close()
+
+
+def connect(target: str, lease_seconds: float = LEASE_SECONDS):
+    """Coordinator for an http(s):// URL or a path to the shard database."""
+    if target.startswith(('http://', 'https://')):
+        return RemoteCoordinator(target)
+    return ShardCoordinator(target, lease_seconds)
+
+
+def coordinator_app(coordinator: ShardCoordinator):
+    """aiohttp application exposing a ShardCoordinator as POST /<method> with JSON arguments."""
+    from aiohttp import web
+
+    methods = ('lease', 'heartbeat', 'complete', 'fail', 'outstanding', 'status')
+
+    async def handle(request: web.Request) -> web.Response:
+        name = request.match_info['method']
+        if name not in methods:
+            return web.json_response({'error': f"unknown method {name}"}, status=404)
+        params = await request.json() if request.can_read_body else {}
+        try:
+            result = getattr(coordinator, name)(**params)
+        except TypeError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        return web.json_response({'result': result})
+
+    app = web.Application()
+    app.router.add_route('*', '/{method}', handle)
+    return app
+
+
+class Heartbeat:
+    """Background thread that keeps a shard lease alive while the node crawls it."""
+    def __init__(self, coordinator, shard: dict, owner: str):
+        self.coordinator = coordinator
+        self.shard = shard
+        self.owner = owner
+        self.interval = shard['lease_seconds'] / 3
+        self.lost = False
+        self._stop = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                held = self.coordinator.heartbeat(self.shard['shard_id'], self.owner)
+            except requests.RequestException:
+                continue  # coordinator briefly unreachable; the lease has slack for this
+            if not held and not self.lost:
+                self.lost = True
+                from scraper import log
+                log(f"[yellow]Lost the lease on shard {self.shard['shard_id']}; "
+                    f"finishing it anyway (the merge keeps one copy)[/yellow]")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def shard_label(shard: dict) -> str:
+    counties = (f"county {shard['start_county']}" if shard['start_county'] == shard['end_county']
+                else f"counties {shard['start_county']}-{shard['end_county']}")
+    if shard['hash_count']:
+        return f"{counties}, kennel_id % {shard['hash_count']} == {shard['hash_index']}"
+    return counties
+
+
+def run_node(coordinator, node_id: str, workdir: Path, num_workers: int = 5, delay: float = 0.5,
+             max_rate: float = 10.0, pipeline: bool = False, archive: bool = True, pdf_store: str = 'pack',
+             poll: float = 5.0) -> dict:
+    """Lease and crawl shards until the coordinator has none left; returns totals for this node.
+
+    The crawl runs inside `workdir`, which holds this node's own database and
+    PDFs. A shard this node was working on when it last stopped is resumed
+    from its frontier rather than started over.
+    """
+    # Imported here so the coordinator side does not need the scraper's dependencies
+    from scraper import console, scrape_all_parallel
+
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)
+    current = Path("current_shard")
+
+    totals = {'shards': 0, 'kennels': 0, 'pdfs': 0, 'pdfs_failed': 0}
+    while True:
+        shard = coordinator.lease(node_id)
+        if shard is None:
+            if coordinator.outstanding() == 0:
+                break
+            time.sleep(poll)  # other nodes still hold shards that may be handed back
+            continue
+
+        resume = current.exists() and current.read_text().strip() == str(shard['shard_id'])
+        current.write_text(str(shard['shard_id']))
+        console.print(f"\n[bold cyan]{node_id}:[/bold cyan] shard {shard['shard_id']} ({shard_label(shard)})"
+                      + (" [dim]resuming[/dim]" if resume else ""))
+        try:
+            with Heartbeat(coordinator, shard, node_id):
+                stats = scrape_all_parallel(
+                    num_workers=num_workers,
+                    start_county=shard['start_county'],
+                    end_county=shard['end_county'],
+                    delay=delay,
+                    max_rate=max_rate,
+                    resume=resume,
+                    pipeline=pipeline,
+                    archive=archive,
+                    pdf_store=pdf_store,
+                    shard=(shard['hash_index'], shard['hash_count']) if shard['hash_count'] else None
+                )
+        except Exception as e:
+            console.print(f"[red]Shard {shard['shard_id']} failed: {e}[/red]")
+            coordinator.fail(shard['shard_id'], node_id)
+            continue
+
+        if stats.counties_failed:
+            # Hand the shard back so it is resumed, rather than completed with counties never searched
+            console.print(f"[red]Shard {shard['shard_id']}: {stats.counties_failed} county searches failed[/red]")
+            coordinator.fail(shard['shard_id'], node_id)
+            continue
+
+        coordinator.complete(shard['shard_id'], node_id, stats.kennels_found, stats.pdfs_downloaded, stats.pdfs_failed)
+        current.unlink()
+        totals['shards'] += 1
+        totals['kennels'] += stats.kennels_found
+        totals['pdfs'] += stats.pdfs_downloaded
+        totals['pdfs_failed'] += stats.pdfs_failed
+
+    return totals
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _changed_only(table: str, updates: dict[str, str], unguarded: tuple = ()) -> str:
+    """DO UPDATE clause setting column = expression, applied only to rows where some value changes.
+
+    Like scraper.Upsert: re-merging unchanged rows writes nothing. Columns in
+    `unguarded` are set along with a change but do not count as one.
+    """
+    sets = ', '.join(f"{column} = {expression}" for column, expression in updates.items())
+    changed = ' OR '.join(f"main.{table}.{column} IS NOT ({expression})"
+                          for column, expression in updates.items() if column not in unguarded)
+    return f"DO UPDATE SET {sets} WHERE {changed}"
+
+
+def merge_node(node_dir: Path, on_message=None) -> dict:
+    """Fold one node's database and PDFs into the main database and PDF store/tree.
+
+    Rows are matched on kennel_id and (kennel_id, inspection_date), so merging
+    the same node twice, or two nodes that both crawled a shard, is harmless;
+    an inspection keeps its PDF and parsed data if the incoming copy lacks them.
+    Only rows that change are written; the kennel and inspection counts are
+    of rows inserted or changed.
+    """
+    from scraper import DB_FILE, init_database
+    from pdf_store import PdfStore, STORE_DIR
+    from db_importer import update_database_schema
+
+    node_dir = Path(node_dir)
+    node_db = node_dir / Path(DB_FILE).name
+    result = {'kennels': 0, 'inspections': 0, 'pdfs': 0, 'files': 0}
+    if not node_db.exists():
+        return result
+
+    init_database()
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.execute("ATTACH DATABASE ? AS node", (str(node_db),))
+    if 'inspector_name' in _columns(conn, 'node', 'inspections'):
+        conn.close()
+        update_database_schema(DB_FILE)
+        conn = sqlite3.connect(DB_FILE, timeout=30)
+        conn.execute("ATTACH DATABASE ? AS node", (str(node_db),))
+    cursor = conn.cursor()
+
+    # Kennels: the node's copy wins (its updated_at comes along, but alone is no change)
+    columns = [c for c in _columns(conn, 'node', 'kennels') if c not in ('id', 'created_at')
+               and c in _columns(conn, 'main', 'kennels')]
+    updates = {c: f'excluded.{c}' for c in columns if c != 'kennel_id'}
+    cursor.execute(f'''
+        INSERT INTO main.kennels ({', '.join(columns)})
+        SELECT {', '.join(columns)} FROM node.kennels WHERE true
+        ON CONFLICT(kennel_id) {_changed_only('kennels', updates, unguarded=('updated_at',))}
+    ''')
+    result['kennels'] = cursor.rowcount
+
+    # Inspections: upsert in place so ids (and the rows that point at them) stay put
+    columns = [c for c in _columns(conn, 'node', 'inspections') if c not in ('id', 'created_at')
+               and c in _columns(conn, 'main', 'inspections')]
+    keep_existing = {
+        'downloaded': 'MAX(downloaded, excluded.downloaded)',
+        'pdf_path': 'CASE WHEN excluded.downloaded THEN excluded.pdf_path ELSE pdf_path END',
+    }
+    updates = {c: keep_existing.get(c, f'COALESCE(excluded.{c}, {c})')
+               for c in columns if c not in ('kennel_id', 'inspection_date')}
+    cursor.execute(f'''
+        INSERT INTO main.inspections ({', '.join(columns)})
+        SELECT {', '.join(columns)} FROM node.inspections WHERE true
+        ON CONFLICT(kennel_id, inspection_date) {_changed_only('inspections', updates)}
+    ''')
+    result['inspections'] = cursor.rowcount
+
+    # Parsed data (pipeline nodes), re-keyed to the main inspection ids
+    same_inspection = '''
+        FROM node.{table} d
+        JOIN node.inspections n ON n.id = d.inspection_id
+        JOIN main.inspections m ON m.kennel_id = n.kennel_id AND m.inspection_date = n.inspection_date
+    '''
+    for table in ('dog_counts', 'inspection_items'):
+        if table not in {row[0] for row in cursor.execute("SELECT name FROM node.sqlite_master WHERE type = 'table'")}:
+            continue
+        columns = [c for c in _columns(conn, 'node', table) if c not in ('id', 'inspection_id')]
+        cursor.execute(f'''
+            DELETE FROM main.{table} WHERE inspection_id IN (SELECT m.id {same_inspection.format(table=table)})
+        ''')
+        cursor.execute(f'''
+            INSERT INTO main.{table} (inspection_id, {', '.join(columns)})
+            SELECT m.id, {', '.join(f'd.{c}' for c in columns)} {same_inspection.format(table=table)}
+        ''')
+    conn.commit()
+
+    # PDFs: packed blobs are copied store to store, tree files keep their relative path
+    tables = {row[0] for row in cursor.execute("SELECT name FROM node.sqlite_master WHERE type = 'table'")}
+    blobs = [row[0] for row in cursor.execute('SELECT sha256 FROM node.pdf_blobs')] if 'pdf_blobs' in tables else []
+    files = cursor.execute('''
+        SELECT pdf_path FROM node.inspections WHERE downloaded = 1 AND pdf_path IS NOT NULL AND pdf_path != ''
+    ''').fetchall()
+    conn.close()
+
+    if blobs:
+        node_store = PdfStore(node_dir / STORE_DIR, str(node_db))
+        store = PdfStore(STORE_DIR, DB_FILE)
+        try:
+            for sha256 in blobs:
+                if sha256 in store:
+                    continue
+                data = node_store.get(sha256)
+                if data is not None:
+                    store.put(data)
+                    result['pdfs'] += 1
+                elif on_message:
+                    on_message(f"[yellow]{node_dir.name}: PDF {sha256[:12]} missing or corrupt in its store[/yellow]")
+        finally:
+            node_store.close()
+            store.close()
+
+    for (pdf_path,) in files:
+        source, target = node_dir / pdf_path, Path(pdf_path)
+        if source.exists() and not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            result['files'] += 1
+
+    return result
+
+
+def node_dirs(root: Path = NODES_DIR) -> list[Path]:
+    return sorted(p for p in Path(root).iterdir() if p.is_dir()) if Path(root).exists() else []
+
+
+def status_table(shards: list[dict]):
+    from rich.table import Table
+
+    table = Table(title="Crawl shards", show_header=True, header_style="bold magenta")
+    table.add_column("Shard", justify="right", style="cyan")
+    table.add_column("Covers")
+    table.add_column("State")
+    table.add_column("Node")
+    table.add_column("Attempts", justify="right")
+    table.add_column("Kennels", justify="right", style="green")
+    table.add_column("PDFs", justify="right", style="green")
+    table.add_column("Time", justify="right")
+
+    colors = {PENDING: 'dim', LEASED: 'yellow', DONE: 'green', FAILED: 'red'}
+    for s in shards:
+        elapsed = (s['finished_at'] or time.time()) - s['started_at'] if s['started_at'] else None
+        table.add_row(
+            str(s['shard_id']),
+            shard_label(s),
+            f"[{colors[s['state']]}]{s['state']}[/{colors[s['state']]}]",
+            s['owner'] or "",
+            str(s['attempts']),
+            f"{s['kennels']:,}",
+            f"{s['pdfs']:,}" + (f" ({s['pdfs_failed']} failed)" if s['pdfs_failed'] else ""),
+            f"{elapsed:.0f}s" if elapsed is not None else ""
+        )
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+    from rich.console import Console
+
+    console = Console()
+
+    parser = argparse.ArgumentParser(description='Crawl with several nodes leasing shards from a coordinator')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plan_parser = subparsers.add_parser('plan', help='Create the shard table for a new crawl')
+    plan_parser.add_argument('--coordinator', default=COORDINATOR_DB, help=f'Shard database (default: {COORDINATOR_DB})')
+    plan_parser.add_argument('--by', choices=['county', 'hash'], default='county',
+                             help='One shard per county, or --shards buckets of kennel_id (default: county)')
+    plan_parser.add_argument('--shards', type=int, default=8, help='Number of hash buckets (default: 8)')
+    plan_parser.add_argument('--start', type=int, default=1, help='Starting county ID (1-69)')
+    plan_parser.add_argument('--end', type=int, default=69, help='Ending county ID (1-69)')
+
+    serve_parser = subparsers.add_parser('serve', help='Serve the shard database to nodes over HTTP')
+    serve_parser.add_argument('--coordinator', default=COORDINATOR_DB, help=f'Shard database (default: {COORDINATOR_DB})')
+    serve_parser.add_argument('--host', default='0.0.0.0', help='Address to bind (default: 0.0.0.0)')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    serve_parser.add_argument('--lease', type=float, default=LEASE_SECONDS,
+                              help=f'Seconds a lease lasts without a heartbeat (default: {LEASE_SECONDS})')
+
+    node_parser = subparsers.add_parser('node', help='Lease and crawl shards until none are left')
+    node_parser.add_argument('--coordinator', default=COORDINATOR_DB,
+                             help=f'Shard database path or http://host:port of `serve` (default: {COORDINATOR_DB})')
+    node_parser.add_argument('--node-id', default=socket.gethostname(), help='Name of this node (default: hostname)')
+    node_parser.add_argument('--workdir', type=Path, help='Directory for this node\'s output (default: nodes/<node-id>)')
+    node_parser.add_argument('--lease', type=float, default=LEASE_SECONDS,
+                             help=f'Lease length when using a shard database directly (default: {LEASE_SECONDS})')
+    node_parser.add_argument('--workers', type=int, default=5, help='Number of parallel workers (default: 5)')
+    node_parser.add_argument('--delay', type=float, default=0.5, help='Starting delay between requests (default: 0.5)')
+    node_parser.add_argument('--max-rate', type=float, default=10.0,
+                             help='Ceiling for this node\'s adaptive request rate per second (default: 10)')
+    node_parser.add_argument('--pipeline', action='store_true', help='Parse and import PDFs as they download')
+    node_parser.add_argument('--no-archive', action='store_true', help='With --pipeline: do not keep the PDFs at all')
+    node_parser.add_argument('--pdf-store', choices=['pack', 'tree'], default='pack',
+                             help='Keep PDFs packed or one file each (default: pack)')
+
+    status_parser = subparsers.add_parser('status', help='Show shard progress')
+    status_parser.add_argument('--coordinator', default=COORDINATOR_DB,
+                               help=f'Shard database path or http://host:port (default: {COORDINATOR_DB})')
+
+    merge_parser = subparsers.add_parser('merge', help='Fold node outputs into kennel_inspections.db')
+    merge_parser.add_argument('nodes', nargs='*', type=Path, help='Node directories (default: every directory in nodes/)')
+
+    args = parser.parse_args()
+
+    if args.command == 'plan':
+        coordinator = ShardCoordinator(args.coordinator)
+        count = coordinator.plan(args.start, args.end, args.by, args.shards)
+        console.print(f"[green]✓[/green] Planned {count} shards in {args.coordinator}")
+    elif args.command == 'serve':
+        from aiohttp import web
+        coordinator = ShardCoordinator(args.coordinator, args.lease)
+        console.print(f"[cyan]Coordinator for {args.coordinator} on http://{args.host}:{args.port}[/cyan]")
+        web.run_app(coordinator_app(coordinator), host=args.host, port=args.port, print=None)
+    elif args.command == 'node':
+        if args.no_archive and not args.pipeline:
+            parser.error('--no-archive requires --pipeline')
+        target = args.coordinator
+        if not target.startswith(('http://', 'https://')):
+            target = str(Path(target).resolve())  # the node chdirs into its workdir
+        coordinator = connect(target, args.lease)
+        totals = run_node(
+            coordinator,
+            args.node_id,
+            args.workdir or NODES_DIR / args.node_id,
+            num_workers=args.workers,
+            delay=args.delay,
+            max_rate=args.max_rate,
+            pipeline=args.pipeline,
+            archive=not args.no_archive,
+            pdf_store=args.pdf_store
+        )
+        console.print(f"[green]✓[/green] {args.node_id}: {totals['shards']} shards, {totals['kennels']:,} kennels, "
+                      f"{totals['pdfs']:,} PDFs ({totals['pdfs_failed']} failed)")
+    elif args.command == 'status':
+        console.print(status_table(connect(args.coordinator).status()))
+    elif args.command == 'merge':
+        dirs = args.nodes or node_dirs()
+        if not dirs:
+            console.print("[yellow]No node directories to merge[/yellow]")
+        for node_dir in dirs:
+            result = merge_node(node_dir, on_message=console.print)
+            console.print(f"[green]✓[/green] {node_dir.name}: {result['kennels']:,} kennels, "
+                          f"{result['inspections']:,} inspections, {result['pdfs']:,} new packed PDFs, "
+                          f"{result['files']:,} PDF files")
@@ -2,11 +2,16 @@
 """
 Database Importer for PA Kennel Inspection Data
 Manages schema updates and imports parsed inspection data into SQLite.
+Rows are written from CompactInspection (see pdf_parser), the form import
+workers send back; InspectionData passed to import_inspection*() is packed
+first.
 """
 
 import sqlite3
-from typing import Optional
-from pdf_parser import InspectionData
+from typing import Optional, Union
+from pdf_parser import InspectionData, CompactInspection, COUNT_FIELDS, compact
+
+NO_COUNTS = (0,) * len(COUNT_FIELDS)
 
 
 def update_database_schema(db_path: str):
@@ -26,7 +31,9 @@ def update_database_schema(db_path: str):
         'inspection_action': 'TEXT',
         'license_year_class': 'TEXT',
         'remarks_text': 'TEXT',
-        'reinspection_required': 'INTEGER DEFAULT 0'
+        'reinspection_required': 'INTEGER DEFAULT 0',
+        'parser_version': 'INTEGER',
+        'text_sha256': 'TEXT'
     }
     
     for column_name, column_type in new_columns.items():
@@ -72,6 +79,7 @@ def update_database_schema(db_path: str):
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_dog_counts_inspection ON dog_counts(inspection_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_inspection_items_inspection ON inspection_items(inspection_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_inspection_items_result ON inspection_items(result)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_inspections_parser_version ON inspections(parser_version)')
     
     conn.commit()
     conn.close()
@@ -95,6 +103,12 @@ def get_inspection_id_by_kennel_date(cursor: sqlite3.Cursor, kennel_id: int, ins
     return result[0] if result else None
 
 
+def get_inspection_ids_by_sha256(cursor: sqlite3.Cursor, pdf_sha256: str) -> list:
+    """Get IDs of all inspections whose PDF in the pack store has this SHA-256."""
+    cursor.execute('SELECT id FROM inspections WHERE pdf_sha256 = ?', (pdf_sha256,))
+    return [row[0] for row in cursor.fetchall()]
+
+
 def get_kennel_id_by_license(cursor: sqlite3.Cursor, license_number: str) -> Optional[int]:
     """Get kennel ID by license number."""
     if not license_number:
@@ -104,7 +118,8 @@ def get_kennel_id_by_license(cursor: sqlite3.Cursor, license_number: str) -> Opt
     return result[0] if result else None
 
 
-def update_inspection_metadata(cursor: sqlite3.Cursor, inspection_id: int, data: InspectionData):
+def update_inspection_metadata(cursor: sqlite3.Cursor, inspection_id: int,
+                               data: Union[InspectionData, CompactInspection]):
     """Update inspection record with parsed metadata."""
     cursor.execute('''
         UPDATE inspections
@@ -114,7 +129,9 @@ def update_inspection_metadata(cursor: sqlite3.Cursor, inspection_id: int, data:
             inspection_action = ?,
             license_year_class = ?,
             remarks_text = ?,
-            reinspection_required = ?
+            reinspection_required = ?,
+            parser_version = ?,
+            text_sha256 = ?
         WHERE id = ?
     ''', (
         data.inspector_name,
@@ -124,66 +141,39 @@ def update_inspection_metadata(cursor: sqlite3.Cursor, inspection_id: int, data:
         data.license_year_class,
         data.remarks,
         1 if data.reinspection_required else 0,
+        data.parser_version or None,
+        data.text_sha256 or None,
         inspection_id
     ))
 
 
-def insert_dog_counts(cursor: sqlite3.Cursor, inspection_id: int, data: InspectionData):
+def insert_dog_counts(cursor: sqlite3.Cursor, inspection_id: int, data: CompactInspection):
     """Insert dog count records for current and previous years."""
     # Delete existing counts for this inspection (in case of re-import)
     cursor.execute('DELETE FROM dog_counts WHERE inspection_id = ?', (inspection_id,))
     
-    # Insert current year counts
-    cursor.execute('''
+    # Counts are in COUNT_FIELDS order: boarding, breeding, other, transfer, on_prem, off_site
+    cursor.executemany('''
         INSERT OR REPLACE INTO dog_counts
         (inspection_id, year_type, boarding, breeding, other_count, transfer, on_prem, off_site)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        inspection_id,
-        'current',
-        data.curr_year_counts.get('boarding', 0),
-        data.curr_year_counts.get('breeding', 0),
-        data.curr_year_counts.get('other', 0),
-        data.curr_year_counts.get('transfer', 0),
-        data.curr_year_counts.get('on_prem', 0),
-        data.curr_year_counts.get('off_site', 0)
-    ))
-    
-    # Insert previous year counts
-    cursor.execute('''
-        INSERT OR REPLACE INTO dog_counts
-        (inspection_id, year_type, boarding, breeding, other_count, transfer, on_prem, off_site)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        inspection_id,
-        'previous',
-        data.prev_year_counts.get('boarding', 0),
-        data.prev_year_counts.get('breeding', 0),
-        data.prev_year_counts.get('other', 0),
-        data.prev_year_counts.get('transfer', 0),
-        data.prev_year_counts.get('on_prem', 0),
-        data.prev_year_counts.get('off_site', 0)
-    ))
+    ''', [
+        (inspection_id, 'current', *(data.curr_counts or NO_COUNTS)),
+        (inspection_id, 'previous', *(data.prev_counts or NO_COUNTS)),
+    ])
 
 
-def insert_inspection_items(cursor: sqlite3.Cursor, inspection_id: int, data: InspectionData):
+def insert_inspection_items(cursor: sqlite3.Cursor, inspection_id: int, data: CompactInspection):
     """Insert inspection category items."""
     # Delete existing items for this inspection (in case of re-import)
     cursor.execute('DELETE FROM inspection_items WHERE inspection_id = ?', (inspection_id,))
     
     # Insert all inspection items
-    for item in data.inspection_items:
-        cursor.execute('''
-            INSERT INTO inspection_items
-            (inspection_id, category_section, category_code, category_name, result)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            inspection_id,
-            item.get('section', ''),
-            item.get('code', ''),
-            item.get('name', ''),
-            item.get('result', '')
-        ))
+    cursor.executemany('''
+        INSERT INTO inspection_items
+        (inspection_id, category_section, category_code, category_name, result)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(inspection_id, *row) for row in data.item_rows()])
 
 
 def is_inspection_already_imported(db_path: str, pdf_path: str) -> bool:
@@ -202,10 +192,77 @@ def is_inspection_already_imported(db_path: str, pdf_path: str) -> bool:
     return result is not None
 
 
-def import_inspection(db_path: str, inspection_data: InspectionData, pdf_path: str) -> bool:
+def is_blob_already_imported(db_path: str, pdf_sha256: str) -> bool:
+    """Check if every inspection sharing a stored PDF has already been imported."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT COUNT(*) FROM inspections 
+        WHERE pdf_sha256 = ? AND inspector_name IS NULL
+    ''', (pdf_sha256,))
+    
+    remaining = cursor.fetchone()[0]
+    conn.close()
+    
+    return remaining == 0
+
+
+def get_outdated_imports(db_path: str, parser_version: int, source: str) -> list:
+    """PDFs whose inspections were imported by an older parser version (or before versioning).
+
+    Returns PDF paths (source 'tree') or PDF SHA-256s ('pack'), in import order.
+    """
+    column = 'pdf_path' if source == 'tree' else 'pdf_sha256'
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute(f'''
+        SELECT {column} FROM inspections
+        WHERE inspector_name IS NOT NULL AND {column} IS NOT NULL AND {column} != ''
+          AND (parser_version IS NULL OR parser_version < ?)
+        GROUP BY {column}
+        ORDER BY MIN(id)
+    ''', (parser_version,))
+    
+    rows = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def import_inspection_blob(db_path: str, inspection_data: Union[InspectionData, CompactInspection],
+                           pdf_sha256: str) -> int:
+    """Import parsed data into every inspection linked to a stored PDF; returns how many."""
+    if not inspection_data:
+        return 0
+    inspection_data = compact(inspection_data)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    try:
+        inspection_ids = get_inspection_ids_by_sha256(cursor, pdf_sha256)
+        for inspection_id in inspection_ids:
+            update_inspection_metadata(cursor, inspection_id, inspection_data)
+            insert_dog_counts(cursor, inspection_id, inspection_data)
+            insert_inspection_items(cursor, inspection_id, inspection_data)
+        
+        conn.commit()
+        conn.close()
+        return len(inspection_ids)
+        
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+        raise e
+
+
+def import_inspection(db_path: str, inspection_data: Union[InspectionData, CompactInspection],
+                      pdf_path: str) -> bool:
     """Import parsed inspection data into database."""
     if not inspection_data:
         return False
+    inspection_data = compact(inspection_data)
     
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -279,6 +336,16 @@ def get_import_stats(db_path: str) -> dict:
     cursor.execute("SELECT COUNT(*) FROM inspection_items WHERE result = 'Unsatisfactory'")
     stats['violations'] = cursor.fetchone()[0]
     
+    # Imported inspections by parser version (None: imported before versioning)
+    try:
+        cursor.execute('''
+            SELECT parser_version, COUNT(*) FROM inspections
+            WHERE inspector_name IS NOT NULL GROUP BY parser_version
+        ''')
+        stats['parser_versions'] = dict(cursor.fetchall())
+    except sqlite3.OperationalError:
+        stats['parser_versions'] = {}
+    
     conn.close()
     return stats
 
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Persistent crawl frontier for the PA Kennel Inspection scraper
+Keeps the counties to search, kennels to visit and PDFs to fetch in SQLite,
+with a state and attempt count for each, so an interrupted crawl can resume
+exactly where it stopped. Workers lease items; a lease that is never
+completed (crashed worker) expires and the item becomes available again.
+"""
+
+import json
+import time
+import sqlite3
+from threading import Lock
+from typing import Optional
+
+DB_FILE = "kennel_inspections.db"
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Frontier:
+    """SQLite-backed work queue of counties, kennels and PDFs."""
+    def __init__(self, db_path: str = DB_FILE, lease_seconds: float = 600, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS crawl_counties (
+                county_id INTEGER PRIMARY KEY,
+                state TEXT NOT NULL DEFAULT 'pending',
+                kennels INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS crawl_kennels (
+                kennel_id INTEGER PRIMARY KEY,
+                kennel TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                lease_owner TEXT,
+                lease_until REAL,
+                validators TEXT,
+                priority REAL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS crawl_pdfs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kennel_id INTEGER NOT NULL,
+                inspection_date TEXT,
+                pdf_url TEXT,
+                pdf_path TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                lease_owner TEXT,
+                lease_until REAL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(kennel_id, inspection_date)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_crawl_kennels_state ON crawl_kennels(state);
+            CREATE INDEX IF NOT EXISTS idx_crawl_pdfs_state ON crawl_pdfs(state);
+            CREATE INDEX IF NOT EXISTS idx_crawl_pdfs_kennel ON crawl_pdfs(kennel_id);
+        ''')
+        # Lease order for scheduled recrawls (added after the initial schema)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(crawl_kennels)")}
+        if 'priority' not in columns:
+            self.conn.execute('ALTER TABLE crawl_kennels ADD COLUMN priority REAL DEFAULT 0')
+
+    def _transaction(self, fn):
+        """Run fn(cursor) inside one IMMEDIATE transaction (safe across processes)."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(cursor)
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+            return result
+
+    def reset(self):
+        """Forget any previous crawl."""
+        def run(cursor):
+            cursor.execute('DELETE FROM crawl_counties')
+            cursor.execute('DELETE FROM crawl_kennels')
+            cursor.execute('DELETE FROM crawl_pdfs')
+        self._transaction(run)
+
+    def release_leases(self):
+        """Return every leased item to pending (the process holding them is gone)."""
+        def run(cursor):
+            for table in ('crawl_kennels', 'crawl_pdfs'):
+                cursor.execute(f'''
+                    UPDATE {table} SET state = ?, lease_owner = NULL, lease_until = NULL
+                    WHERE state = ?
+                ''', (PENDING, LEASED))
+        self._transaction(run)
+
+    def recover_lost_writes(self, pack: bool = False):
+        """Repair rows an interrupted run finished in the frontier but never flushed.
+
+        Database writes are batched, so a crash can lose the last few rows of
+        work the frontier already marked done. Kennels without a kennels row are
+        visited again and downloaded PDFs get their inspections row back. With
+        `pack` (PDFs go to the pack store) the frontier's tree path names no
+        file and the row's blob is unknown, so those PDFs get a row without a
+        path and are queued again, to be fetched and linked to their blob.
+        """
+        def run(cursor):
+            cursor.execute('''
+                UPDATE crawl_kennels SET state = ?
+                WHERE state = ? AND kennel_id NOT IN (SELECT kennel_id FROM kennels)
+            ''', (PENDING, DONE))
+            lost = [row[0] for row in cursor.execute('''
+                SELECT p.id FROM crawl_pdfs p
+                WHERE p.state = ? AND NOT EXISTS (
+                    SELECT 1 FROM inspections i
+                    WHERE i.kennel_id = p.kennel_id AND i.inspection_date = p.inspection_date
+                )
+            ''', (DONE,)).fetchall()]
+            if not pack:
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO inspections (kennel_id, inspection_date, pdf_url, pdf_path, downloaded)
+                    SELECT kennel_id, inspection_date, pdf_url, pdf_path, 1 FROM crawl_pdfs WHERE id = ?
+                ''', [(pdf_id,) for pdf_id in lost])
+            else:
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO inspections (kennel_id, inspection_date, pdf_url, pdf_path, downloaded)
+                    SELECT kennel_id, inspection_date, pdf_url, '', 0 FROM crawl_pdfs WHERE id = ?
+                ''', [(pdf_id,) for pdf_id in lost])
+                cursor.executemany('''
+                    UPDATE crawl_pdfs SET state = ?, attempts = 0, lease_owner = NULL, lease_until = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', [(PENDING, pdf_id) for pdf_id in lost])
+        self._transaction(run)
+
+    def searched_counties(self) -> set[int]:
+        with self.lock:
+            rows = self.conn.execute('SELECT county_id FROM crawl_counties WHERE state = ?', (DONE,)).fetchall()
+        return {row[0] for row in rows}
+
+    def add_county_results(self, county_id: int, kennels: list[dict]):
+        """Queue a county's kennels and mark its search done, atomically.
+        
+        Kennels are leased highest `priority` first (a key of the kennel
+        dict, default 0), then by kennel_id.
+        """
+        def run(cursor):
+            cursor.executemany(
+                'INSERT OR IGNORE INTO crawl_kennels (kennel_id, kennel, priority) VALUES (?, ?, ?)',
+                [(kennel['kennel_id'], json.dumps(kennel), kennel.get('priority', 0)) for kennel in kennels]
+            )
+            cursor.execute('''
+                INSERT OR REPLACE INTO crawl_counties (county_id, state, kennels, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (county_id, DONE, len(kennels)))
+        self._transaction(run)
+
+    def county_failed(self, county_id: int):
+        """Record a county whose search failed; it stays unsearched, so a resumed run tries it again."""
+        def run(cursor):
+            cursor.execute('''
+                INSERT OR REPLACE INTO crawl_counties (county_id, state, kennels, updated_at)
+                VALUES (?, ?, 0, CURRENT_TIMESTAMP)
+            ''', (county_id, FAILED))
+        self._transaction(run)
+
+    def _lease(self, table: str, key: str, owner: str, order: Optional[str] = None) -> Optional[dict]:
+        now = time.time()
+
+        def run(cursor):
+            cursor.execute(f'''
+                SELECT * FROM {table}
+                WHERE state = ? OR (state = ? AND lease_until < ?)
+                ORDER BY {order or key} LIMIT 1
+            ''', (PENDING, LEASED, now))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [c[0] for c in cursor.description]
+            item = dict(zip(columns, row))
+            cursor.execute(f'''
+                UPDATE {table}
+                SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_until = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE {key} = ?
+            ''', (LEASED, owner, now + self.lease_seconds, item[key]))
+            item['attempts'] += 1
+            return item
+
+        return self._transaction(run)
+
+    def lease_kennel(self, owner: str) -> Optional[dict]:
+        """Lease the next kennel to visit; returns the search result dict."""
+        item = self._lease('crawl_kennels', 'kennel_id', owner, 'priority DESC, kennel_id')
+        if item is None:
+            return None
+        kennel = json.loads(item['kennel'])
+        kennel['attempts'] = item['attempts']
+        return kennel
+
+    def lease_pdf(self, owner: str) -> Optional[dict]:
+        """Lease the next PDF to fetch."""
+        return self._lease('crawl_pdfs', 'id', owner)
+
+    def active(self) -> int:
+        """Number of items currently leased by some worker."""
+        with self.lock:
+            row = self.conn.execute('''
+                SELECT (SELECT COUNT(*) FROM crawl_kennels WHERE state = ?)
+                     + (SELECT COUNT(*) FROM crawl_pdfs WHERE state = ?)
+            ''', (LEASED, LEASED)).fetchone()
+        return row[0]
+
+    def _retry_or_fail(self, cursor, table: str, key: str, value: int) -> bool:
+        """Release a failed lease; returns True once the item is out of attempts."""
+        cursor.execute(f'SELECT attempts FROM {table} WHERE {key} = ?', (value,))
+        row = cursor.fetchone()
+        final = row is None or row[0] >= self.max_attempts
+        cursor.execute(f'''
+            UPDATE {table} SET state = ?, lease_owner = NULL, lease_until = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE {key} = ?
+        ''', (FAILED if final else PENDING, value))
+        return final
+
+    def kennel_failed(self, kennel_id: int) -> bool:
+        return self._transaction(lambda cursor: self._retry_or_fail(cursor, 'crawl_kennels', 'kennel_id', kennel_id))
+
+    def kennel_done(self, kennel_id: int, pdfs: list[tuple] = (),
+                    validators: Optional[dict] = None) -> bool:
+        """Mark a kennel visited and queue its (inspection_date, pdf_url, pdf_path) PDFs.
+
+        Validators are held until the kennel's last PDF completes; returns True
+        when nothing was queued, i.e. the caller can store them right away.
+        """
+        def run(cursor):
+            cursor.executemany('''
+                INSERT OR IGNORE INTO crawl_pdfs (kennel_id, inspection_date, pdf_url, pdf_path)
+                VALUES (?, ?, ?, ?)
+            ''', [(kennel_id, *pdf) for pdf in pdfs])
+            cursor.execute('''
+                UPDATE crawl_kennels SET state = ?, lease_owner = NULL, lease_until = NULL,
+                    validators = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE kennel_id = ?
+            ''', (DONE, json.dumps(validators) if validators else None, kennel_id))
+            return not pdfs
+        return self._transaction(run)
+
+    def requeue_pdfs(self, pdfs: list[tuple]):
+        """Queue (kennel_id, inspection_date, pdf_url, pdf_path) PDFs again, with fresh attempts."""
+        def run(cursor):
+            cursor.executemany('''
+                INSERT INTO crawl_pdfs (kennel_id, inspection_date, pdf_url, pdf_path) VALUES (?, ?, ?, ?)
+                ON CONFLICT(kennel_id, inspection_date) DO UPDATE SET
+                    pdf_url = excluded.pdf_url, pdf_path = excluded.pdf_path, state = ?, attempts = 0,
+                    lease_owner = NULL, lease_until = NULL, updated_at = CURRENT_TIMESTAMP
+            ''', [(*pdf, PENDING) for pdf in pdfs])
+        self._transaction(run)
+
+    def pdf_finished(self, pdf_id: int, ok: bool) -> tuple[bool, Optional[dict]]:
+        """Record a PDF outcome.
+
+        Returns (final, validators): final is False when a failed PDF went back
+        to pending for another attempt; validators are returned once every PDF
+        of its kennel has been fetched successfully.
+        """
+        def run(cursor):
+            if ok:
+                cursor.execute('''
+                    UPDATE crawl_pdfs SET state = ?, lease_owner = NULL, lease_until = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (DONE, pdf_id))
+                final = True
+            else:
+                final = self._retry_or_fail(cursor, 'crawl_pdfs', 'id', pdf_id)
+
+            cursor.execute('''
+                SELECT k.validators,
+                       SUM(CASE WHEN p.state = ? THEN 0 ELSE 1 END)
+                FROM crawl_pdfs p JOIN crawl_kennels k ON k.kennel_id = p.kennel_id
+                WHERE p.kennel_id = (SELECT kennel_id FROM crawl_pdfs WHERE id = ?)
+            ''', (DONE, pdf_id))
+            stored, outstanding = cursor.fetchone()
+            if ok and stored and outstanding == 0:
+                return final, json.loads(stored)
+            return final, None
+        return self._transaction(run)
+
+    def counts(self) -> dict:
+        """Item counts per table and state, e.g. {'kennels': {'done': 10}, ...}."""
+        counts = {'counties': {}, 'kennels': {}, 'pdfs': {}}
+        with self.lock:
+            for name, table in (('counties', 'crawl_counties'), ('kennels', 'crawl_kennels'), ('pdfs', 'crawl_pdfs')):
+                for state, count in self.conn.execute(f'SELECT state, COUNT(*) FROM {table} GROUP BY state'):
+                    counts[name][state] = count
+        return counts
+
+    def close(self):
+        self.conn.close()
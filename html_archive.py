@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Raw HTML snapshot archive for PA Kennel Inspections
+Keeps every fetched search and details page, zlib-compressed, in append-only
+segment files indexed by URL and fetch time in the html_snapshots table. A
+parser fix can then be applied to the whole kennels table with `reparse`
+at local-disk speed instead of a re-crawl, and benchmark_html.py can time
+the backends on real pages offline.
+
+Index rows are committed in batches, each after an fsync of the segment,
+so fetching threads never wait on a per-page commit; a crash can lose the
+last batch of rows (`reindex` recovers those whose pages had new bytes).
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+import hashlib
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, Optional
+
+DB_FILE = "kennel_inspections.db"
+ARCHIVE_DIR = Path("html_archive")
+SEGMENT_SIZE = 64 * 1024 * 1024
+COMPRESS_LEVEL = 6
+COMMIT_EVERY = 64  # index rows per commit
+COMMIT_SECONDS = 2.0  # longest a new index row waits for its commit (checked on each put)
+
+# Each record in a segment: metadata length, compressed body length, then the
+# metadata JSON (kind, key, url, fetched_at, sha256, meta) and the body. The
+# metadata lets rebuild_index() recover the index from the segments alone.
+RECORD_HEADER = struct.Struct('>II')
+
+
+def search_key(url: str, county_id: int) -> str:
+    """Archive key of a county search (every county POSTs to the same URL)."""
+    return f"{url}?County={county_id}"
+
+
+class HtmlArchive:
+    """Append-only compressed snapshots of fetched pages, indexed in SQLite.
+
+    A page fetched again with the same content gets a new index row pointing
+    at the bytes already stored. Safe to share between threads of one
+    process; only one process should write to an archive at a time.
+    """
+    def __init__(self, root: Path = ARCHIVE_DIR, db_path: str = DB_FILE, segment_size: int = SEGMENT_SIZE):
+        self.root = Path(root)
+        self.db_path = db_path
+        self.segment_size = segment_size
+        self.lock = Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS html_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                sha256 TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                meta TEXT
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_html_snapshots_key ON html_snapshots(key, fetched_at)')
+        self.conn.commit()
+        self._segment_id = None
+        self._segment = None
+        self._readers: dict[int, int] = {}
+        self._pending: list[tuple] = []  # index rows not committed yet
+        self._pending_latest: dict[str, tuple] = {}  # key -> (sha256, segment, offset, length) among them
+        self._pending_since = 0.0
+
+    def segment_path(self, segment_id: int) -> Path:
+        return self.root / f"segment-{segment_id:05d}.zlog"
+
+    def segment_ids(self) -> list[int]:
+        return sorted(int(p.stem.split('-')[1]) for p in self.root.glob("segment-*.zlog"))
+
+    def _writable_segment(self, size: int):
+        """Current segment opened for append, rolling over to a new one when full."""
+        if self._segment is None:
+            ids = self.segment_ids()
+            self._segment_id = ids[-1] if ids else 1
+            self._segment = open(self.segment_path(self._segment_id), 'ab')
+        if self._segment.tell() and self._segment.tell() + RECORD_HEADER.size + size > self.segment_size:
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._segment.close()
+            self._segment_id += 1
+            self._segment = open(self.segment_path(self._segment_id), 'ab')
+        return self._segment_id, self._segment
+
+    def put(self, kind: str, key: str, url: str, body: bytes, meta: Optional[dict] = None,
+            fetched_at: Optional[float] = None):
+        """Archive one fetched page (`kind` 'search' or 'details') under `key`."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        sha256 = hashlib.sha256(body).hexdigest()
+        meta_json = json.dumps(meta or {})
+        with self.lock:
+            latest = self._pending_latest.get(key) or self.conn.execute(
+                'SELECT sha256, segment, offset, length FROM html_snapshots WHERE key = ? '
+                'ORDER BY fetched_at DESC LIMIT 1', (key,)
+            ).fetchone()
+        # Compress outside the lock so worker threads do not queue behind each other
+        compressed = None
+        if not (latest and latest[0] == sha256):
+            compressed = zlib.compress(body, COMPRESS_LEVEL)
+            header = json.dumps({'kind': kind, 'key': key, 'url': url, 'fetched_at': fetched_at,
+                                 'sha256': sha256, 'size': len(body), 'meta': meta or {}}).encode()
+        with self.lock:
+            if compressed is None:
+                location = latest[1:]
+            else:
+                segment_id, f = self._writable_segment(len(header) + len(compressed))
+                # Bytes first, index row second: a crash in between leaves only unreferenced bytes
+                f.write(RECORD_HEADER.pack(len(header), len(compressed)))
+                f.write(header)
+                offset = f.tell()
+                f.write(compressed)
+                f.flush()
+                location = (segment_id, offset, len(compressed))
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append((kind, key, url, fetched_at, sha256, *location, len(body), meta_json))
+            self._pending_latest[key] = (sha256, *location)
+            if len(self._pending) >= COMMIT_EVERY or time.monotonic() - self._pending_since >= COMMIT_SECONDS:
+                self._commit_pending()
+
+    def _commit_pending(self):
+        """fsync the segment, then commit the index rows of every page put since the last commit."""
+        if not self._pending:
+            return
+        if self._segment is not None:
+            os.fsync(self._segment.fileno())
+        self.conn.executemany('''
+            INSERT INTO html_snapshots (kind, key, url, fetched_at, sha256, segment, offset, length, size, meta)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', self._pending)
+        self.conn.commit()
+        self._pending.clear()
+        self._pending_latest.clear()
+
+    def flush(self):
+        """Commit every page put so far."""
+        with self.lock:
+            self._commit_pending()
+
+    def _read(self, segment_id: int, offset: int, length: int) -> bytes:
+        with self.lock:
+            if segment_id not in self._readers:
+                self._readers[segment_id] = os.open(self.segment_path(segment_id), os.O_RDONLY)
+            fd = self._readers[segment_id]
+        return zlib.decompress(os.pread(fd, length, offset))
+
+    def latest(self, kind: Optional[str] = None) -> Iterator[dict]:
+        """Newest snapshot of every key (optionally of one kind), body included, in key order."""
+        with self.lock:
+            self._commit_pending()
+            rows = self.conn.execute('''
+                SELECT kind, key, url, MAX(fetched_at), segment, offset, length, meta
+                FROM html_snapshots WHERE ? IS NULL OR kind = ?
+                GROUP BY key ORDER BY key
+            ''', (kind, kind)).fetchall()
+        for kind_, key, url, fetched_at, segment_id, offset, length, meta in rows:
+            yield {
+                'kind': kind_,
+                'key': key,
+                'url': url,
+                'fetched_at': fetched_at,
+                'meta': json.loads(meta or '{}'),
+                'body': self._read(segment_id, offset, length),
+            }
+
+    def rebuild_index(self) -> int:
+        """Re-create html_snapshots by scanning the segments; returns records indexed.
+
+        Re-fetches of unchanged pages only ever had an index row, so they
+        are not recovered.
+        """
+        self.flush()
+        records = []
+        for segment_id in self.segment_ids():
+            with open(self.segment_path(segment_id), 'rb') as f:
+                while True:
+                    head = f.read(RECORD_HEADER.size)
+                    if len(head) < RECORD_HEADER.size:
+                        break
+                    header_len, length = RECORD_HEADER.unpack(head)
+                    header = f.read(header_len)
+                    offset = f.tell()
+                    if len(f.read(length)) < length or len(header) < header_len:
+                        break  # torn write at the end of the segment
+                    h = json.loads(header)
+                    records.append((h['kind'], h['key'], h['url'], h['fetched_at'], h['sha256'],
+                                    segment_id, offset, length, h['size'], json.dumps(h['meta'])))
+        with self.lock:
+            self.conn.execute('DELETE FROM html_snapshots')
+            self.conn.executemany('''
+                INSERT INTO html_snapshots (kind, key, url, fetched_at, sha256, segment, offset, length, size, meta)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', records)
+            self.conn.commit()
+        return len(records)
+
+    def stats(self) -> dict:
+        """Snapshot, page and byte counts by kind."""
+        with self.lock:
+            self._commit_pending()
+            rows = self.conn.execute('''
+                SELECT kind, COUNT(*), COUNT(DISTINCT key), COALESCE(SUM(size), 0) FROM html_snapshots GROUP BY kind
+            ''').fetchall()
+        segments = self.segment_ids()
+        return {
+            'kinds': {kind: {'snapshots': n, 'pages': pages, 'bytes': size} for kind, n, pages, size in rows},
+            'segments': len(segments),
+            'segment_bytes': sum(self.segment_path(s).stat().st_size for s in segments),
+        }
+
+    def close(self):
+        with self.lock:
+            self._commit_pending()
+            if self._segment is not None:
+                self._segment.flush()
+                os.fsync(self._segment.fileno())
+                self._segment.close()
+                self._segment = None
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+            self.conn.close()
+
+
+# Archive the engines write fetched pages to; None (the default) archives nothing
+_archive: Optional[HtmlArchive] = None
+
+
+def use_archive(archive: Optional[HtmlArchive]):
+    """Archive every search and details page fetched from now on; None turns it off."""
+    global _archive
+    _archive = archive
+
+
+def get_archive() -> Optional[HtmlArchive]:
+    return _archive
+
+
+KENNEL_FIELDS = ('name', 'address', 'city', 'state', 'zip_code', 'county', 'township', 'license_number',
+                 'last_status', 'last_issued_license_year', 'last_license_class', 'details_url')
+
+
+def reparse(archive: HtmlArchive, db_path: str = DB_FILE, dry_run: bool = False, on_page=None) -> dict:
+    """Rebuild the kennels table from the newest archived details page of each kennel.
+
+    Kennels whose parsed fields differ are updated in place (keeping their
+    ids, validators and check times), missing ones are inserted; with
+    `dry_run` nothing is written. Returns page and row counts plus changes per field.
+    """
+    # Imported here so the archive has no hard dependency on scraper.py
+    from scraper import KENNEL_UPSERT, kennel_row, parse_details_page
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    current = {row[0]: dict(zip(KENNEL_FIELDS, row[1:])) for row in conn.execute(
+        f"SELECT kennel_id, {', '.join(KENNEL_FIELDS)} FROM kennels"
+    )}
+    result = {'pages': 0, 'unparsable': 0, 'unchanged': 0, 'updated': 0, 'inserted': 0, 'fields': {}}
+    rows = []
+    for snapshot in archive.latest('details'):
+        result['pages'] += 1
+        html = snapshot['body'].decode('utf-8', errors='replace')
+        details, _ = parse_details_page(html, snapshot['url'], snapshot['meta'].get('county_name', ''))
+        if on_page:
+            on_page(snapshot)
+        if details is None:
+            result['unparsable'] += 1
+            continue
+        parsed = {f: getattr(details, f) for f in KENNEL_FIELDS}
+        before = current.get(details.kennel_id)
+        if before is None:
+            rows.append(kennel_row(details))
+            result['inserted'] += 1
+        elif before != parsed:
+            for f in KENNEL_FIELDS:
+                if before[f] != parsed[f]:
+                    result['fields'][f] = result['fields'].get(f, 0) + 1
+            rows.append(kennel_row(details))
+            result['updated'] += 1
+        else:
+            result['unchanged'] += 1
+
+    if not dry_run:
+        KENNEL_UPSERT.write(conn, rows)
+        conn.commit()
+    conn.close()
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+
+    parser = argparse.ArgumentParser(description='Manage the raw HTML snapshot archive')
+    parser.add_argument('command', choices=['stats', 'reparse', 'reindex'],
+                        help='stats: show archive size; reparse: rebuild the kennels table from archived '
+                             'details pages; reindex: rebuild html_snapshots from the segments')
+    parser.add_argument('--dry-run', action='store_true', help='Reparse: report changes without writing them')
+    parser.add_argument('--html-parser', help='Reparse: HTML backend to use (lxml or bs4)')
+    parser.add_argument('--archive', type=Path, default=ARCHIVE_DIR, help='Archive directory (default: html_archive)')
+    parser.add_argument('--db', default=DB_FILE, help=f'Database (default: {DB_FILE})')
+
+    args = parser.parse_args()
+    archive = HtmlArchive(args.archive, args.db)
+
+    if args.command == 'reparse':
+        if args.html_parser:
+            import html_backends
+            html_backends.set_backend(args.html_parser)
+        started = time.monotonic()
+        with console.status("Reparsing details pages...") as status:
+            result = reparse(archive, args.db, args.dry_run,
+                             on_page=lambda s: status.update(f"Reparsing {s['url'].rsplit('/', 1)[-1]}"))
+        elapsed = time.monotonic() - started
+        console.print(f"[green]✓[/green] {result['pages']:,} pages in {elapsed:.1f}s "
+                      f"({result['pages'] / max(elapsed, 1e-9):,.0f}/s): "
+                      f"{result['updated']:,} kennels {'would change' if args.dry_run else 'updated'}, "
+                      f"{result['inserted']:,} {'missing' if args.dry_run else 'inserted'}, "
+                      f"{result['unchanged']:,} unchanged, {result['unparsable']:,} unparsable")
+        if result['fields']:
+            table = Table(title="Changed fields", show_header=True, header_style="bold magenta")
+            table.add_column("Field", style="cyan")
+            table.add_column("Kennels", justify="right", style="green")
+            for field, count in sorted(result['fields'].items(), key=lambda item: -item[1]):
+                table.add_row(field, f"{count:,}")
+            console.print(table)
+    elif args.command == 'reindex':
+        console.print(f"[green]✓[/green] Indexed {archive.rebuild_index():,} snapshots")
+
+    if args.command != 'reparse':
+        stats = archive.stats()
+        table = Table(title="HTML Archive", show_header=True, header_style="bold magenta")
+        table.add_column("Kind", style="cyan")
+        table.add_column("Snapshots", justify="right")
+        table.add_column("Pages", justify="right")
+        table.add_column("Raw bytes", justify="right", style="green")
+        for kind, row in sorted(stats['kinds'].items()):
+            table.add_row(kind, f"{row['snapshots']:,}", f"{row['pages']:,}", f"{row['bytes'] / 1_000_000:,.1f} MB")
+        console.print(table)
+        console.print(f"{stats['segments']:,} segments, {stats['segment_bytes'] / 1_000_000:,.1f} MB on disk")
+    archive.close()
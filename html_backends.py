@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+HTML extraction backends for the PA Kennel Inspection scraper
+Pull the search results rows and the details page text and PDF links out of
+raw HTML. The lxml backend builds its tree in C and walks only the elements
+it needs; BeautifulSoup with the pure-Python html.parser is kept as the
+fallback when lxml is not installed or cannot handle a page. Both return the
+same values, so scraper.py builds its records the same way either way.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+KENNEL_SECTION = re.compile('Kennel Inspections', re.I)
+
+# Elements whose text BeautifulSoup's get_text() leaves out
+SKIPPED_TAGS = {'script', 'style', 'template'}
+
+
+class SearchRow(NamedTuple):
+    """Raw cells of one search results row."""
+    license_number: str
+    kennel_info: str
+    status: str
+    href: str
+
+
+class DetailsExtract(NamedTuple):
+    """Raw content of a details page: kennel text lines and (date, href) PDF links."""
+    lines: Optional[list[str]]  # None when the page has no details container
+    pdf_links: list[tuple[str, str]]
+
+
+# --- BeautifulSoup (fallback) -------------------------------------------------
+
+def bs4_search_rows(html: str) -> list[SearchRow]:
+    """Search results rows via BeautifulSoup."""
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', class_='table')
+    if not table:
+        return []
+
+    rows = []
+    for row in table.find_all('tr')[1:]:
+        cells = row.find_all('td')
+        if len(cells) >= 5:
+            details_link = cells[4].find('a')
+            if details_link and details_link.get('href'):
+                rows.append(SearchRow(
+                    cells[1].get_text(strip=True),
+                    cells[2].get_text(separator=' ', strip=True),
+                    cells[3].get_text(strip=True),
+                    details_link['href']
+                ))
+    return rows
+
+
+def bs4_details(html: str) -> DetailsExtract:
+    """Details page text lines and PDF links via BeautifulSoup."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    lines = None
+    details_div = soup.find('div', class_='container')
+    if details_div:
+        text_content = details_div.get_text(separator='\n', strip=True)
+        lines = [l.strip() for l in text_content.split('\n') if l.strip()]
+
+        kennel_section = soup.find('h4', string=KENNEL_SECTION)
+        if kennel_section:
+            parent = kennel_section.find_parent()
+            if parent:
+                all_text = []
+                for elem in parent.children:
+                    if elem.name == 'table':
+                        break
+                    if hasattr(elem, 'get_text'):
+                        all_text.append(elem.get_text(separator='\n', strip=True))
+                    elif isinstance(elem, str) and elem.strip():
+                        all_text.append(elem.strip())
+
+                full_text = '\n'.join(all_text)
+                lines = [l.strip() for l in full_text.split('\n') if l.strip()]
+
+    pdf_links = []
+    table = soup.find('table', class_='table')
+    if table:
+        for row in table.find_all('tr')[1:]:
+            cells = row.find_all('td')
+            if len(cells) >= 3:
+                pdf_link = cells[2].find('a')
+                if pdf_link and pdf_link.get('href'):
+                    pdf_links.append((cells[1].get_text(strip=True), pdf_link['href']))
+
+    return DetailsExtract(lines, pdf_links)
+
+
+# --- lxml ---------------------------------------------------------------------
+
+def _strings(el):
+    """Text nodes under `el` in document order, as BeautifulSoup's get_text() sees them."""
+    if not isinstance(el.tag, str) or el.tag in SKIPPED_TAGS:
+        return
+    if el.text:
+        yield el.text
+    for child in el:
+        yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _text(el, separator: str = '') -> str:
+    """Equivalent of Tag.get_text(separator=separator, strip=True)."""
+    return separator.join(s.strip() for s in _strings(el) if s.strip())
+
+
+def _has_class(el, name: str) -> bool:
+    return name in (el.get('class') or '').split()
+
+
+def _first(root, tag: str, class_name: str = None):
+    for el in root.iter(tag):
+        if class_name is None or _has_class(el, class_name):
+            return el
+    return None
+
+
+def _only_string(el) -> Optional[str]:
+    """Equivalent of Tag.string: the text of an element with a single string inside."""
+    if len(el) == 0:
+        return el.text
+    if len(el) == 1 and not (el.text or '').strip() and not el[0].tail and isinstance(el[0].tag, str):
+        return _only_string(el[0])
+    return None
+
+
+def _descendants(el, tag: str):
+    """Descendants named `tag`, excluding `el` itself (like Tag.find_all)."""
+    return [d for d in el.iter(tag) if d is not el]
+
+
+def _parse(html: str):
+    return lxml.html.fromstring(html)
+
+
+def lxml_search_rows(html: str) -> list[SearchRow]:
+    """Search results rows via lxml."""
+    table = _first(_parse(html), 'table', 'table')
+    if table is None:
+        return []
+
+    rows = []
+    for row in _descendants(table, 'tr')[1:]:
+        cells = _descendants(row, 'td')
+        if len(cells) >= 5:
+            details_link = _first(cells[4], 'a')
+            if details_link is not None and details_link.get('href'):
+                rows.append(SearchRow(
+                    _text(cells[1]),
+                    _text(cells[2], ' '),
+                    _text(cells[3]),
+                    details_link.get('href')
+                ))
+    return rows
+
+
+def lxml_details(html: str) -> DetailsExtract:
+    """Details page text lines and PDF links via lxml."""
+    root = _parse(html)
+
+    lines = None
+    details_div = _first(root, 'div', 'container')
+    if details_div is not None:
+        lines = [l.strip() for l in _text(details_div, '\n').split('\n') if l.strip()]
+
+        kennel_section = next(
+            (h4 for h4 in root.iter('h4') if KENNEL_SECTION.search(_only_string(h4) or '')), None
+        )
+        parent = kennel_section.getparent() if kennel_section is not None else None
+        if parent is not None:
+            all_text = [parent.text.strip()] if parent.text and parent.text.strip() else []
+            for elem in parent:
+                if elem.tag == 'table':
+                    break
+                all_text.append(_text(elem, '\n'))
+                if elem.tail and elem.tail.strip():
+                    all_text.append(elem.tail.strip())
+
+            full_text = '\n'.join(all_text)
+            lines = [l.strip() for l in full_text.split('\n') if l.strip()]
+
+    pdf_links = []
+    table = _first(root, 'table', 'table')
+    if table is not None:
+        for row in _descendants(table, 'tr')[1:]:
+            cells = _descendants(row, 'td')
+            if len(cells) >= 3:
+                pdf_link = _first(cells[2], 'a')
+                if pdf_link is not None and pdf_link.get('href'):
+                    pdf_links.append((_text(cells[1]), pdf_link.get('href')))
+
+    return DetailsExtract(lines, pdf_links)
+
+
+# --- Backend selection --------------------------------------------------------
+
+BACKENDS = {'bs4': (bs4_search_rows, bs4_details)}
+if lxml is not None:
+    BACKENDS['lxml'] = (lxml_search_rows, lxml_details)
+    LXML_ERRORS = (ValueError, etree.ParserError)
+else:
+    LXML_ERRORS = ()
+
+DEFAULT_BACKEND = 'lxml' if 'lxml' in BACKENDS else 'bs4'
+_backend = DEFAULT_BACKEND
+
+
+def set_backend(name: str):
+    """Choose the backend used by search_rows() and details() ('lxml' or 'bs4')."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"HTML backend {name!r} is not available (have: {', '.join(BACKENDS)})")
+    _backend = name
+
+
+def current_backend() -> str:
+    return _backend
+
+
+def search_rows(html: str, backend: str = None) -> list[SearchRow]:
+    """Search results rows with the selected backend, falling back to BeautifulSoup."""
+    backend = backend or _backend
+    try:
+        return BACKENDS[backend][0](html)
+    except LXML_ERRORS:
+        return bs4_search_rows(html)
+
+
+def details(html: str, backend: str = None) -> DetailsExtract:
+    """Details page content with the selected backend, falling back to BeautifulSoup."""
+    backend = backend or _backend
+    try:
+        return BACKENDS[backend][1](html)
+    except LXML_ERRORS:
+        return bs4_details(html)
@@ -5,11 +5,26 @@ Processes all inspection PDFs and extracts structured data.
 """
 
 import sys
+import sqlite3
 import argparse
 from pathlib import Path
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from pdf_parser import parse_inspection_pdf
-from db_importer import update_database_schema, import_inspection, get_import_stats, is_inspection_already_imported
+from pdf_parser import (
+    parse_inspection_pdf, parse_inspection_bytes, compact, set_parser, current_parser, PARSERS, DEFAULT_PARSER, PARSER_VERSION,
+    set_extractor, current_extractor, EXTRACTORS, DEFAULT_EXTRACTOR
+)
+from db_importer import (
+    update_database_schema,
+    import_inspection,
+    import_inspection_blob,
+    get_import_stats,
+    is_inspection_already_imported,
+    is_blob_already_imported,
+    get_outdated_imports
+)
+from pdf_store import PdfStore, STORE_DIR, store_in_use
+from pdf_verify import known_bad
+from text_cache import use_cache, get_cache, CACHE_FILE
 from rich.console import Console
 from rich.progress import (
     Progress,
@@ -36,13 +51,88 @@ def process_single_pdf(pdf_path_str):
     try:
         pdf_path = Path(pdf_path_str)
         inspection_data = parse_inspection_pdf(str(pdf_path))
-        return ('success', pdf_path_str, inspection_data)
+        return ('success', pdf_path_str, compact(inspection_data))
     except Exception as e:
         return ('error', pdf_path_str, str(e))
 
 
-def main(start_index=None, end_index=None, update_schema=True, num_workers=1, skip_existing=False):
-    """Main import process."""
+_store = None
+
+
+def init_worker(parser_name, extractor, cache_path):
+    """Give a worker process the parent's parser, extractor and text cache settings."""
+    set_parser(parser_name)
+    set_extractor(extractor)
+    use_cache(cache_path)
+
+
+def process_single_blob(pdf_sha256):
+    """Parse a PDF from the pack store, extracted from memory - called by parallel workers."""
+    global _store
+    try:
+        if _store is None:
+            _store = PdfStore(readonly=True)
+        pdf_bytes = _store.get(pdf_sha256)
+        if pdf_bytes is None:
+            return ('error', pdf_sha256, 'missing or corrupt in the PDF store')
+        return ('success', pdf_sha256, compact(parse_inspection_bytes(pdf_bytes)))
+    except Exception as e:
+        return ('error', pdf_sha256, str(e))
+
+
+def collect_pdfs(source, skip_bad=True):
+    """Everything to import in a stable order: file paths (tree) or PDF SHA-256s (pack).
+
+    PDFs that failed their last pdf_verify.py check are left out unless skip_bad is False.
+    """
+    bad = known_bad(DB_FILE, source) if skip_bad else set()
+    if source == 'tree':
+        return [str(pdf) for pdf in sorted(INSPECTIONS_DIR.glob("**/inspection_*.pdf")) if str(pdf) not in bad]
+    
+    conn = sqlite3.connect(DB_FILE)
+    rows = conn.execute('''
+        SELECT pdf_sha256 FROM inspections
+        WHERE pdf_sha256 IS NOT NULL
+        GROUP BY pdf_sha256
+        ORDER BY MIN(id)
+    ''').fetchall()
+    conn.close()
+    return [row[0] for row in rows if row[0] not in bad]
+
+
+def parse_pdf(source, item):
+    return process_single_pdf(item) if source == 'tree' else process_single_blob(item)
+
+
+def import_pdf(source, inspection_data, item):
+    if source == 'tree':
+        return import_inspection(DB_FILE, inspection_data, item)
+    return import_inspection_blob(DB_FILE, inspection_data, item) > 0
+
+
+def is_pdf_already_imported(source, item):
+    if source == 'tree':
+        return is_inspection_already_imported(DB_FILE, item)
+    return is_blob_already_imported(DB_FILE, item)
+
+
+def pdf_label(source, item):
+    if source == 'tree':
+        pdf_path = Path(item)
+        return f"{pdf_path.parent.name[:25]}/{pdf_path.name[:25]}"
+    return f"sha256:{item[:16]}"
+
+
+def main(start_index=None, end_index=None, update_schema=True, num_workers=1, skip_existing=False, source=None,
+         outdated=False):
+    """Main import process.
+
+    With `outdated`, only PDFs already imported by an older parser version
+    are parsed again (from the text cache where it has them).
+    """
+    
+    # PDFs come from the pack store once it is in use, otherwise from the directory tree
+    source = source or ('pack' if store_in_use(DB_FILE) else 'tree')
     
     # Print header
     console.print()
@@ -52,11 +142,14 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
     
     worker_info = f"\nWorkers: {num_workers} parallel" if num_workers > 1 else ""
     skip_info = "\nMode: Skip already imported" if skip_existing else ""
+    if outdated:
+        skip_info = f"\nMode: Re-parse imports older than parser version {PARSER_VERSION}"
     
     console.print(Panel.fit(
         "[bold cyan]📄 PA Kennel Inspection PDF Importer[/bold cyan]\n"
         f"Database: {DB_FILE}\n"
-        f"Source: {INSPECTIONS_DIR}/{batch_info}{worker_info}{skip_info}",
+        f"Source: {INSPECTIONS_DIR if source == 'tree' else STORE_DIR}/"
+        f"{' (packed)' if source == 'pack' else ''}{batch_info}{worker_info}{skip_info}",
         border_style="cyan"
     ))
     console.print()
@@ -75,7 +168,19 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
     
     # Step 2: Collect all PDF files
     console.print("[bold]Step 2:[/bold] Collecting PDF files...")
-    pdf_files = sorted(list(INSPECTIONS_DIR.glob("**/inspection_*.pdf")))
+    if outdated:
+        pdf_files = get_outdated_imports(DB_FILE, PARSER_VERSION, source)
+        if not pdf_files:
+            console.print(f"[green]✓[/green] Every imported inspection was parsed by parser version {PARSER_VERSION}")
+            return 0
+    else:
+        pdf_files = collect_pdfs(source, skip_bad=False)
+    bad = known_bad(DB_FILE, source)
+    if bad:
+        usable = [pdf for pdf in pdf_files if pdf not in bad]
+        if len(usable) < len(pdf_files):
+            console.print(f"[yellow]Skipping {len(pdf_files) - len(usable):,} PDFs that failed pdf_verify.py[/yellow]")
+        pdf_files = usable
     
     if not pdf_files:
         console.print("[yellow]No PDF files found![/yellow]")
@@ -105,7 +210,7 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
     if skip_existing:
         console.print("[cyan]Checking which PDFs are already imported...[/cyan]")
         original_count = len(pdf_files)
-        pdf_files = [pdf for pdf in pdf_files if not is_inspection_already_imported(DB_FILE, str(pdf))]
+        pdf_files = [pdf for pdf in pdf_files if not is_pdf_already_imported(source, pdf)]
         already_imported_count = original_count - len(pdf_files)
         if already_imported_count > 0:
             console.print(f"[green]✓[/green] Skipping {already_imported_count:,} already imported PDFs")
@@ -143,10 +248,12 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
                 current_file=""
             )
             
-            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            cache = get_cache()
+            with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker,
+                                     initargs=(current_parser(), current_extractor(), cache.path if cache else None)) as executor:
                 # Submit all PDF parsing jobs
                 future_to_pdf = {
-                    executor.submit(process_single_pdf, str(pdf)): pdf 
+                    executor.submit(process_single_pdf if source == 'tree' else process_single_blob, pdf): pdf 
                     for pdf in pdf_files
                 }
                 
@@ -161,7 +268,7 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
                             inspection_data = result
                             if inspection_data:
                                 # Import to database (sequential for SQLite safety)
-                                success = import_inspection(DB_FILE, inspection_data, pdf_str)
+                                success = import_pdf(source, inspection_data, pdf_str)
                                 if success:
                                     success_count += 1
                                 else:
@@ -176,7 +283,7 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
                         
                     except Exception as e:
                         error_count += 1
-                        errors.append((str(pdf_path), str(e)))
+                        errors.append((pdf_path, str(e)))
                         if len(errors) > 10:
                             errors.pop(0)
                     
@@ -187,7 +294,7 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
                         progress.update(
                             task,
                             description=f"[cyan]Processing[/cyan]",
-                            current_file=f"{pdf_path.parent.name[:25]}/{pdf_path.name[:25]}"
+                            current_file=pdf_label(source, pdf_path)
                         )
                     
                     progress.advance(task)
@@ -212,15 +319,17 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
                         progress.update(
                             task,
                             description=f"[cyan]Processing[/cyan]",
-                            current_file=f"{pdf_path.parent.name[:25]}/{pdf_path.name[:25]}"
+                            current_file=pdf_label(source, pdf_path)
                         )
                     
                     # Parse PDF
-                    inspection_data = parse_inspection_pdf(str(pdf_path))
+                    status, _, inspection_data = parse_pdf(source, pdf_path)
+                    if status == 'error':
+                        raise RuntimeError(inspection_data)
                     
                     if inspection_data:
                         # Import to database
-                        success = import_inspection(DB_FILE, inspection_data, str(pdf_path))
+                        success = import_pdf(source, inspection_data, pdf_path)
                         if success:
                             success_count += 1
                         else:
@@ -236,7 +345,7 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
                     
                 except Exception as e:
                     error_count += 1
-                    errors.append((str(pdf_path), str(e)))
+                    errors.append((pdf_path, str(e)))
                     progress.advance(task)
                     
                     # Only keep last 10 errors to avoid memory issues
@@ -271,6 +380,8 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
     table.add_row("Total Inspection Items", f"{stats['total_inspection_items']:,}")
     table.add_row("Violations Found", f"{stats['violations']:,}")
     table.add_row("Reinspections Required", f"{stats['reinspections_required']:,}")
+    older = sum(count for version, count in stats['parser_versions'].items() if (version or 0) < PARSER_VERSION)
+    table.add_row("Parsed by Older Parser Versions", f"{older:,}")
     
     console.print(table)
     console.print()
@@ -279,7 +390,7 @@ def main(start_index=None, end_index=None, update_schema=True, num_workers=1, sk
     if errors:
         console.print("[yellow]Sample Errors (last 10):[/yellow]")
         for pdf_path, error in errors[-10:]:
-            console.print(f"  [red]✗[/red] {Path(pdf_path).name}: {error[:80]}")
+            console.print(f"  [red]✗[/red] {pdf_label(source, pdf_path)}: {error[:80]}")
         console.print()
     
     # Final summary
@@ -316,6 +427,9 @@ Examples:
   
   # Skip already imported PDFs (fast resume)
   python import_pdfs.py --start 0 --workers 8 --skip-existing
+  
+  # After a parser change: re-parse only what older parser versions imported
+  python text_cache.py prewarm && python import_pdfs.py --outdated --workers 8
         """
     )
     
@@ -329,8 +443,33 @@ Examples:
                         help='Number of parallel workers (default: 1, use 4-8 for speed)')
     parser.add_argument('--skip-existing', action='store_true',
                         help='Skip PDFs that have already been imported (faster for re-runs)')
+    parser.add_argument('--source', choices=['pack', 'tree'], default=None,
+                        help='Read PDFs from the pack store or the kennel_inspections/ tree '
+                             '(default: pack once the store has PDFs)')
+    parser.add_argument('--count', action='store_true',
+                        help='Print how many PDFs --start/--end index into, then exit')
+    parser.add_argument('--pdf-parser', choices=sorted(PARSERS), default=DEFAULT_PARSER,
+                        help=f'Report text parser (default: {DEFAULT_PARSER}; legacy is the original multi-pass one)')
+    
+    parser.add_argument('--outdated', action='store_true',
+                        help=f'Only re-parse PDFs imported by a parser version older than {PARSER_VERSION}')
+    parser.add_argument('--no-text-cache', action='store_true',
+                        help=f'Always extract text, ignoring the extracted text cache ({CACHE_FILE})')
+    parser.add_argument('--pdf-extractor', choices=sorted(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help=f'PDF text extractor (default: {DEFAULT_EXTRACTOR}, one process per PDF; poppler '
+                             'extracts in-process and needs python-poppler)')
     
     args = parser.parse_args()
+    if args.outdated and args.skip_existing:
+        parser.error('--outdated and --skip-existing select different PDFs; use one')
+    set_parser(args.pdf_parser)
+    set_extractor(args.pdf_extractor)
+    if args.no_text_cache:
+        use_cache(None)
+    
+    if args.count:
+        print(len(collect_pdfs(args.source or ('pack' if store_in_use(DB_FILE) else 'tree'))))
+        sys.exit(0)
     
     try:
         sys.exit(main(
@@ -338,7 +477,9 @@ Examples:
             end_index=args.end,
             update_schema=not args.no_schema,
             num_workers=args.workers,
-            skip_existing=args.skip_existing
+            skip_existing=args.skip_existing,
+            source=args.source,
+            outdated=args.outdated
         ))
     except KeyboardInterrupt:
         console.print("\n[yellow]Import interrupted by user[/yellow]")
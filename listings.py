@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+County listing snapshots for the PA Kennel Inspection scraper
+Keeps the rows of each county's last search result (license number, name,
+status, details URL) and diffs every new search against them, so a
+listing-only refresh visits just the kennels that are new, changed status or
+disappeared - one search request per county instead of a details page per
+kennel.
+"""
+
+import json
+import sqlite3
+from threading import Lock
+from typing import NamedTuple
+
+DB_FILE = "kennel_inspections.db"
+
+# Search result fields whose change means the kennel's page is worth a visit
+COMPARED_FIELDS = ('license_number', 'status')
+
+
+class ListingDiff(NamedTuple):
+    """A county search compared with the previous one (kennel dicts as search_county() returns them)."""
+    new: list[dict]
+    changed: list[dict]
+    removed: list[dict]
+    unchanged: int
+
+    @property
+    def to_visit(self) -> list[dict]:
+        return self.new + self.changed + self.removed
+
+
+class CountyListings:
+    """Per-county snapshot of search results, stored in the crawl database."""
+    def __init__(self, db_path: str = DB_FILE):
+        self.db_path = db_path
+        self.lock = Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS county_listings (
+                county_id INTEGER NOT NULL,
+                kennel_id INTEGER NOT NULL,
+                license_number TEXT,
+                status TEXT,
+                kennel TEXT NOT NULL,
+                seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (county_id, kennel_id)
+            )
+        ''')
+        # Counties with a snapshot, so one that listed no kennels is not mistaken for one never searched
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS listed_counties (
+                county_id INTEGER PRIMARY KEY,
+                kennels INTEGER NOT NULL,
+                listed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.commit()
+
+    def previous(self, county_id: int, county_name: str) -> dict[int, dict]:
+        """The last listing of a county, keyed by kennel_id.
+
+        A county never searched with snapshots on falls back to what the
+        kennels table says about it, so the first listing-only run after a
+        full crawl only visits real changes. A county whose last search
+        listed no kennels has an empty snapshot, not the fallback.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT kennel FROM county_listings WHERE county_id = ?', (county_id,)
+            ).fetchall()
+            listed = self.conn.execute(
+                'SELECT 1 FROM listed_counties WHERE county_id = ?', (county_id,)
+            ).fetchone() is not None
+            if rows or listed:
+                return {kennel['kennel_id']: kennel for kennel in (json.loads(row[0]) for row in rows)}
+            try:
+                rows = self.conn.execute('''
+                    SELECT kennel_id, license_number, name, last_status, details_url FROM kennels
+                    WHERE UPPER(county) = ?
+                ''', (county_name.upper(),)).fetchall()
+            except sqlite3.OperationalError:
+                return {}
+        return {
+            kennel_id: {
+                'kennel_id': kennel_id,
+                'license_number': license_number or '',
+                'name': name or '',
+                'status': status or '',
+                'details_url': details_url,
+                'county_id': county_id,
+                'county_name': county_name
+            }
+            for kennel_id, license_number, name, status, details_url in rows
+        }
+
+    def diff(self, county_id: int, county_name: str, kennels: list[dict]) -> ListingDiff:
+        """Compare a fresh search result with the previous listing."""
+        previous = self.previous(county_id, county_name)
+        new, changed = [], []
+        for kennel in kennels:
+            before = previous.pop(kennel['kennel_id'], None)
+            if before is None:
+                new.append(kennel)
+            elif any((before.get(f) or '') != (kennel.get(f) or '') for f in COMPARED_FIELDS):
+                changed.append(kennel)
+        # Whatever is left was listed before and is gone now
+        removed = list(previous.values())
+        return ListingDiff(new, changed, removed, len(kennels) - len(new) - len(changed))
+
+    def save(self, county_id: int, kennels: list[dict]):
+        """Replace a county's snapshot with a fresh search result (only ever a successful one)."""
+        with self.lock:
+            self.conn.execute('DELETE FROM county_listings WHERE county_id = ?', (county_id,))
+            self.conn.executemany('''
+                INSERT INTO county_listings (county_id, kennel_id, license_number, status, kennel)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [
+                (county_id, k['kennel_id'], k['license_number'], k['status'], json.dumps(k)) for k in kennels
+            ])
+            self.conn.execute(
+                'INSERT OR REPLACE INTO listed_counties (county_id, kennels) VALUES (?, ?)', (county_id, len(kennels))
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
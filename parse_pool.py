@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Process-pool HTML parsing for the PA Kennel Inspection scraper
+Moves details page parsing off the network threads (or the event loop) into
+worker processes, so parsing no longer competes with I/O for the GIL. Pages
+go over as raw bytes and come back as compact DetailsExtract records (text
+lines and PDF links); the crawl turns those into KennelDetails itself.
+
+StageClock keeps the busy time of each crawl stage, which with the number of
+slots serving it gives the stage's utilisation, for sizing the fetch and
+parse pools against each other.
+"""
+
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from threading import Lock
+from typing import Optional
+
+from rich.table import Table
+
+import html_backends
+from html_backends import DetailsExtract
+
+
+def extract_details(body: bytes, encoding: str) -> tuple[DetailsExtract, float]:
+    """Decode and parse one details page; returns the extract and the seconds spent (runs in a worker)."""
+    started = time.perf_counter()
+    extract = html_backends.details(body.decode(encoding or 'utf-8', errors='replace'))
+    return extract, time.perf_counter() - started
+
+
+class StageClock:
+    """Busy seconds per crawl stage and the slots (threads, processes, requests) serving it.
+
+    Utilisation is busy / (slots * wall time): near 1.0 the stage is the
+    bottleneck, well below it the stage has slots to spare.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.started = time.monotonic()
+        self.busy: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.slots: dict[str, int] = {}
+
+    def set_slots(self, stage: str, slots: int):
+        with self.lock:
+            self.slots[stage] = slots
+
+    def add(self, stage: str, seconds: float):
+        with self.lock:
+            self.busy[stage] = self.busy.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def utilisation(self) -> dict[str, float]:
+        """Fraction of each slotted stage's capacity used so far."""
+        wall = max(time.monotonic() - self.started, 1e-9)
+        with self.lock:
+            return {stage: self.busy.get(stage, 0.0) / (slots * wall)
+                    for stage, slots in self.slots.items() if slots}
+
+    def table(self) -> Table:
+        """Per-stage summary for the end of a crawl."""
+        utilisation = self.utilisation()
+        table = Table(title="Stage utilisation", show_header=True, header_style="bold magenta")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Slots", justify="right")
+        table.add_column("Busy s", justify="right")
+        table.add_column("Calls", justify="right")
+        table.add_column("Avg ms", justify="right")
+        table.add_column("Utilisation", justify="right", style="green")
+        with self.lock:
+            stages = sorted(self.busy.items())
+            calls = dict(self.calls)
+            slots = dict(self.slots)
+        for stage, busy in stages:
+            count = calls.get(stage, 0)
+            table.add_row(
+                stage,
+                str(slots[stage]) if stage in slots else "",
+                f"{busy:.1f}",
+                f"{count:,}",
+                f"{busy / count * 1000:.1f}" if count else "",
+                f"{utilisation[stage]:.0%}" if stage in utilisation else ""
+            )
+        return table
+
+
+class ParsePool:
+    """Details page parsing in `workers` processes, reporting to a StageClock.
+
+    With no workers pages are parsed in the calling thread, timed all the
+    same, and the caller sets the 'parse' slots on the clock. 'parse' is the
+    time spent parsing; 'parse_wait' is the time a page waited for a free
+    worker, which grows when the pool is too small for the fetch side.
+    """
+    def __init__(self, workers: int, clock: Optional[StageClock] = None):
+        self.workers = workers
+        self.clock = clock
+        self.executor = None
+        if workers:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=html_backends.set_backend,
+                initargs=(html_backends.current_backend(),)
+            )
+            if clock is not None:
+                clock.set_slots('parse', workers)
+
+    def _record(self, submitted: float, parse_seconds: float):
+        if self.clock is not None:
+            self.clock.add('parse', parse_seconds)
+            if self.executor is not None:
+                self.clock.add('parse_wait', max(0.0, time.perf_counter() - submitted - parse_seconds))
+
+    def details(self, body: bytes, encoding: Optional[str]) -> DetailsExtract:
+        """Parse a details page in a worker, blocking the calling thread until it is done."""
+        submitted = time.perf_counter()
+        if self.executor is None:
+            extract, seconds = extract_details(body, encoding)
+        else:
+            extract, seconds = self.executor.submit(extract_details, body, encoding).result()
+        self._record(submitted, seconds)
+        return extract
+
+    async def details_async(self, body: bytes, encoding: Optional[str]) -> DetailsExtract:
+        """Parse a details page in a worker without blocking the event loop."""
+        submitted = time.perf_counter()
+        if self.executor is None:
+            extract, seconds = extract_details(body, encoding)
+        else:
+            loop = asyncio.get_running_loop()
+            extract, seconds = await loop.run_in_executor(self.executor, extract_details, body, encoding)
+        self._record(submitted, seconds)
+        return extract
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
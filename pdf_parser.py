@@ -1,13 +1,38 @@
 #!/usr/bin/env python3
 """
 PDF Parser for PA Kennel Inspection Reports
-Extracts structured data from inspection PDFs using pdftotext.
+Extracts structured data from inspection PDFs using pdftotext -layout text.
+The text comes from the pdftotext command, or with set_extractor('poppler')
+or --pdf-extractor poppler from the poppler bindings in-process when
+python-poppler is installed (one library load per process instead of a
+pdftotext process per PDF). pdftotext stays the default until
+benchmark_pdf_extract.py shows the two parse the corpus identically.
+Extracted text is cached by PDF content and extractor version
+(text_cache.py), so parsing a PDF again does not extract it again.
+
+The text is parsed in one linear walk over its lines (parse_text_single_pass).
+The original multi-pass parser (parse_text_legacy) is kept for differential
+testing: set_parser('legacy') or --pdf-parser legacy switches back to it, and
+benchmark_pdf_parser.py checks the two agree.
 """
 
+import hashlib
 import subprocess
 import re
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+from functools import lru_cache
+from typing import List, Optional, Dict, NamedTuple, Union
+
+from text_cache import get_cache, pdftotext_version
+
+try:
+    import poppler
+except ImportError:
+    poppler = None
+
+# Bump whenever a parser change alters what is extracted: inspections stamped
+# with an older version are what `import_pdfs.py --outdated` parses again.
+PARSER_VERSION = 1
 
 
 @dataclass
@@ -38,10 +63,20 @@ class InspectionData:
     # Remarks
     remarks: str = ""
     reinspection_required: bool = False
+    
+    # Provenance: parser version and SHA-256 of the text it was parsed from
+    parser_version: int = 0
+    text_sha256: str = ""
 
 
 def extract_pdf_text(pdf_path: str) -> str:
-    """Use pdftotext to extract text from PDF."""
+    """Extract text from PDF with the selected extractor, unless the text cache has it."""
+    if get_cache() is not None or _extractor != 'pdftotext':
+        try:
+            with open(pdf_path, 'rb') as f:
+                return extract_pdf_text_from_bytes(f.read())
+        except OSError:
+            return ""
     try:
         result = subprocess.run(
             ['pdftotext', '-layout', pdf_path, '-'],
@@ -56,6 +91,90 @@ def extract_pdf_text(pdf_path: str) -> str:
         return ""
 
 
+def extract_pdf_text_from_bytes(pdf_bytes: bytes) -> str:
+    """Text of PDF bytes from the text cache, else from the selected extractor (caching the result)."""
+    cache = get_cache()
+    if cache is None:
+        return extract_layout(pdf_bytes)
+    sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+    version = extractor_version()
+    text = cache.get(sha256, version)
+    if text is None:
+        text = extract_layout(pdf_bytes)
+        if text and version is not None:
+            cache.put(sha256, version, text)
+    return text
+
+
+def pdftotext_layout(pdf_bytes: bytes) -> str:
+    """Use pdftotext to extract text from PDF bytes piped through stdin."""
+    try:
+        result = subprocess.run(
+            ['pdftotext', '-layout', '-', '-'],
+            input=pdf_bytes,
+            capture_output=True,
+            timeout=30
+        )
+        if result.returncode != 0:
+            return ""
+        return result.stdout.decode('utf-8', errors='replace')
+    except Exception:
+        return ""
+
+
+def poppler_layout(pdf_bytes: bytes) -> str:
+    """Extract text from PDF bytes in-process with the poppler bindings.
+
+    Page.text() defaults to poppler's physical layout, the mode behind
+    pdftotext -layout; pages end with a form feed as pdftotext's do.
+    """
+    try:
+        document = poppler.load_from_data(pdf_bytes)
+        if document.is_locked:
+            return ""
+        return ''.join(document.create_page(i).text() + '\f' for i in range(document.pages))
+    except Exception:
+        return ""
+
+
+@lru_cache(maxsize=1)
+def poppler_version() -> str:
+    return f"poppler-cpp {poppler.version_string()}"
+
+
+# --- Extractor selection ------------------------------------------------------
+
+# name -> (PDF bytes -> layout text, version of the text for the cache key)
+EXTRACTORS = {'pdftotext': (pdftotext_layout, pdftotext_version)}
+if poppler is not None:
+    EXTRACTORS['poppler'] = (poppler_layout, poppler_version)
+
+DEFAULT_EXTRACTOR = 'pdftotext'  # poppler is opt-in until benchmark_pdf_extract.py finds no data differences
+_extractor = DEFAULT_EXTRACTOR
+
+
+def set_extractor(name: str):
+    """Choose how extract_pdf_text() gets text ('poppler' bindings or the 'pdftotext' command)."""
+    global _extractor
+    if name not in EXTRACTORS:
+        raise ValueError(f"PDF extractor {name!r} is not available (have: {', '.join(EXTRACTORS)})")
+    _extractor = name
+
+
+def current_extractor() -> str:
+    return _extractor
+
+
+def extract_layout(pdf_bytes: bytes, extractor: str = None) -> str:
+    """-layout text of PDF bytes with the selected extractor, bypassing the text cache."""
+    return EXTRACTORS[extractor or _extractor][0](pdf_bytes)
+
+
+def extractor_version(extractor: str = None) -> Optional[str]:
+    """Cache key version of the selected extractor's text; None when pdftotext is missing."""
+    return EXTRACTORS[extractor or _extractor][1]()
+
+
 def extract_field_value(text: str, field_name: str, lines: List[str]) -> str:
     """Extract value for a specific field from lines."""
     for i, line in enumerate(lines):
@@ -270,7 +389,16 @@ def parse_remarks(lines: List[str]) -> tuple:
 
 def parse_inspection_pdf(pdf_path: str) -> Optional[InspectionData]:
     """Parse inspection PDF and return structured data."""
-    text = extract_pdf_text(pdf_path)
+    return parse_inspection_text(extract_pdf_text(pdf_path))
+
+
+def parse_inspection_bytes(pdf_bytes: bytes) -> Optional[InspectionData]:
+    """Parse an inspection PDF held in memory (e.g. straight from a download)."""
+    return parse_inspection_text(extract_pdf_text_from_bytes(pdf_bytes))
+
+
+def parse_text_legacy(text: str) -> Optional[InspectionData]:
+    """Parse pdftotext -layout output of an inspection report (original multi-pass parser)."""
     if not text:
         return None
     
@@ -373,6 +501,333 @@ def parse_inspection_pdf(pdf_path: str) -> Optional[InspectionData]:
     return data
 
 
+# --- Single-pass parser -------------------------------------------------------
+
+COUNT_FIELDS = ('boarding', 'breeding', 'other', 'transfer', 'on_prem', 'off_site')
+# Every label the parser reacts to, found in one sweep over the text. Each alternative starts
+# with a literal so the regex engine can skip ahead to the possible first letters.
+LABEL_RE = re.compile(
+    r'Kennel(?: (?:County|Township|Regulations|Acts))?'
+    r'|Inspect(?:ion (?:Date|Action|Category)|ed By)'
+    r'|License (?:Number|Year/Class)'
+    r'|CurrYr: ?(?:Boarding|Breeding|Other|Transfer)'
+    r'|PrevYr: ?(?:Boarding|Breeding|Other|Transfer)'
+    r'|Owner\(s\)|Title|Person Interviewed|Dog Counts|Miscellaneous|Remarks|On Prem|Off Site'
+)
+NUMBER_RE = re.compile(r'(\d+)')
+ITEM_CODE_RE = re.compile(r'^(\d+\.?\d*[a-z]?\.?\d*)\s+(.+)$')
+# Results that end a coded item line, that may stand alone on the next line, and that end a named item line
+CODE_LINE_RESULTS = frozenset(('Satisfactory', 'Unsatisfactory', 'Yes', 'No', 'Not'))
+NEXT_LINE_RESULTS = frozenset(('Satisfactory', 'Unsatisfactory', 'Yes', 'No', 'Not Applicable'))
+NAME_LINE_RESULTS = frozenset(('Satisfactory', 'Unsatisfactory', 'Yes', 'No'))
+# Header fields taken from the first line with their label (same line, else the next one)
+FIRST_VALUE_FIELDS = {
+    'License Number': 'license_number',
+    'Kennel County': 'county',
+    'Kennel Township': 'township',
+    'Inspection Date': 'inspection_date',
+    'Person Interviewed': 'person_interviewed',
+    'Inspection Action': 'inspection_action',
+}
+SECTIONS = ('Kennel Regulations', 'Kennel Acts', 'Miscellaneous')
+NO_LABELS = frozenset()
+
+
+def _tokenize(text: str) -> tuple[Dict[int, set], Dict[str, List[int]]]:
+    """Labels by line index, and line indexes by label (ascending), from one regex sweep.
+
+    'CurrYr:Boarding' style spellings come out as 'CurrYr: Boarding'.
+    """
+    marks, where = {}, {}
+    line, last = 0, 0
+    for match in LABEL_RE.finditer(text):
+        at = match.start()
+        line += text.count('\n', last, at)
+        last = at
+        label = match.group()
+        if label[6:7] == ':' and label[7:8] != ' ':
+            label = label[:7] + ' ' + label[7:]
+        labels = marks.setdefault(line, set())
+        if label not in labels:
+            labels.add(label)
+            where.setdefault(label, []).append(line)
+    return marks, where
+
+
+def _count_line(line: str, labels, first: bool, curr: dict, prev: dict):
+    """Apply one line of the dog counts block (the ten lines from 'CurrYr: Boarding')."""
+    number = NUMBER_RE.search(line)
+    if number is None:
+        return
+    value = int(number.group(1))
+    if 'CurrYr: Breeding' in labels:
+        curr['breeding'] = value
+    elif 'CurrYr: Other' in labels:
+        curr['other'] = value
+    elif 'CurrYr: Transfer' in labels:
+        curr['transfer'] = value
+    elif 'On Prem' in labels:
+        curr['on_prem'] = value
+    elif 'Off Site' in labels:
+        curr['off_site'] = value
+    if 'PrevYr: Boarding' in labels:
+        prev['boarding'] = value
+    elif 'PrevYr: Breeding' in labels:
+        prev['breeding'] = value
+    elif 'PrevYr: Other' in labels:
+        prev['other'] = value
+    elif 'PrevYr: Transfer' in labels:
+        prev['transfer'] = value
+    if first:
+        curr['boarding'] = value
+
+
+def _item(line: str, next_line: Optional[str], section: str) -> Optional[Dict[str, str]]:
+    """An inspection item from a line of the Kennel Regulations/Acts/Miscellaneous tables."""
+    stripped = line.strip()
+    if not stripped:
+        return None
+    code_match = ITEM_CODE_RE.match(stripped)
+    parts = stripped.split()
+    if code_match:
+        code = code_match.group(1)
+        name = code_match.group(2).strip()
+        result = ""
+        if len(parts) >= 3 and parts[-1] in CODE_LINE_RESULTS:
+            if parts[-1] == 'Not' and next_line is not None and 'Applicable' in next_line:
+                result = 'Not Applicable'
+            else:
+                result = parts[-1]
+            name = ' '.join(parts[:-1]).replace(code, '').strip()
+        if not result and next_line is not None and next_line.strip() in NEXT_LINE_RESULTS:
+            result = next_line.strip()
+        if result:
+            return {'section': section, 'code': code, 'name': name, 'result': result}
+    elif len(parts) >= 2:
+        if parts[-1] in NAME_LINE_RESULTS:
+            return {'section': section, 'code': '', 'name': ' '.join(parts[:-1]), 'result': parts[-1]}
+        if parts[-1] == 'Not' and 'Applicable' in line:
+            return {'section': section, 'code': '', 'name': ' '.join(parts[:-2]), 'result': 'Not Applicable'}
+    return None
+
+
+def parse_text_single_pass(text: str) -> Optional[InspectionData]:
+    """Parse pdftotext -layout output of an inspection report in a single pass.
+
+    Extracts exactly what parse_text_legacy() does. One regex sweep finds
+    every label; header fields are read at their labels (looking at most ten
+    lines ahead), and only the dog counts block, the inspection tables and
+    the remarks are walked line by line, each once.
+    """
+    if not text:
+        return None
+
+    lines = text.split('\n')
+    count = len(lines)
+    marks, where = _tokenize(text)
+    data = InspectionData()
+
+    # Header: later occurrences of a label win, except for the first-value fields
+    for i in where.get('Kennel', ()):
+        if i + 1 < count and lines[i].strip() == 'Kennel':
+            for j in range(i + 1, min(i + 10, count)):
+                if 'Owner(s)' in lines[j]:
+                    kennel_lines = [lines[k].strip() for k in range(i + 1, j) if lines[k].strip()]
+                    if kennel_lines:
+                        data.kennel_name = ' '.join(kennel_lines)
+                    break
+    for i in where.get('Owner(s)', ()):
+        for j in range(i + 1, min(i + 5, count)):
+            if lines[j].strip() and 'PA' not in lines[j] and 'Business' not in lines[j]:
+                data.owner_name = lines[j].strip()
+                break
+    for i in where.get('License Year/Class', ()):
+        for j in range(i + 1, min(i + 5, count)):
+            if lines[j].strip() and ':' in lines[j]:
+                data.license_year_class = lines[j].strip()
+                break
+    for i in where.get('Inspected By', ()):
+        if ',' in lines[i]:
+            data.inspector_name = lines[i].split('Inspected By')[1].strip()
+        else:
+            for j in range(i + 1, min(i + 5, count)):
+                if ',' in lines[j]:
+                    data.inspector_name = lines[j].strip()
+                    break
+    for i in where.get('Title', ()):
+        if i + 1 < count and lines[i].strip() == 'Title':
+            data.person_title = lines[i + 1].strip()
+    for label, attr in FIRST_VALUE_FIELDS.items():
+        if label in where:
+            i = where[label][0]
+            value = lines[i].split(label, 1)[1].strip()
+            if not value and i + 1 < count:
+                value = lines[i + 1].strip()
+            if label == 'Inspection Date' and 'Inspected By' in value:
+                value = value.split('Inspected By')[0].strip()
+            setattr(data, attr, value)
+
+    # Dog counts: after 'Dog Counts', the ten lines from 'CurrYr: Boarding' unless a table starts first
+    curr = dict.fromkeys(COUNT_FIELDS, 0)
+    prev = dict.fromkeys(COUNT_FIELDS, 0)
+    if 'Dog Counts' in where:
+        heading = where['Dog Counts'][0]
+        candidates = sorted(
+            i for label in ('CurrYr: Boarding', 'Kennel Regulations', 'Inspection Category')
+            for i in where.get(label, ()) if i > heading and 'Dog Counts' not in marks[i]
+        )
+        if candidates and 'CurrYr: Boarding' in marks[candidates[0]]:
+            start = candidates[0]
+            for j in range(start, min(start + 10, count)):
+                _count_line(lines[j], marks.get(j, NO_LABELS), j == start, curr, prev)
+    data.curr_year_counts, data.prev_year_counts = curr, prev
+
+    # Inspection items: from the first table heading to the Remarks heading
+    headings = where.get('Kennel Regulations', []) + where.get('Kennel Acts', []) + [
+        i for i in where.get('Miscellaneous', ()) if i > 0 and 'Inspection Category' in marks.get(i - 1, NO_LABELS)
+    ]
+    section = None
+    for i in range(min(headings), count) if headings else ():
+        labels = marks.get(i)
+        if labels is not None:
+            if 'Kennel Regulations' in labels:
+                section = 'Kennel Regulations'
+                continue
+            if 'Kennel Acts' in labels:
+                section = 'Kennel Acts'
+                continue
+            if i > 0 and 'Miscellaneous' in labels and 'Inspection Category' in marks.get(i - 1, NO_LABELS):
+                section = 'Miscellaneous'
+                continue
+            if 'Remarks' in labels and 'Inspection Category' not in labels:
+                break
+        item = _item(lines[i], lines[i + 1] if i + 1 < count else None, section)
+        if item is not None:
+            data.inspection_items.append(item)
+
+    # Remarks: everything after the first Remarks heading
+    if 'Remarks' in where:
+        remarks_lines = lines[where['Remarks'][0] + 1:]
+        remarks = '\n'.join(remarks_lines)
+        lowered = remarks.lower()
+        if 'reinspection' in lowered or 're-inspection' in lowered:
+            for line in lowered.split('\n'):
+                if ('reinspection' in line or 're-inspection' in line) and \
+                        ('required' in line or 'will take place' in line):
+                    data.reinspection_required = True
+                    break
+        data.remarks = remarks.strip()
+    for item in data.inspection_items:
+        if 'reinspection' in item['name'].lower() and item['result'].lower() == 'yes':
+            data.reinspection_required = True
+    return data
+
+
+# --- Compact form ---------------------------------------------------------------
+
+# Item sections and results travel as indexes into these tables (anything a
+# report spells differently travels as the string itself)
+RESULT_NAMES = ('Satisfactory', 'Unsatisfactory', 'Yes', 'No', 'Not Applicable', 'Not')
+_SECTION_CODES = {name: index for index, name in enumerate(SECTIONS)}
+_RESULT_CODES = {name: index for index, name in enumerate(RESULT_NAMES)}
+
+
+class CompactInspection(NamedTuple):
+    """InspectionData packed for the trip from an import worker to the importer.
+
+    Header fields keep InspectionData's names; dog counts are tuples in
+    COUNT_FIELDS order (empty when the report had none) and items are
+    (section, code, name, result) tuples with section and result interned
+    as indexes into SECTIONS and RESULT_NAMES. As a tuple of strings, ints
+    and tuples it pickles without any per-field keys.
+    """
+    kennel_name: str
+    owner_name: str
+    license_number: str
+    license_year_class: str
+    county: str
+    township: str
+    inspection_date: str
+    inspector_name: str
+    person_interviewed: str
+    person_title: str
+    inspection_action: str
+    curr_counts: tuple
+    prev_counts: tuple
+    items: tuple
+    remarks: str
+    reinspection_required: bool
+    parser_version: int
+    text_sha256: str
+
+    @classmethod
+    def from_data(cls, data: InspectionData) -> 'CompactInspection':
+        return cls(
+            data.kennel_name, data.owner_name, data.license_number, data.license_year_class,
+            data.county, data.township, data.inspection_date, data.inspector_name,
+            data.person_interviewed, data.person_title, data.inspection_action,
+            _pack_counts(data.curr_year_counts), _pack_counts(data.prev_year_counts),
+            tuple((_SECTION_CODES.get(item['section'], item['section']), item['code'], item['name'],
+                   _RESULT_CODES.get(item['result'], item['result'])) for item in data.inspection_items),
+            data.remarks, data.reinspection_required, data.parser_version, data.text_sha256
+        )
+
+    def item_rows(self) -> List[tuple]:
+        """Items as (section, code, name, result) strings."""
+        return [(SECTIONS[section] if type(section) is int else section, code, name,
+                 RESULT_NAMES[result] if type(result) is int else result)
+                for section, code, name, result in self.items]
+
+    def to_data(self) -> InspectionData:
+        return InspectionData(
+            self.kennel_name, self.owner_name, self.license_number, self.license_year_class,
+            self.county, self.township, self.inspection_date, self.inspector_name,
+            self.person_interviewed, self.person_title, self.inspection_action,
+            dict(zip(COUNT_FIELDS, self.curr_counts)), dict(zip(COUNT_FIELDS, self.prev_counts)),
+            [dict(zip(('section', 'code', 'name', 'result'), row)) for row in self.item_rows()],
+            self.remarks, self.reinspection_required, self.parser_version, self.text_sha256
+        )
+
+
+def _pack_counts(counts: Dict[str, int]) -> tuple:
+    return tuple(counts.get(name, 0) for name in COUNT_FIELDS) if counts else ()
+
+
+def compact(data: Union[InspectionData, CompactInspection, None]) -> Optional[CompactInspection]:
+    """CompactInspection of parsed data (None and CompactInspection pass through)."""
+    if data is None or isinstance(data, CompactInspection):
+        return data
+    return CompactInspection.from_data(data)
+
+
+# --- Parser selection ---------------------------------------------------------
+
+PARSERS = {'single-pass': parse_text_single_pass, 'legacy': parse_text_legacy}
+DEFAULT_PARSER = 'single-pass'
+_parser = DEFAULT_PARSER
+
+
+def set_parser(name: str):
+    """Choose the parser used by parse_inspection_text() ('single-pass' or 'legacy')."""
+    global _parser
+    if name not in PARSERS:
+        raise ValueError(f"PDF parser {name!r} is not available (have: {', '.join(PARSERS)})")
+    _parser = name
+
+
+def current_parser() -> str:
+    return _parser
+
+
+def parse_inspection_text(text: str, parser: str = None) -> Optional[InspectionData]:
+    """Parse pdftotext -layout output of an inspection report with the selected parser, stamped with its provenance."""
+    data = PARSERS[parser or _parser](text)
+    if data is not None:
+        data.parser_version = PARSER_VERSION
+        data.text_sha256 = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return data
+
+
 if __name__ == "__main__":
     # Test with a sample PDF
     import sys
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Content-addressed PDF store for PA Kennel Inspections
+Keeps inspection PDFs in a few large append-only pack files instead of one
+file per inspection. Each PDF is stored once, keyed by its SHA-256, and the
+pdf_blobs table in the database says which pack and offset holds it;
+inspections.pdf_sha256 links an inspection to its PDF.
+
+Index rows are committed in batches, each after an fsync of the packs, so
+a committed row never points at bytes that were not written. A crash can
+lose the last batch of rows but not their bytes: the next writer indexes
+whatever complete records follow the indexed ones (and `reindex` rebuilds
+the whole index from the packs).
+"""
+
+import os
+import struct
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+DB_FILE = "kennel_inspections.db"
+STORE_DIR = Path("pdf_store")
+INSPECTIONS_DIR = Path("kennel_inspections")
+PACK_SIZE = 256 * 1024 * 1024
+COMMIT_EVERY = 64  # index rows per commit
+COMMIT_SECONDS = 2.0  # longest a new index row waits for its commit (checked on each put)
+
+# Each record in a pack: raw SHA-256 digest, body length, body. The header
+# lets rebuild_index() recover the index from the packs alone.
+RECORD_HEADER = struct.Struct('>32sQ')
+
+
+def pack_file(root: Path, pack_id: int) -> Path:
+    """Path of pack `pack_id` in a store rooted at `root`."""
+    return Path(root) / f"pack-{pack_id:05d}.pack"
+
+
+def store_in_use(db_path: str = DB_FILE) -> bool:
+    """True when the database has PDFs in the pack store (so tools should read from it)."""
+    if not Path(db_path).exists():
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute('SELECT EXISTS (SELECT 1 FROM pdf_blobs)').fetchone()
+        return bool(row[0])
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+class PdfStore:
+    """Append-only pack files of PDFs addressed by SHA-256, indexed in SQLite.
+
+    Safe to share between threads of one process; only one process should
+    write to a store at a time, any number may read. Readers (e.g. parser
+    workers) should open it with `readonly`, which creates nothing and never
+    takes the database's write lock.
+    """
+    def __init__(self, root: Path = STORE_DIR, db_path: str = DB_FILE, pack_size: int = PACK_SIZE,
+                 readonly: bool = False):
+        self.root = Path(root)
+        self.db_path = db_path
+        self.pack_size = pack_size
+        self.readonly = readonly
+        self.lock = Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        if readonly:
+            self.conn.execute("PRAGMA query_only = ON")
+        else:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self._create_tables()
+        self._pack_id = None
+        self._pack = None
+        self._readers: dict[int, int] = {}
+        self._pending: dict[str, tuple] = {}  # index rows written to a pack, not committed yet
+        self._pending_since = 0.0
+
+    def _create_tables(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pdf_blobs (
+                sha256 TEXT PRIMARY KEY,
+                pack INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Link inspections to their PDF (the inspections table belongs to scraper.py)
+        cursor.execute("PRAGMA table_info(inspections)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+        if existing_columns and 'pdf_sha256' not in existing_columns:
+            cursor.execute('ALTER TABLE inspections ADD COLUMN pdf_sha256 TEXT')
+        if existing_columns:
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_inspections_sha256 ON inspections(pdf_sha256)')
+
+        self.conn.commit()
+
+    def pack_path(self, pack_id: int) -> Path:
+        return pack_file(self.root, pack_id)
+
+    def pack_ids(self) -> list[int]:
+        return sorted(int(p.stem.split('-')[1]) for p in self.root.glob("pack-*.pack"))
+
+    def _lookup(self, sha256: str) -> Optional[tuple]:
+        pending = self._pending.get(sha256)
+        if pending is not None:
+            return pending
+        return self.conn.execute(
+            'SELECT pack, offset, length FROM pdf_blobs WHERE sha256 = ?', (sha256,)
+        ).fetchone()
+
+    def __contains__(self, sha256: str) -> bool:
+        with self.lock:
+            return self._lookup(sha256) is not None
+
+    def _writable_pack(self, size: int):
+        """Current pack file opened for append, rolling over to a new one when full."""
+        if self._pack is None:
+            self._index_unindexed()
+            ids = self.pack_ids()
+            self._pack_id = ids[-1] if ids else 1
+            self._pack = open(self.pack_path(self._pack_id), 'ab')
+        if self._pack.tell() and self._pack.tell() + RECORD_HEADER.size + size > self.pack_size:
+            self._pack.flush()
+            os.fsync(self._pack.fileno())
+            self._pack.close()
+            self._pack_id += 1
+            self._pack = open(self.pack_path(self._pack_id), 'ab')
+        return self._pack_id, self._pack
+
+    def put(self, data: bytes) -> str:
+        """Store a PDF (once per distinct content) and return its SHA-256 hex digest."""
+        return self._put(data)[0]
+
+    def _put(self, data: bytes) -> tuple[str, bool]:
+        """put() that also says whether the content was new."""
+        if self.readonly:
+            raise PermissionError("PDF store was opened read-only")
+        digest = hashlib.sha256(data)
+        sha256 = digest.hexdigest()
+        with self.lock:
+            if self._pack is None:
+                self._writable_pack(len(data))  # first write: picks up records a crash left unindexed
+            if self._lookup(sha256) is not None:
+                return sha256, False
+            pack_id, f = self._writable_pack(len(data))
+            # Bytes first, index row second: a crash in between leaves only unreferenced bytes
+            offset = f.tell() + RECORD_HEADER.size
+            f.write(RECORD_HEADER.pack(digest.digest(), len(data)))
+            f.write(data)
+            f.flush()
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending[sha256] = (pack_id, offset, len(data))
+            if len(self._pending) >= COMMIT_EVERY or time.monotonic() - self._pending_since >= COMMIT_SECONDS:
+                self._commit_pending()
+        return sha256, True
+
+    def _commit_pending(self):
+        """fsync the pack, then commit the index rows of everything put since the last commit."""
+        if not self._pending:
+            return
+        os.fsync(self._pack.fileno())
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO pdf_blobs (sha256, pack, offset, length) VALUES (?, ?, ?, ?)',
+            [(sha256, *row) for sha256, row in self._pending.items()]
+        )
+        self.conn.commit()
+        self._pending.clear()
+
+    def flush(self):
+        """Make every PDF put so far durable and visible to other processes."""
+        with self.lock:
+            self._commit_pending()
+
+    def _scan_pack(self, pack_id: int, start: int = 0) -> list[tuple]:
+        """(sha256, pack, offset, length) of the intact records in a pack from byte `start` on."""
+        records = []
+        with open(self.pack_path(pack_id), 'rb') as f:
+            f.seek(start)
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                digest, length = RECORD_HEADER.unpack(header)
+                offset = f.tell()
+                data = f.read(length)
+                if len(data) < length:
+                    break  # torn write at the end of the pack
+                if hashlib.sha256(data).digest() == digest:
+                    records.append((digest.hex(), pack_id, offset, length))
+        return records
+
+    def _index_unindexed(self):
+        """Index records appended after the last indexed one (a crash lost their index rows)."""
+        ends = dict(self.conn.execute('SELECT pack, MAX(offset + length) FROM pdf_blobs GROUP BY pack').fetchall())
+        last = max(ends, default=0)
+        records = []
+        for pack_id in self.pack_ids():
+            if pack_id >= last:
+                records += self._scan_pack(pack_id, ends.get(pack_id, 0))
+        if records:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO pdf_blobs (sha256, pack, offset, length) VALUES (?, ?, ?, ?)', records
+            )
+            self.conn.commit()
+
+    def get(self, sha256: str, verify: bool = True) -> Optional[bytes]:
+        """Read a PDF by SHA-256; None if it is unknown or its bytes do not match."""
+        with self.lock:
+            row = self._lookup(sha256)
+            if row is None:
+                return None
+            pack_id, offset, length = row
+            if pack_id not in self._readers:
+                self._readers[pack_id] = os.open(self.pack_path(pack_id), os.O_RDONLY)
+            fd = self._readers[pack_id]
+        data = os.pread(fd, length, offset)
+        if verify and hashlib.sha256(data).hexdigest() != sha256:
+            return None
+        return data
+
+    def link_inspection(self, pdf_path: str, sha256: str):
+        """Point the inspection stored at `pdf_path` at its blob."""
+        with self.lock:
+            self.conn.execute('UPDATE inspections SET pdf_sha256 = ? WHERE pdf_path = ?', (sha256, pdf_path))
+            self.conn.commit()
+
+    def migrate_tree(self, directory: Path = INSPECTIONS_DIR, remove: bool = False, on_file=None) -> dict:
+        """Move a kennel_inspections/ tree into the store (one last directory walk).
+
+        Valid PDFs are packed and their inspections linked by pdf_path; with
+        `remove` the original files are deleted once packed. Both happen a
+        batch at a time, once the batch's index rows are committed.
+        """
+        # Imported here so the store has no hard dependency on scraper.py
+        from scraper import is_valid_pdf
+
+        result = {'files': 0, 'stored': 0, 'duplicates': 0, 'invalid': 0, 'bytes': 0}
+        packed = []  # (file, sha256) waiting for their index rows to be committed
+
+        def settle():
+            with self.lock:
+                self.conn.executemany('UPDATE inspections SET pdf_sha256 = ? WHERE pdf_path = ?',
+                                      [(sha256, str(pdf)) for pdf, sha256 in packed])
+                self.conn.commit()
+            if remove:
+                for pdf, _ in packed:
+                    pdf.unlink()
+            packed.clear()
+
+        for pdf in sorted(Path(directory).glob("**/inspection_*.pdf")):
+            result['files'] += 1
+            if not is_valid_pdf(pdf):
+                result['invalid'] += 1
+                continue
+            data = pdf.read_bytes()
+            sha256, new = self._put(data)
+            if new:
+                result['stored'] += 1
+                result['bytes'] += len(data)
+            else:
+                result['duplicates'] += 1
+            packed.append((pdf, sha256))
+            if not self._pending:
+                settle()
+            if on_file:
+                on_file(pdf)
+        self.flush()
+        settle()
+        return result
+
+    def rebuild_index(self) -> int:
+        """Re-create pdf_blobs by scanning the pack files; returns records indexed."""
+        with self.lock:
+            self._commit_pending()
+        records = [record for pack_id in self.pack_ids() for record in self._scan_pack(pack_id)]
+        with self.lock:
+            self.conn.execute('DELETE FROM pdf_blobs')
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO pdf_blobs (sha256, pack, offset, length) VALUES (?, ?, ?, ?)', records
+            )
+            self.conn.commit()
+        return len(records)
+
+    def count(self) -> int:
+        """Number of distinct PDFs stored."""
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM pdf_blobs').fetchone()[0] + len(self._pending)
+
+    def stats(self) -> dict:
+        """Blob, pack and byte counts, plus how many inspections share a blob."""
+        with self.lock:
+            self._commit_pending()
+            blobs, stored_bytes = self.conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(length), 0) FROM pdf_blobs'
+            ).fetchone()
+            try:
+                linked, distinct = self.conn.execute(
+                    'SELECT COUNT(*), COUNT(DISTINCT pdf_sha256) FROM inspections WHERE pdf_sha256 IS NOT NULL'
+                ).fetchone()
+            except sqlite3.OperationalError:
+                linked = distinct = 0
+        packs = self.pack_ids()
+        return {
+            'blobs': blobs,
+            'bytes': stored_bytes,
+            'packs': len(packs),
+            'pack_bytes': sum(self.pack_path(p).stat().st_size for p in packs),
+            'inspections': linked,
+            'shared': linked - distinct,
+        }
+
+    def close(self):
+        with self.lock:
+            if self._pack is not None:
+                self._commit_pending()
+                self._pack.flush()
+                os.fsync(self._pack.fileno())
+                self._pack.close()
+                self._pack = None
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+
+    parser = argparse.ArgumentParser(description='Manage the packed, content-addressed PDF store')
+    parser.add_argument('command', choices=['stats', 'migrate', 'reindex', 'cat'],
+                        help='stats: show store size; migrate: pack the kennel_inspections/ tree; '
+                             'reindex: rebuild pdf_blobs from the packs; cat: write a PDF to stdout')
+    parser.add_argument('sha256', nargs='?', help='PDF to print (cat)')
+    parser.add_argument('--dir', type=Path, default=INSPECTIONS_DIR, help='Tree to migrate (default: kennel_inspections)')
+    parser.add_argument('--remove', action='store_true', help='Migrate: delete each file once it is packed')
+    parser.add_argument('--store', type=Path, default=STORE_DIR, help='Store directory (default: pdf_store)')
+
+    args = parser.parse_args()
+    store = PdfStore(args.store)
+
+    if args.command == 'cat':
+        data = store.get(args.sha256 or '')
+        if data is None:
+            console.print(f"[red]No PDF {args.sha256} in the store[/red]")
+            sys.exit(1)
+        sys.stdout.buffer.write(data)
+    elif args.command == 'migrate':
+        with console.status("Packing PDFs...") as status:
+            result = store.migrate_tree(args.dir, args.remove,
+                                        on_file=lambda pdf: status.update(f"Packing {pdf.parent.name[:40]}"))
+        console.print(f"[green]✓[/green] {result['files']:,} files: {result['stored']:,} stored "
+                      f"({result['bytes'] / 1_000_000:,.1f} MB), {result['duplicates']:,} duplicates, "
+                      f"{result['invalid']:,} invalid")
+    elif args.command == 'reindex':
+        console.print(f"[green]✓[/green] Indexed {store.rebuild_index():,} PDFs")
+
+    if args.command != 'cat':
+        stats = store.stats()
+        table = Table(title="PDF Store", show_header=True, header_style="bold magenta")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", justify="right", style="green")
+        table.add_row("Distinct PDFs", f"{stats['blobs']:,}")
+        table.add_row("Pack files", f"{stats['packs']:,}")
+        table.add_row("Stored bytes", f"{stats['bytes'] / 1_000_000:,.1f} MB")
+        table.add_row("Pack bytes on disk", f"{stats['pack_bytes'] / 1_000_000:,.1f} MB")
+        table.add_row("Linked inspections", f"{stats['inspections']:,}")
+        table.add_row("Inspections sharing a PDF", f"{stats['shared']:,}")
+        console.print(table)
+    store.close()
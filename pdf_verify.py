@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+PDF integrity verifier for PA Kennel Inspections
+Checks the structure of every stored PDF - %PDF header, startxref pointing
+at an xref table or stream, trailer, %%EOF, page count - in a process pool,
+so corrupt or truncated files are found up front instead of as pdftotext
+timeouts during import. Results are cached in the pdf_checks table (files
+keyed by size and mtime, packed PDFs by SHA-256), so reruns only look at
+what changed. Bad PDFs go onto the pdf_repairs queue, which
+`scraper.py --repair` downloads again.
+"""
+
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pdf_store import pack_file
+
+DB_FILE = "kennel_inspections.db"
+INSPECTIONS_DIR = Path("kennel_inspections")
+TAIL_BYTES = 2048  # %%EOF and startxref must sit this close to the end
+CHUNK_SIZE = 64  # files per task sent to a worker
+
+STARTXREF_RE = re.compile(rb'startxref\s+(\d+)')
+XREF_STREAM_RE = re.compile(rb'\s*\d+\s+\d+\s+obj\b')
+PAGE_RE = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+
+
+class PdfCheck(NamedTuple):
+    """Outcome of a structural check; pages is None when it cannot be counted (compressed objects)."""
+    ok: bool
+    pages: Optional[int]
+    problem: str = ''
+
+
+def check_pdf_bytes(data: bytes) -> PdfCheck:
+    """Check a PDF's header, cross-reference table, trailer and pages."""
+    if not data.startswith(b'%PDF-'):
+        return PdfCheck(False, None, 'no %PDF header')
+    tail = data[-TAIL_BYTES:]
+    if b'%%EOF' not in tail:
+        return PdfCheck(False, None, 'no %%EOF (truncated)')
+    matches = STARTXREF_RE.findall(tail)
+    if not matches:
+        return PdfCheck(False, None, 'no startxref')
+    offset = int(matches[-1])  # the last one wins after incremental updates
+    if offset >= len(data):
+        return PdfCheck(False, None, 'startxref past end of file')
+    at = data[offset:offset + 64]
+    if at.lstrip().startswith(b'xref'):
+        if data.find(b'trailer', offset) < 0:
+            return PdfCheck(False, None, 'no trailer')
+    elif not XREF_STREAM_RE.match(at):
+        return PdfCheck(False, None, 'startxref does not point at an xref')
+    pages = len(PAGE_RE.findall(data))
+    if not pages:
+        # Page objects inside compressed object streams cannot be counted without inflating them
+        if b'/ObjStm' in data:
+            return PdfCheck(True, None)
+        return PdfCheck(False, 0, 'no pages')
+    return PdfCheck(True, pages)
+
+
+def check_files(paths: list[str]) -> list[PdfCheck]:
+    """Check a chunk of PDF files (runs in a worker process)."""
+    results = []
+    for path in paths:
+        try:
+            results.append(check_pdf_bytes(Path(path).read_bytes()))
+        except OSError as e:
+            results.append(PdfCheck(False, None, f'unreadable: {e.strerror}'))
+    return results
+
+
+def check_blobs(records: list[tuple[str, int, int]]) -> list[PdfCheck]:
+    """Check a chunk of packed PDFs given as (pack path, offset, length) (runs in a worker process)."""
+    results = []
+    for pack, offset, length in records:
+        try:
+            with open(pack, 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+        except OSError as e:
+            results.append(PdfCheck(False, None, f'unreadable: {e.strerror}'))
+            continue
+        results.append(check_pdf_bytes(data) if len(data) == length else PdfCheck(False, None, 'pack truncated'))
+    return results
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class PdfVerifier:
+    """Verifies stored PDFs against a results cache and queues the bad ones for repair."""
+    def __init__(self, db_path: str = DB_FILE, workers: Optional[int] = None):
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pdf_checks (
+                key TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                ok INTEGER NOT NULL,
+                pages INTEGER,
+                problem TEXT,
+                checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS pdf_repairs (
+                kennel_id INTEGER NOT NULL,
+                inspection_date TEXT NOT NULL,
+                pdf_url TEXT NOT NULL,
+                pdf_path TEXT,
+                problem TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (kennel_id, inspection_date)
+            );
+        ''')
+
+    def _cached(self, prefix: str) -> dict[str, tuple]:
+        return {key: rest for key, *rest in self.conn.execute(
+            'SELECT key, size, mtime_ns, ok, pages, problem FROM pdf_checks WHERE key LIKE ?', (prefix + '%',)
+        )}
+
+    def _run(self, fn, jobs: list, on_progress=None) -> list[PdfCheck]:
+        """fn over chunks of jobs in the process pool, results in job order."""
+        results = []
+        if not jobs:
+            return results
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in executor.map(fn, _chunks(jobs)):
+                results.extend(chunk)
+                if on_progress:
+                    on_progress(len(chunk))
+        return results
+
+    def _save(self, rows: list[tuple]):
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO pdf_checks (key, size, mtime_ns, ok, pages, problem, checked_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', rows)
+        self.conn.commit()
+
+    def verify_tree(self, directory: Path = INSPECTIONS_DIR, recheck: bool = False,
+                    on_progress=None) -> dict[str, PdfCheck]:
+        """Check every inspection_*.pdf under `directory`; unchanged files come from the cache."""
+        cached = {} if recheck else self._cached('file:')
+        results, todo = {}, []
+        for path in sorted(Path(directory).glob("**/inspection_*.pdf")):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            key = f'file:{path}'
+            hit = cached.get(key)
+            if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+                results[str(path)] = PdfCheck(bool(hit[2]), hit[3], hit[4] or '')
+            else:
+                todo.append((str(path), st.st_size, st.st_mtime_ns))
+        checks = self._run(check_files, [path for path, _, _ in todo], on_progress)
+        for (path, _, _), check in zip(todo, checks):
+            results[path] = check
+        self._save([(f'file:{path}', size, mtime, int(c.ok), c.pages, c.problem)
+                    for (path, size, mtime), c in zip(todo, checks)])
+        return results
+
+    def verify_store(self, store_dir: Path, recheck: bool = False, on_progress=None) -> dict[str, PdfCheck]:
+        """Check every PDF in the pack store, keyed by SHA-256 (whose content never changes)."""
+        try:
+            blobs = self.conn.execute('SELECT sha256, pack, offset, length FROM pdf_blobs').fetchall()
+        except sqlite3.OperationalError:
+            return {}
+        cached = {} if recheck else self._cached('sha256:')
+        results, todo = {}, []
+        for sha256, pack, offset, length in blobs:
+            hit = cached.get(f'sha256:{sha256}')
+            if hit:
+                results[sha256] = PdfCheck(bool(hit[2]), hit[3], hit[4] or '')
+            else:
+                todo.append((sha256, (str(pack_file(store_dir, pack)), offset, length)))
+        checks = self._run(check_blobs, [record for _, record in todo], on_progress)
+        for (sha256, _), check in zip(todo, checks):
+            results[sha256] = check
+        self._save([(f'sha256:{sha256}', record[2], None, int(c.ok), c.pages, c.problem)
+                    for (sha256, record), c in zip(todo, checks)])
+        return results
+
+    def queue_repairs(self, bad_files: dict[str, str], bad_blobs: dict[str, str]) -> tuple[int, int]:
+        """Queue the inspections behind bad files (by pdf_path) and blobs (by pdf_sha256) for re-download.
+
+        A queued blob is dropped from the pack index (its bytes stay behind,
+        unreferenced), otherwise the store would keep deduplicating the
+        re-download against the bad copy. Returns (queued, orphaned):
+        orphaned bad PDFs belong to no inspection row, so there is no URL to
+        fetch them from.
+        """
+        rows, matched = [], set()
+        for column, bad in (('pdf_path', bad_files), ('pdf_sha256', bad_blobs)):
+            for value, problem in bad.items():
+                found = self.conn.execute(
+                    f'SELECT kennel_id, inspection_date, pdf_url, pdf_path FROM inspections WHERE {column} = ?',
+                    (value,)
+                ).fetchall()
+                if found:
+                    matched.add(value)
+                rows.extend((*row, problem) for row in found if row[2])
+        self.conn.executemany('''
+            INSERT INTO pdf_repairs (kennel_id, inspection_date, pdf_url, pdf_path, problem)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(kennel_id, inspection_date) DO UPDATE SET
+                pdf_url = excluded.pdf_url, pdf_path = excluded.pdf_path, problem = excluded.problem,
+                state = 'pending', queued_at = CURRENT_TIMESTAMP
+        ''', rows)
+        dropped = [(sha256,) for sha256 in bad_blobs if sha256 in matched]
+        if dropped:
+            self.conn.executemany('DELETE FROM pdf_blobs WHERE sha256 = ?', dropped)
+            self.conn.executemany("DELETE FROM pdf_checks WHERE key = 'sha256:' || ?", dropped)
+        self.conn.commit()
+        return len(rows), len(bad_files) + len(bad_blobs) - len(matched)
+
+    def close(self):
+        self.conn.close()
+
+
+def known_bad(db_path: str = DB_FILE, source: str = 'tree') -> set[str]:
+    """File paths (source 'tree') or SHA-256s ('pack') whose last check failed, for importers to skip."""
+    prefix = 'file:' if source == 'tree' else 'sha256:'
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute('SELECT key FROM pdf_checks WHERE key LIKE ? AND ok = 0', (prefix + '%',)).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+    return {key[len(prefix):] for (key,) in rows}
+
+
+def pending_repairs(db_path: str = DB_FILE) -> list[tuple]:
+    """(kennel_id, inspection_date, pdf_url, pdf_path) of every queued repair."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT kennel_id, inspection_date, pdf_url, pdf_path FROM pdf_repairs WHERE state = 'pending'"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+
+def finish_repairs(db_path: str = DB_FILE) -> dict[str, int]:
+    """Close queued repairs the crawl frontier has finished ('done' or 'failed'); returns counts by state."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute('''
+            UPDATE pdf_repairs SET state = (
+                SELECT p.state FROM crawl_pdfs p
+                WHERE p.kennel_id = pdf_repairs.kennel_id AND p.inspection_date = pdf_repairs.inspection_date
+            )
+            WHERE state = 'pending' AND EXISTS (
+                SELECT 1 FROM crawl_pdfs p
+                WHERE p.kennel_id = pdf_repairs.kennel_id AND p.inspection_date = pdf_repairs.inspection_date
+                  AND p.state IN ('done', 'failed')
+            )
+        ''')
+        conn.commit()
+        return dict(conn.execute('SELECT state, COUNT(*) FROM pdf_repairs GROUP BY state').fetchall())
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+def quarantine(pdf_path: str) -> bool:
+    """Move a bad file aside (to .pdf.bad) so it is neither reused nor imported; True if moved."""
+    path = Path(pdf_path) if pdf_path else None
+    if path is None or not path.exists():
+        return False
+    path.replace(path.with_suffix(path.suffix + '.bad'))
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from collections import Counter
+    from rich.console import Console
+    from rich.progress import Progress, BarColumn, MofNCompleteColumn, TextColumn, TimeElapsedColumn
+    from rich.table import Table
+
+    console = Console()
+
+    parser = argparse.ArgumentParser(description='Verify stored PDFs and queue bad ones for re-download')
+    parser.add_argument('--dir', type=Path, default=INSPECTIONS_DIR,
+                        help='PDF tree to verify (default: kennel_inspections)')
+    parser.add_argument('--store', type=Path, default=Path('pdf_store'),
+                        help='Pack store to verify (default: pdf_store)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--recheck', action='store_true', help='Ignore cached results')
+    parser.add_argument('--no-queue', action='store_true', help='Report only; do not queue repairs')
+    parser.add_argument('--db', default=DB_FILE, help=f'Database (default: {DB_FILE})')
+
+    args = parser.parse_args()
+    verifier = PdfVerifier(args.db, args.workers)
+
+    started = time.monotonic()
+    with Progress(TextColumn("[progress.description]{task.description}"), BarColumn(), MofNCompleteColumn(),
+                  TimeElapsedColumn(), console=console) as progress:
+        task = progress.add_task("Checking PDFs", total=None)
+        advance = lambda n: progress.advance(task, n)
+        files = verifier.verify_tree(args.dir, args.recheck, advance)
+        blobs = verifier.verify_store(args.store, args.recheck, advance)
+    elapsed = time.monotonic() - started
+
+    bad_files = {path: c.problem for path, c in files.items() if not c.ok}
+    bad_blobs = {sha: c.problem for sha, c in blobs.items() if not c.ok}
+    checked = progress.tasks[task].completed
+
+    table = Table(title="PDF verification", show_header=True, header_style="bold magenta")
+    table.add_column("Source", style="cyan")
+    table.add_column("PDFs", justify="right")
+    table.add_column("OK", justify="right", style="green")
+    table.add_column("Bad", justify="right", style="red")
+    table.add_column("Pages", justify="right")
+    for name, results, bad in (('files', files, bad_files), ('pack store', blobs, bad_blobs)):
+        if results:
+            table.add_row(name, f"{len(results):,}", f"{len(results) - len(bad):,}", f"{len(bad):,}",
+                          f"{sum(c.pages or 0 for c in results.values()):,}")
+    console.print(table)
+    console.print(f"Checked {checked:,} new or changed PDFs in {elapsed:.1f}s "
+                  f"({len(files) + len(blobs) - checked:,} from cache)")
+
+    problems = Counter(list(bad_files.values()) + list(bad_blobs.values()))
+    for problem, count in problems.most_common():
+        console.print(f"  [red]✗[/red] {problem}: {count:,}")
+
+    if (bad_files or bad_blobs) and not args.no_queue:
+        queued, orphaned = verifier.queue_repairs(bad_files, bad_blobs)
+        console.print(f"[yellow]Queued {queued:,} PDFs for re-download[/yellow] - run [cyan]python scraper.py --repair[/cyan]"
+                      + (f"; {orphaned:,} bad PDFs belong to no inspection" if orphaned else ""))
+    verifier.close()
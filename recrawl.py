@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Freshness-aware recrawl scheduling for PA Kennel Inspections
+Estimates how often each kennel is inspected, from its inspection history
+and its status and license, and from that the chance a new report has been
+posted since its details page was last checked. Crawls visit the stalest
+kennels first and, under a request budget, only as many as the budget
+covers.
+"""
+
+import math
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+DB_FILE = "kennel_inspections.db"
+
+# Prior inspections per year by last status; open kennels are inspected about twice a year
+STATUS_RATES = {
+    'Open': 2.0,
+    'Open - Under Suspension': 4.0,
+}
+RECENTLY_CLOSED_RATE = 0.5  # closed, but licensed within the last year: follow-up visits happen
+CLOSED_RATE = 0.05
+UNKNOWN_RATE = 0.5
+BREEDING_FACTOR = 1.5  # BK/CK (breeding) kennels draw more visits than the prior suggests
+
+HISTORY_YEARS = 3.0  # window of inspection history the estimate looks at
+PRIOR_YEARS = 1.0  # weight of the prior, in years of observation
+DAYS_PER_YEAR = 365.25
+
+
+@dataclass
+class KennelForecast:
+    """Expected inspection rate and staleness of one kennel's details page."""
+    kennel_id: int
+    rate: float  # expected inspections per year
+    last_inspection: Optional[datetime]
+    last_checked: Optional[datetime]
+    expected_new: float  # expected reports posted since last_checked
+
+    @property
+    def probability(self) -> float:
+        """Chance at least one new report is waiting (1.0 if the page was never checked)."""
+        if self.last_checked is None:
+            return 1.0
+        return 1 - math.exp(-self.expected_new)
+
+    @property
+    def next_due(self) -> Optional[datetime]:
+        """Expected date of the next inspection."""
+        if self.last_inspection is None or self.rate <= 0:
+            return None
+        return self.last_inspection + timedelta(days=DAYS_PER_YEAR / self.rate)
+
+
+@dataclass
+class RecrawlPlan:
+    """Kennels chosen for this run, with their priority, and what the choice costs and covers."""
+    priorities: dict[int, float]  # kennel_id -> probability of a new report
+    skipped: int
+    expected_requests: float
+    expected_new: float  # expected new reports among the chosen kennels
+    total_expected_new: float  # ... among all known kennels
+    budget: Optional[int]
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an inspection date (MM/DD/YYYY) or SQLite timestamp; None if it is neither."""
+    if not value:
+        return None
+    for fmt in ('%m/%d/%Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def prior_rate(status: str, license_year: str, license_class: str, now: datetime) -> float:
+    """Inspections per year expected from status and license alone."""
+    status = (status or '').strip()
+    if status in STATUS_RATES:
+        rate = STATUS_RATES[status]
+    elif status.startswith('Closed'):
+        year = int(license_year) if (license_year or '').isdigit() else 0
+        rate = RECENTLY_CLOSED_RATE if year >= now.year - 1 else CLOSED_RATE
+    else:
+        rate = UNKNOWN_RATE
+    if status.startswith('Open') and (license_class or '').startswith(('BK', 'CK')):
+        rate *= BREEDING_FACTOR
+    return rate
+
+
+def estimate_rate(prior: float, inspections: list[datetime], now: datetime) -> float:
+    """Gamma-Poisson estimate: the prior counts as PRIOR_YEARS of observation at its rate."""
+    window_start = now.timestamp() - HISTORY_YEARS * DAYS_PER_YEAR * 86400
+    recent = [d for d in inspections if d.timestamp() >= window_start]
+    if inspections:
+        observed = min(HISTORY_YEARS, (now - min(inspections)).days / DAYS_PER_YEAR)
+    else:
+        observed = 0.0
+    return (prior * PRIOR_YEARS + len(recent)) / (PRIOR_YEARS + observed)
+
+
+def forecast_kennels(db_path: str = DB_FILE, now: Optional[datetime] = None,
+                     counties: Optional[set[str]] = None) -> dict[int, KennelForecast]:
+    """Forecast every kennel in the database (or in `counties`, by name), keyed by kennel_id."""
+    now = now or datetime.now()
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(kennels)")}
+    checked = 'COALESCE(checked_at, updated_at)' if 'checked_at' in columns else 'updated_at'
+    kennels = conn.execute(f'''
+        SELECT kennel_id, last_status, last_issued_license_year, last_license_class, {checked}, county
+        FROM kennels
+    ''').fetchall()
+    history: dict[int, list[datetime]] = {}
+    for kennel_id, inspection_date in conn.execute('SELECT kennel_id, inspection_date FROM inspections'):
+        date = parse_date(inspection_date)
+        if date:
+            history.setdefault(kennel_id, []).append(date)
+    conn.close()
+
+    forecasts = {}
+    for kennel_id, status, license_year, license_class, checked_at, county in kennels:
+        if counties is not None and (county or '').upper() not in counties:
+            continue
+        inspections = history.get(kennel_id, [])
+        rate = estimate_rate(prior_rate(status, license_year, license_class, now), inspections, now)
+        last_checked = parse_date(checked_at)
+        # SQLite timestamps are UTC; the difference is negligible at this scale
+        years = max(0.0, (now - last_checked).days / DAYS_PER_YEAR) if last_checked else 0.0
+        forecasts[kennel_id] = KennelForecast(
+            kennel_id=kennel_id,
+            rate=rate,
+            last_inspection=max(inspections) if inspections else None,
+            last_checked=last_checked,
+            expected_new=rate * years
+        )
+    return forecasts
+
+
+def plan_recrawl(forecasts: dict[int, KennelForecast], budget: Optional[int] = None,
+                 search_requests: int = 0) -> RecrawlPlan:
+    """Pick kennels in order of staleness until the request budget is spent.
+
+    A kennel costs one details request plus its expected new PDFs; the county
+    searches (`search_requests`) come off the budget first. Without a budget
+    every kennel is chosen and only the order matters.
+    """
+    ranked = sorted(forecasts.values(), key=lambda f: (-f.probability, -f.expected_new, f.kennel_id))
+    remaining = None if budget is None else budget - search_requests
+    priorities = {}
+    expected_requests = float(search_requests)
+    expected_new = 0.0
+    for forecast in ranked:
+        cost = 1 + forecast.expected_new
+        if remaining is not None and cost > remaining:
+            break
+        priorities[forecast.kennel_id] = forecast.probability
+        expected_requests += cost
+        expected_new += forecast.expected_new
+        if remaining is not None:
+            remaining -= cost
+
+    return RecrawlPlan(
+        priorities=priorities,
+        skipped=len(forecasts) - len(priorities),
+        expected_requests=expected_requests,
+        expected_new=expected_new,
+        total_expected_new=sum(f.expected_new for f in forecasts.values()),
+        budget=budget
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+
+    parser = argparse.ArgumentParser(description='Show which kennels a budgeted recrawl would visit')
+    parser.add_argument('--budget', type=int, help='Requests per run (default: unlimited)')
+    parser.add_argument('--counties', type=int, default=67, help='County searches in the run (default: 67)')
+    parser.add_argument('--top', type=int, default=20, help='Kennels to list (default: 20)')
+    parser.add_argument('--db', default=DB_FILE, help=f'Database (default: {DB_FILE})')
+
+    args = parser.parse_args()
+
+    forecasts = forecast_kennels(args.db)
+    plan = plan_recrawl(forecasts, args.budget, args.counties)
+
+    table = Table(title="Stalest kennels", show_header=True, header_style="bold magenta")
+    table.add_column("Kennel", justify="right", style="cyan")
+    table.add_column("Inspections/yr", justify="right")
+    table.add_column("Last inspection")
+    table.add_column("Next due")
+    table.add_column("Last checked")
+    table.add_column("P(new report)", justify="right", style="green")
+    for kennel_id in list(plan.priorities)[:args.top]:
+        f = forecasts[kennel_id]
+        table.add_row(
+            str(kennel_id),
+            f"{f.rate:.2f}",
+            f.last_inspection.strftime('%Y-%m-%d') if f.last_inspection else "",
+            f.next_due.strftime('%Y-%m-%d') if f.next_due else "",
+            f.last_checked.strftime('%Y-%m-%d') if f.last_checked else "never",
+            f"{f.probability:.0%}"
+        )
+    console.print(table)
+
+    covered = plan.expected_new / plan.total_expected_new if plan.total_expected_new else 1.0
+    console.print(
+        f"Visiting [cyan]{len(plan.priorities):,}[/cyan] of {len(forecasts):,} kennels "
+        f"(~{plan.expected_requests:,.0f} requests"
+        + (f" of a {plan.budget:,} budget" if plan.budget else "") + ") "
+        f"covers [green]{covered:.0%}[/green] of the ~{plan.total_expected_new:,.1f} expected new reports"
+    )
@@ -17,8 +17,8 @@ fi
 cd /Users/jjustinwilson/Desktop/kennel
 source venv/bin/activate
 
-# Get total PDF count
-TOTAL=$(find kennel_inspections -name "*.pdf" -type f | wc -l | tr -d ' ')
+# Get total PDF count (the pack store index when in use, else the kennel_inspections tree)
+TOTAL=$(python import_pdfs.py --count)
 echo "=========================================="
 echo "PA Kennel Inspection Batch Import"
 echo "=========================================="
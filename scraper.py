@@ -8,17 +8,22 @@ Runs with parallel workers and terminal UI.
 
 import os
 import re
+import random
+import hashlib
 import sys
 import time
+import queue
+import socket
 import sqlite3
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import BaseAdapter
 from urllib.parse import urljoin
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
-from dataclasses import dataclass
-from typing import Optional
+from threading import Lock, Thread, Event
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Optional
 from rich.console import Console
 from rich.progress import (
     Progress, 
@@ -33,10 +38,37 @@ from rich.panel import Panel
 from rich.table import Table
 from rich import print as rprint
 
+import html_backends
+from frontier import Frontier
+from pdf_store import PdfStore, STORE_DIR
+from telemetry import Telemetry, get_telemetry, use_telemetry, request_attempt, url_kind
+from recrawl import forecast_kennels, plan_recrawl
+from listings import CountyListings
+from parse_pool import ParsePool, StageClock
+from html_archive import HtmlArchive, get_archive, use_archive, search_key
+from pdf_verify import pending_repairs, finish_repairs, quarantine
+from pdf_parser import InspectionData, CompactInspection, compact, parse_inspection_bytes
+from db_importer import (
+    update_database_schema,
+    get_inspection_id_by_kennel_date,
+    update_inspection_metadata,
+    insert_dog_counts,
+    insert_inspection_items
+)
+
 BASE_URL = "https://www.pda.pa.gov"
-SEARCH_URL = f"{BASE_URL}/PADogLawPublicKennelInspectionSearch/KennelInspections/Index/SearchForm"
+SEARCH_PATH = "/PADogLawPublicKennelInspectionSearch/KennelInspections/Index/SearchForm"
+SEARCH_URL = f"{BASE_URL}{SEARCH_PATH}"
 OUTPUT_DIR = Path("kennel_inspections")
 DB_FILE = "kennel_inspections.db"
+SEARCH_WORKERS = 4
+DOWNLOAD_RETRIES = 3
+SEARCH_RETRIES = 3
+DB_LOCK_RETRIES = 5  # attempts at a batch while another connection holds the database lock
+PDF_HEADER = b"%PDF"
+PDF_TRAILER = b"%%EOF"
+PDF_TRAILER_WINDOW = 1024  # %%EOF must appear within this many bytes of the end
+SEARCH_INTERVAL = 0.3  # initial spacing for county searches when no limiter is shared in
 
 # County mapping from the HTML dropdown (value -> name)
 COUNTIES = {
@@ -75,6 +107,36 @@ class KennelDetails:
     details_url: str
 
 
+@dataclass
+class PageValidators:
+    """Cache validators for a kennel details page, used by delta crawls."""
+    etag: str = ""
+    last_modified: str = ""
+    content_hash: str = ""
+
+
+@dataclass
+class KennelPage:
+    """Result of fetching a kennel details page."""
+    details: Optional[KennelDetails]
+    pdfs: list[dict]
+    validators: PageValidators
+    unchanged: bool = False
+
+
+@dataclass
+class PdfOutput:
+    """Where downloaded PDF bytes go, and whether they are parsed on the fly.
+    
+    Without one (None) each PDF is downloaded straight to its own file under
+    OUTPUT_DIR, the original layout.
+    """
+    store: Optional[PdfStore] = None  # packed content-addressed store; None = file per PDF under OUTPUT_DIR
+    archive: bool = True  # keep the PDF at all (the pipeline may drop it once parsed)
+    parse: bool = False  # pipeline: parse and import each PDF as it downloads
+    done: set = field(default_factory=set)  # (kennel_id, inspection_date) with nothing left to do
+
+
 # Thread-safe locks
 db_lock = Lock()
 print_lock = Lock()
@@ -130,6 +192,19 @@ def init_database():
         )
     ''')
     
+    # Details page validators for conditional requests, and when the page was last
+    # fully checked (for recrawl scheduling) - added after the initial schema
+    cursor.execute("PRAGMA table_info(kennels)")
+    existing_columns = {row[1] for row in cursor.fetchall()}
+    for column_name in ('etag', 'last_modified', 'content_hash', 'checked_at'):
+        if column_name not in existing_columns:
+            cursor.execute(f'ALTER TABLE kennels ADD COLUMN {column_name} TEXT')
+    
+    # SHA-256 of the PDF in the pack store (see pdf_store.py)
+    cursor.execute("PRAGMA table_info(inspections)")
+    if 'pdf_sha256' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute('ALTER TABLE inspections ADD COLUMN pdf_sha256 TEXT')
+    
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_kennels_county ON kennels(county)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_kennels_license ON kennels(license_number)')
     
@@ -137,45 +212,336 @@ def init_database():
     conn.close()
 
 
+@dataclass(frozen=True)
+class Upsert:
+    """Insert-or-update of a table's rows that keeps existing rows (and their ids) in place.
+    
+    New keys are inserted; an existing row is updated only when one of its
+    columns differs, so re-writing unchanged rows writes nothing. Columns in
+    `keep_if_null` keep their stored value when the new one is NULL, and
+    `on_change` is extra SET SQL for rows that did change.
+    """
+    table: str
+    key: tuple[str, ...]
+    columns: tuple[str, ...]  # parameter order, key columns included
+    keep_if_null: tuple[str, ...] = ()
+    on_change: str = ''
+    
+    @property
+    def insert_sql(self) -> str:
+        params = ', '.join(f'?{i}' for i in range(1, len(self.columns) + 1))
+        return (f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({params}) "
+                f"ON CONFLICT({', '.join(self.key)}) DO NOTHING")
+    
+    @property
+    def update_sql(self) -> str:
+        sets, changed = [], []
+        for i, column in enumerate(self.columns, 1):
+            if column in self.key:
+                continue
+            if column in self.keep_if_null:
+                sets.append(f"{column} = COALESCE(?{i}, {column})")
+                changed.append(f"(?{i} IS NOT NULL AND {column} IS NOT ?{i})")
+            else:
+                sets.append(f"{column} = ?{i}")
+                changed.append(f"{column} IS NOT ?{i}")
+        if self.on_change:
+            sets.append(self.on_change)
+        where = ' AND '.join(f"{column} = ?{self.columns.index(column) + 1}" for column in self.key)
+        return f"UPDATE {self.table} SET {', '.join(sets)} WHERE {where} AND ({' OR '.join(changed)})"
+    
+    def write(self, conn, rows: list[tuple]) -> tuple[int, int]:
+        """Upsert rows; returns (inserted, updated), the rest were unchanged."""
+        inserted = conn.executemany(self.insert_sql, rows).rowcount
+        updated = conn.executemany(self.update_sql, rows).rowcount
+        return inserted, updated
+
+
+KENNEL_UPSERT = Upsert(
+    table='kennels',
+    key=('kennel_id',),
+    columns=('kennel_id', 'name', 'address', 'city', 'state', 'zip_code', 'county', 'township',
+             'license_number', 'last_status', 'last_issued_license_year', 'last_license_class', 'details_url'),
+    on_change='updated_at = CURRENT_TIMESTAMP'
+)
+
+# A save without a SHA-256 (e.g. a PDF written to its own file) leaves a stored one alone
+INSPECTION_UPSERT = Upsert(
+    table='inspections',
+    key=('kennel_id', 'inspection_date'),
+    columns=('kennel_id', 'inspection_date', 'pdf_url', 'pdf_path', 'downloaded', 'pdf_sha256'),
+    keep_if_null=('pdf_sha256',)
+)
+
+VALIDATORS_SQL = '''
+    UPDATE kennels SET etag = ?, last_modified = ?, content_hash = ?, checked_at = CURRENT_TIMESTAMP
+    WHERE kennel_id = ?
+'''
+
+CHECKED_SQL = '''
+    UPDATE kennels SET checked_at = CURRENT_TIMESTAMP WHERE kennel_id = ?
+'''
+
+
+def kennel_row(kennel: KennelDetails) -> tuple:
+    """Parameters for KENNEL_UPSERT."""
+    return (
+        kennel.kennel_id, kennel.name, kennel.address, kennel.city, 
+        kennel.state, kennel.zip_code, kennel.county, kennel.township,
+        kennel.license_number, kennel.last_status, kennel.last_issued_license_year,
+        kennel.last_license_class, kennel.details_url
+    )
+
+
+def inspection_row(kennel_id: int, inspection_date: str, pdf_url: str, pdf_path: str, downloaded: bool,
+                   pdf_sha256: Optional[str] = None) -> tuple:
+    """Parameters for INSPECTION_UPSERT."""
+    return (kennel_id, inspection_date, pdf_url, pdf_path, 1 if downloaded else 0, pdf_sha256)
+
+
+def validators_row(kennel_id: int, validators: PageValidators) -> tuple:
+    """Parameters for VALIDATORS_SQL."""
+    return (validators.etag, validators.last_modified, validators.content_hash, kennel_id)
+
+
 def save_kennel_to_db(kennel: KennelDetails):
     """Save kennel details to database."""
+    with db_lock:
+        conn = sqlite3.connect(DB_FILE)
+        
+        KENNEL_UPSERT.write(conn, [kennel_row(kennel)])
+        
+        conn.commit()
+        conn.close()
+
+
+def save_page_validators(kennel_id: int, validators: PageValidators):
+    """Record the validators of a fully processed details page."""
     with db_lock:
         conn = sqlite3.connect(DB_FILE)
         cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO kennels 
-            (kennel_id, name, address, city, state, zip_code, county, township,
-             license_number, last_status, last_issued_license_year, last_license_class, 
-             details_url, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ''', (
-            kennel.kennel_id, kennel.name, kennel.address, kennel.city, 
-            kennel.state, kennel.zip_code, kennel.county, kennel.township,
-            kennel.license_number, kennel.last_status, kennel.last_issued_license_year,
-            kennel.last_license_class, kennel.details_url
-        ))
+        cursor.execute(VALIDATORS_SQL, validators_row(kennel_id, validators))
         
         conn.commit()
         conn.close()
 
 
+def load_page_validators() -> dict[int, PageValidators]:
+    """Load stored details page validators for every kennel, keyed by kennel_id."""
+    conn = sqlite3.connect(DB_FILE)
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT kennel_id, etag, last_modified, content_hash FROM kennels
+        WHERE content_hash IS NOT NULL
+    ''')
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return {
+        kennel_id: PageValidators(etag or "", last_modified or "", content_hash or "")
+        for kennel_id, etag, last_modified, content_hash in rows
+    }
+
+
+def load_imported_inspections() -> set[tuple[int, str]]:
+    """(kennel_id, inspection_date) of inspections whose PDF has already been parsed."""
+    conn = sqlite3.connect(DB_FILE)
+    rows = conn.execute(
+        'SELECT kennel_id, inspection_date FROM inspections WHERE inspector_name IS NOT NULL'
+    ).fetchall()
+    conn.close()
+    return {(kennel_id, inspection_date) for kennel_id, inspection_date in rows}
+
+
+def load_stored_inspections() -> set[tuple[int, str]]:
+    """(kennel_id, inspection_date) of inspections whose PDF is in the pack store."""
+    conn = sqlite3.connect(DB_FILE)
+    rows = conn.execute('''
+        SELECT i.kennel_id, i.inspection_date FROM inspections i
+        JOIN pdf_blobs b ON b.sha256 = i.pdf_sha256
+    ''').fetchall()
+    conn.close()
+    return {(kennel_id, inspection_date) for kennel_id, inspection_date in rows}
+
+
+def import_parsed_inspection(cursor: sqlite3.Cursor, kennel_id: int, inspection_date: str, data: CompactInspection):
+    """Attach parsed PDF data to an inspection row (run by the DB writer, after the row itself)."""
+    inspection_id = get_inspection_id_by_kennel_date(cursor, kennel_id, inspection_date)
+    if inspection_id:
+        update_inspection_metadata(cursor, inspection_id, data)
+        insert_dog_counts(cursor, inspection_id, data)
+        insert_inspection_items(cursor, inspection_id, data)
+
+
 def save_inspection_to_db(kennel_id: int, inspection_date: str, pdf_url: str, pdf_path: str, downloaded: bool):
     """Save inspection record to database."""
     with db_lock:
         conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO inspections 
-            (kennel_id, inspection_date, pdf_url, pdf_path, downloaded)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (kennel_id, inspection_date, pdf_url, pdf_path, 1 if downloaded else 0))
+        INSPECTION_UPSERT.write(conn, [inspection_row(kennel_id, inspection_date, pdf_url, pdf_path, downloaded)])
         
         conn.commit()
         conn.close()
 
 
+class DBWriter:
+    """Single writer thread that batches kennel and inspection rows into SQLite.
+    
+    Workers enqueue rows without touching the database; the writer drains the
+    queue into one long-lived WAL connection and commits every `batch_size`
+    rows (or every `flush_interval` seconds when traffic is light). Rows are
+    written in the order they were queued, so a kennel's validators always land
+    after the kennel row itself. Besides SQL rows the queue accepts Upserts,
+    whose inserted/updated/unchanged rows are counted per table in
+    `row_counts`, and functions called as fn(cursor, *params), used for
+    multi-statement imports.
+    
+    A batch that hits a locked database is retried with backoff; one that
+    fails otherwise is written again row by row, so a bad row only loses
+    itself. Rows lost that way are counted in `rows_dropped` (and `stats`).
+    """
+    def __init__(self, db_path: str = DB_FILE, batch_size: int = 500, flush_interval: float = 1.0,
+                 on_flush=None, stats: Optional['Stats'] = None):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.stats = stats
+        self.queue = queue.Queue()
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.row_counts: dict[str, dict[str, int]] = {}
+        self.thread = Thread(target=self._run, name="db-writer", daemon=True)
+    
+    @property
+    def depth(self) -> int:
+        """Rows waiting to be written."""
+        return self.queue.qsize()
+    
+    def start(self) -> "DBWriter":
+        self.thread.start()
+        return self
+    
+    def save_kennel(self, kennel: KennelDetails):
+        self.queue.put((KENNEL_UPSERT, kennel_row(kennel)))
+    
+    def save_inspection(self, kennel_id: int, inspection_date: str, pdf_url: str, pdf_path: str, downloaded: bool,
+                        pdf_sha256: Optional[str] = None):
+        self.queue.put((INSPECTION_UPSERT, inspection_row(kennel_id, inspection_date, pdf_url, pdf_path, downloaded,
+                                                       pdf_sha256)))
+    
+    def save_validators(self, kennel_id: int, validators: PageValidators):
+        self.queue.put((VALIDATORS_SQL, validators_row(kennel_id, validators)))
+    
+    def mark_checked(self, kennel_id: int):
+        """Record that a kennel's page was found unchanged (saving validators also marks it)."""
+        self.queue.put((CHECKED_SQL, (kennel_id,)))
+    
+    def save_inspection_data(self, kennel_id: int, inspection_date: str, data: InspectionData):
+        """Queue parsed PDF data; must follow the save_inspection() for the same PDF."""
+        self.queue.put((import_parsed_inspection, (kennel_id, inspection_date, compact(data))))
+    
+    def close(self):
+        """Flush everything still queued and stop the writer thread."""
+        self.queue.put(None)
+        self.thread.join()
+    
+    def rows_summary(self) -> str:
+        """Row counts per table, e.g. 'kennels 3 inserted, 1 updated, 420 unchanged'."""
+        summary = '; '.join(
+            f"{table} {c['inserted']} inserted, {c['updated']} updated, {c['unchanged']} unchanged"
+            for table, c in sorted(self.row_counts.items())
+        ) or 'none'
+        return summary + (f"; [red]{self.rows_dropped} dropped after errors[/red]" if self.rows_dropped else "")
+    
+    def _write(self, conn: sqlite3.Connection, batch: list):
+        # executemany over each run of consecutive rows that share a statement
+        counts = []
+        run_start = 0
+        for i in range(1, len(batch) + 1):
+            if i == len(batch) or batch[i][0] != batch[run_start][0]:
+                statement = batch[run_start][0]
+                rows = [params for _, params in batch[run_start:i]]
+                if isinstance(statement, Upsert):
+                    inserted, updated = statement.write(conn, rows)
+                    counts.append((statement.table, inserted, updated, len(rows) - inserted - updated))
+                elif callable(statement):
+                    cursor = conn.cursor()
+                    for params in rows:
+                        statement(cursor, *params)
+                else:
+                    conn.executemany(statement, rows)
+                run_start = i
+        conn.commit()
+        self.rows_written += len(batch)
+        for table, inserted, updated, unchanged in counts:
+            c = self.row_counts.setdefault(table, {'inserted': 0, 'updated': 0, 'unchanged': 0})
+            c['inserted'] += inserted
+            c['updated'] += updated
+            c['unchanged'] += unchanged
+    
+    def _commit(self, conn: sqlite3.Connection, batch: list) -> Optional[sqlite3.Error]:
+        """Write a batch, waiting out a locked database; returns the error that stopped it, if any."""
+        for attempt in range(DB_LOCK_RETRIES + 1):
+            try:
+                self._write(conn, batch)
+                return None
+            except sqlite3.Error as e:
+                conn.rollback()
+                locked = isinstance(e, sqlite3.OperationalError) and 'locked' in str(e)
+                if not locked or attempt == DB_LOCK_RETRIES:
+                    return e
+            time.sleep(backoff_delay(attempt, base=0.5, cap=10.0))
+    
+    def _flush(self, conn: sqlite3.Connection, batch: list):
+        error = self._commit(conn, batch)
+        if error is None:
+            return
+        errors = [error]
+        if len(batch) > 1:
+            log(f"[yellow]DB writer error, writing {len(batch)} rows one at a time: {error}[/yellow]")
+            errors = [e for e in (self._commit(conn, [item]) for item in batch) if e is not None]
+        for e in errors:
+            log(f"[red]DB writer dropped a row: {e}[/red]")
+        self.rows_dropped += len(errors)
+        if self.stats is not None:
+            self.stats.add(rows_dropped=len(errors))
+    
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            
+            batch = []
+            while True:
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if batch:
+                self._flush(conn, batch)
+            if self.on_flush:
+                self.on_flush(self)
+        
+        conn.close()
+
+
 def sanitize_filename(name: str) -> str:
     """Remove or replace characters that are invalid in filenames."""
     sanitized = re.sub(r'[<>:"/\\|?*]', '_', name)
@@ -183,9 +549,165 @@ def sanitize_filename(name: str) -> str:
     return sanitized[:100] if len(sanitized) > 100 else sanitized
 
 
-def create_session() -> requests.Session:
-    """Create a requests session with appropriate headers."""
-    session = requests.Session()
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe token bucket whose rate adapts AIMD-style to server health.
+    
+    Every request reserves a token before it is sent (`sent` counts them) and
+    reports its outcome afterwards. Fast successful responses raise the rate additively; a 429,
+    a 5xx, a timeout or a response much slower than the running average cuts
+    it multiplicatively, at most once per `cooldown` seconds. Retry-After
+    pauses the bucket entirely until the server says it is ready again.
+    Running averages are kept per URL class (telemetry.url_kind), so a PDF
+    timed to its last byte is only ever compared with other PDFs.
+    """
+    def __init__(self, rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 10.0,
+                 increase: float = 0.2, decrease: float = 0.5, latency_factor: float = 2.0,
+                 burst: float = 1.0, cooldown: float = 1.0):
+        self.lock = Lock()
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.burst = burst
+        self.cooldown = cooldown
+        self._rate = min(max(rate, min_rate), max_rate)
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.latency_avgs: dict[str, float] = {}
+        self.sent = 0
+    
+    @property
+    def rate(self) -> float:
+        """Current permitted requests per second."""
+        return self._rate
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self._rate)
+        self.updated = now
+    
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before sending."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.sent += 1
+            wait = -self.tokens / self._rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+    
+    def acquire(self):
+        """Block until the next request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    def record(self, status: Optional[int], latency: float, retry_after: Optional[float] = None,
+               kind: str = ''):
+        """Report a finished request of URL class `kind`; status None means a timeout or connection error."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            
+            failed = status is None or status == 429 or status >= 500
+            average = self.latency_avgs.get(kind)
+            slow = average is not None and latency > average * self.latency_factor
+            
+            if failed or slow:
+                if now - self.last_decrease >= self.cooldown:
+                    self._rate = max(self.min_rate, self._rate * self.decrease)
+                    self.last_decrease = now
+            else:
+                self._rate = min(self.max_rate, self._rate + self.increase)
+            
+            if not failed:
+                self.latency_avgs[kind] = latency if average is None else 0.8 * average + 0.2 * latency
+
+
+class LimitedSession(requests.Session):
+    """requests.Session that paces every request through an AdaptiveRateLimiter.
+    
+    Every request is also reported to the active Telemetry, if any (see
+    telemetry.py). Streamed responses are timed to their headers and sized
+    by Content-Length, since their body is read later by the caller.
+    """
+    def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None):
+        super().__init__()
+        self.limiter = limiter
+    
+    def request(self, method, url, *args, **kwargs):
+        if self.limiter:
+            self.limiter.acquire()
+        telemetry = get_telemetry()
+        kind = telemetry.request_started(url) if telemetry else None
+        started = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            latency = time.monotonic() - started
+            if self.limiter:
+                self.limiter.record(None, latency, kind=url_kind(url))
+            if telemetry:
+                telemetry.request_finished(kind, method, url, None, 0, latency, type(e).__name__)
+            raise
+        latency = time.monotonic() - started
+        if self.limiter:
+            self.limiter.record(
+                response.status_code,
+                latency,
+                parse_retry_after(response.headers.get('Retry-After')),
+                url_kind(url)
+            )
+        if telemetry:
+            length = response.headers.get('Content-Length')
+            nbytes = int(length) if length and length.isdigit() else (0 if kwargs.get('stream') else len(response.content))
+            telemetry.request_finished(kind, method, url, response.status_code, nbytes, latency)
+        return response
+
+
+# Factory for the requests adapter every new session is mounted on (see transport.py)
+_transport_factory: Optional[Callable[[], BaseAdapter]] = None
+
+
+def use_transport(factory: Optional[Callable[[], BaseAdapter]]):
+    """Route sessions created from now on through `factory()`; None restores plain HTTP."""
+    global _transport_factory
+    _transport_factory = factory
+
+
+def create_session(limiter: Optional[AdaptiveRateLimiter] = None) -> requests.Session:
+    """Create a requests session with appropriate headers.
+    
+    With a limiter, every request the session makes is rate limited and its
+    outcome fed back into the limiter; either way requests are reported to
+    the active Telemetry. A transport set with use_transport()
+    (record, replay or forward) is mounted for both http and https.
+    """
+    session = LimitedSession(limiter)
+    if _transport_factory:
+        adapter = _transport_factory()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -194,11 +716,9 @@ def create_session() -> requests.Session:
     return session
 
 
-def search_county(session: requests.Session, county_id: int) -> list[dict]:
-    """Search for all kennels in a specific county."""
-    kennels = []
-    
-    data = {
+def search_form_data(county_id: int) -> dict:
+    """Form fields for a county-wide kennel search."""
+    return {
         'County': county_id,
         'KennelType': '',
         'LicenseNumber': '',
@@ -208,45 +728,162 @@ def search_county(session: requests.Session, county_id: int) -> list[dict]:
         'City': '',
         'ZipCode': ''
     }
+
+
+def parse_search_results(html: str, county_id: int, base_url: str = BASE_URL) -> list[dict]:
+    """Extract kennel rows from a county search results page."""
+    kennels = []
     
-    try:
-        response = session.post(SEARCH_URL, data=data, timeout=30)
-        response.raise_for_status()
+    for row in html_backends.search_rows(html):
+        kennel_name = row.kennel_info.split('\n')[0].split('  ')[0].strip()
+        kennels.append({
+            'kennel_id': int(row.href.split('/')[-1]),
+            'license_number': row.license_number,
+            'name': kennel_name,
+            'status': row.status,
+            'details_url': urljoin(base_url, row.href),
+            'county_id': county_id,
+            'county_name': COUNTIES.get(county_id, f"County_{county_id}")
+        })
+    
+    return kennels
+
+
+def search_county(session: requests.Session, county_id: int, retries: int = SEARCH_RETRIES) -> Optional[list[dict]]:
+    """Search for all kennels in a specific county.
+    
+    Failures are retried with jittered exponential backoff like
+    download_pdf(). Returns None once every attempt failed, so a search that
+    never came back is not mistaken for a county without kennels.
+    """
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff_delay(attempt - 1))
+        try:
+            with request_attempt(attempt):
+                response = session.post(SEARCH_URL, data=search_form_data(county_id), timeout=30)
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            error = e
+            if 400 <= e.response.status_code < 500 and e.response.status_code not in (408, 429):
+                break
+            continue
+        except requests.RequestException as e:
+            error = e
+            continue
+        
+        archive = get_archive()
+        if archive is not None:
+            archive.put('search', search_key(SEARCH_URL, county_id), SEARCH_URL, response.content,
+                        {'county_id': county_id})
+        return parse_search_results(response.text, county_id)
+    
+    log(f"  [red]✗[/red] Error searching {COUNTIES.get(county_id, f'County_{county_id}')}: {error}")
+    return None
+
+
+def _kennel_details_from_lines(lines: Optional[list[str]], details_url: str, county_name: str) -> Optional[KennelDetails]:
+    """Extract kennel information from the text lines of a details page."""
+    kennel_id = int(details_url.split('/')[-1])
+    
+    if lines is None:
+        return None
+    
+    name = ""
+    address = ""
+    city = ""
+    state = "PA"
+    zip_code = ""
+    township = ""
+    license_number = ""
+    last_status = ""
+    last_issued_year = ""
+    last_license_class = ""
+    
+    i = 0
+    while i < len(lines):
+        line = lines[i]
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        table = soup.find('table', class_='table')
-        if not table:
-            return kennels
+        if line == 'KENNEL' and i + 1 < len(lines):
+            name = lines[i + 1] if i + 1 < len(lines) else ""
+            i += 2
+            addr_parts = []
+            while i < len(lines) and not lines[i].startswith('County:'):
+                addr_parts.append(lines[i])
+                i += 1
+            if addr_parts:
+                address = addr_parts[0] if addr_parts else ""
+                if len(addr_parts) > 1:
+                    last_addr = addr_parts[-1]
+                    match = re.match(r'(.+?)\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)', last_addr)
+                    if match:
+                        city = match.group(1).strip()
+                        state = match.group(2)
+                        zip_code = match.group(3)
+            continue
         
-        rows = table.find_all('tr')[1:]
+        if line.startswith('Township:'):
+            township = line.replace('Township:', '').strip()
         
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 5:
-                license_num = cells[1].get_text(strip=True)
-                kennel_info = cells[2].get_text(separator=' ', strip=True)
-                status = cells[3].get_text(strip=True)
-                
-                details_link = cells[4].find('a')
-                if details_link and details_link.get('href'):
-                    details_url = urljoin(BASE_URL, details_link['href'])
-                    kennel_name = kennel_info.split('\n')[0].split('  ')[0].strip()
-                    kennel_id = int(details_link['href'].split('/')[-1])
-                    
-                    kennels.append({
-                        'kennel_id': kennel_id,
-                        'license_number': license_num,
-                        'name': kennel_name,
-                        'status': status,
-                        'details_url': details_url,
-                        'county_id': county_id,
-                        'county_name': COUNTIES.get(county_id, f"County_{county_id}")
-                    })
-        
-    except requests.RequestException as e:
-        log(f"  [red]✗[/red] Error searching: {e}")
+        if line == 'LICENSE NUMBER' and i + 1 < len(lines):
+            for j in range(i + 1, min(i + 5, len(lines))):
+                if re.match(r'^\d+$', lines[j]):
+                    license_number = lines[j]
+                    break
+        
+        if line == 'LAST STATUS' and i + 1 < len(lines):
+            for j in range(i + 1, min(i + 5, len(lines))):
+                if lines[j] in ['Open', 'Closed - Voluntarily', 'Closed - Enforcement Related', 
+                                'Application/License Refused', 'Closed - Non-Renewal']:
+                    last_status = lines[j]
+                    break
+                elif 'Closed' in lines[j] or 'Open' in lines[j]:
+                    last_status = lines[j]
+                    break
+        
+        if line == 'LAST ISSUED LICENSE YEAR' and i + 1 < len(lines):
+            for j in range(i + 1, min(i + 5, len(lines))):
+                if re.match(r'^\d{4}$', lines[j]):
+                    last_issued_year = lines[j]
+                    break
+        
+        if line == 'LAST LICENSE CLASS' and i + 1 < len(lines):
+            for j in range(i + 1, min(i + 5, len(lines))):
+                if re.match(r'^[A-Z]+\d*:', lines[j]) or 'dogs' in lines[j].lower():
+                    last_license_class = lines[j]
+                    break
+        
+        i += 1
     
-    return kennels
+    for line in lines:
+        if line.startswith('County:'):
+            county_from_page = line.replace('County:', '').strip()
+            if county_from_page:
+                county_name = county_from_page
+        if line.startswith('Township:'):
+            township = line.replace('Township:', '').strip()
+    
+    return KennelDetails(
+        kennel_id=kennel_id,
+        name=name,
+        address=address,
+        city=city,
+        state=state,
+        zip_code=zip_code,
+        county=county_name,
+        township=township,
+        license_number=license_number,
+        last_status=last_status,
+        last_issued_license_year=last_issued_year,
+        last_license_class=last_license_class,
+        details_url=details_url
+    )
+
+
+def parse_kennel_details_html(html: str, details_url: str, county_name: str) -> Optional[KennelDetails]:
+    """Extract kennel information from a details page."""
+    return _kennel_details_from_lines(html_backends.details(html).lines, details_url, county_name)
 
 
 def parse_kennel_details(session: requests.Session, details_url: str, county_name: str) -> Optional[KennelDetails]:
@@ -254,122 +891,82 @@ def parse_kennel_details(session: requests.Session, details_url: str, county_nam
     try:
         response = session.get(details_url, timeout=30)
         response.raise_for_status()
+        return parse_kennel_details_html(response.text, details_url, county_name)
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        kennel_id = int(details_url.split('/')[-1])
-        
-        details_div = soup.find('div', class_='container')
-        if not details_div:
-            return None
-        
-        text_content = details_div.get_text(separator='\n', strip=True)
-        lines = [l.strip() for l in text_content.split('\n') if l.strip()]
-        
-        name = ""
-        address = ""
-        city = ""
-        state = "PA"
-        zip_code = ""
-        township = ""
-        license_number = ""
-        last_status = ""
-        last_issued_year = ""
-        last_license_class = ""
-        
-        kennel_section = soup.find('h4', string=re.compile('Kennel Inspections', re.I))
-        if kennel_section:
-            parent = kennel_section.find_parent()
-            if parent:
-                all_text = []
-                for elem in parent.children:
-                    if elem.name == 'table':
-                        break
-                    if hasattr(elem, 'get_text'):
-                        all_text.append(elem.get_text(separator='\n', strip=True))
-                    elif isinstance(elem, str) and elem.strip():
-                        all_text.append(elem.strip())
-                
-                full_text = '\n'.join(all_text)
-                lines = [l.strip() for l in full_text.split('\n') if l.strip()]
+    except requests.RequestException:
+        return None
+
+
+def _inspection_pdfs(pdf_links: list[tuple[str, str]], base_url: str = BASE_URL) -> list[dict]:
+    """Turn (date, href) pairs from a details page into inspection PDF records."""
+    return [{'date': date, 'url': urljoin(base_url, href)} for date, href in pdf_links]
+
+
+def parse_inspection_pdfs_html(html: str, base_url: str = BASE_URL) -> list[dict]:
+    """Extract inspection PDF links from a kennel details page."""
+    return _inspection_pdfs(html_backends.details(html).pdf_links, base_url)
+
+
+def parse_details_page(html: str, details_url: str, county_name: str,
+                       base_url: str = BASE_URL) -> tuple[Optional[KennelDetails], list[dict]]:
+    """Extract the kennel record and its PDF links from one parse of a details page."""
+    return details_from_extract(html_backends.details(html), details_url, county_name, base_url)
+
+
+def details_from_extract(extract: html_backends.DetailsExtract, details_url: str, county_name: str,
+                         base_url: str = BASE_URL) -> tuple[Optional[KennelDetails], list[dict]]:
+    """Kennel record and PDF links from an already parsed details page (e.g. from a ParsePool)."""
+    return (_kennel_details_from_lines(extract.lines, details_url, county_name),
+            _inspection_pdfs(extract.pdf_links, base_url))
+
+
+def conditional_headers(validators: Optional[PageValidators]) -> dict:
+    """Request headers that let the server answer 304 for an unchanged page."""
+    headers = {}
+    if validators and validators.etag:
+        headers['If-None-Match'] = validators.etag
+    if validators and validators.last_modified:
+        headers['If-Modified-Since'] = validators.last_modified
+    return headers
+
+
+def page_validators(headers, body: bytes) -> PageValidators:
+    """Build validators from a details page response."""
+    return PageValidators(
+        etag=headers.get('ETag', ''),
+        last_modified=headers.get('Last-Modified', ''),
+        content_hash=hashlib.sha256(body).hexdigest()
+    )
+
+
+def fetch_kennel_page(session: requests.Session, details_url: str, county_name: str,
+                      validators: Optional[PageValidators] = None,
+                      parser: Optional[ParsePool] = None) -> Optional[KennelPage]:
+    """Download a kennel details page once and return its record and PDF links.
+    
+    When validators from a previous run are given the request is conditional,
+    and an unchanged page (304 or same content hash) is returned unparsed.
+    With a ParsePool the page is parsed (and timed) there.
+    """
+    try:
+        response = session.get(details_url, headers=conditional_headers(validators), timeout=30)
+        if response.status_code == 304:
+            return KennelPage(None, [], validators, unchanged=True)
+        response.raise_for_status()
+        archive = get_archive()
+        if archive is not None:
+            archive.put('details', details_url, details_url, response.content, {'county_name': county_name})
         
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            if line == 'KENNEL' and i + 1 < len(lines):
-                name = lines[i + 1] if i + 1 < len(lines) else ""
-                i += 2
-                addr_parts = []
-                while i < len(lines) and not lines[i].startswith('County:'):
-                    addr_parts.append(lines[i])
-                    i += 1
-                if addr_parts:
-                    address = addr_parts[0] if addr_parts else ""
-                    if len(addr_parts) > 1:
-                        last_addr = addr_parts[-1]
-                        match = re.match(r'(.+?)\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)', last_addr)
-                        if match:
-                            city = match.group(1).strip()
-                            state = match.group(2)
-                            zip_code = match.group(3)
-                continue
-            
-            if line.startswith('Township:'):
-                township = line.replace('Township:', '').strip()
-            
-            if line == 'LICENSE NUMBER' and i + 1 < len(lines):
-                for j in range(i + 1, min(i + 5, len(lines))):
-                    if re.match(r'^\d+$', lines[j]):
-                        license_number = lines[j]
-                        break
-            
-            if line == 'LAST STATUS' and i + 1 < len(lines):
-                for j in range(i + 1, min(i + 5, len(lines))):
-                    if lines[j] in ['Open', 'Closed - Voluntarily', 'Closed - Enforcement Related', 
-                                    'Application/License Refused', 'Closed - Non-Renewal']:
-                        last_status = lines[j]
-                        break
-                    elif 'Closed' in lines[j] or 'Open' in lines[j]:
-                        last_status = lines[j]
-                        break
-            
-            if line == 'LAST ISSUED LICENSE YEAR' and i + 1 < len(lines):
-                for j in range(i + 1, min(i + 5, len(lines))):
-                    if re.match(r'^\d{4}$', lines[j]):
-                        last_issued_year = lines[j]
-                        break
-            
-            if line == 'LAST LICENSE CLASS' and i + 1 < len(lines):
-                for j in range(i + 1, min(i + 5, len(lines))):
-                    if re.match(r'^[A-Z]+\d*:', lines[j]) or 'dogs' in lines[j].lower():
-                        last_license_class = lines[j]
-                        break
-            
-            i += 1
-        
-        for line in lines:
-            if line.startswith('County:'):
-                county_from_page = line.replace('County:', '').strip()
-                if county_from_page:
-                    county_name = county_from_page
-            if line.startswith('Township:'):
-                township = line.replace('Township:', '').strip()
-        
-        return KennelDetails(
-            kennel_id=kennel_id,
-            name=name,
-            address=address,
-            city=city,
-            state=state,
-            zip_code=zip_code,
-            county=county_name,
-            township=township,
-            license_number=license_number,
-            last_status=last_status,
-            last_issued_license_year=last_issued_year,
-            last_license_class=last_license_class,
-            details_url=details_url
-        )
+        new_validators = page_validators(response.headers, response.content)
+        if validators and validators.content_hash == new_validators.content_hash:
+            return KennelPage(None, [], new_validators, unchanged=True)
+        
+        if parser is not None:
+            extract = parser.details(response.content, response.encoding)
+            details, pdfs = details_from_extract(extract, details_url, county_name)
+        else:
+            details, pdfs = parse_details_page(response.text, details_url, county_name)
+        return KennelPage(details, pdfs, new_validators)
         
     except requests.RequestException:
         return None
@@ -377,53 +974,125 @@ def parse_kennel_details(session: requests.Session, details_url: str, county_nam
 
 def get_inspection_pdfs(session: requests.Session, details_url: str) -> list[dict]:
     """Get all inspection PDF links from a kennel details page."""
-    pdfs = []
-    
     try:
         response = session.get(details_url, timeout=30)
         response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        table = soup.find('table', class_='table')
-        if not table:
-            return pdfs
-        
-        rows = table.find_all('tr')[1:]
-        
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 3:
-                date_cell = cells[1].get_text(strip=True)
-                pdf_link = cells[2].find('a')
-                if pdf_link and pdf_link.get('href'):
-                    pdf_url = urljoin(BASE_URL, pdf_link['href'])
-                    pdfs.append({
-                        'date': date_cell,
-                        'url': pdf_url
-                    })
+        return parse_inspection_pdfs_html(response.text)
         
     except requests.RequestException:
-        pass
-    
-    return pdfs
+        return []
 
 
-def download_pdf(session: requests.Session, url: str, filepath: Path) -> bool:
-    """Download a PDF file to the specified path."""
+def is_valid_pdf(filepath: Path) -> bool:
+    """Check that a file starts with the %PDF header and ends with an %%EOF trailer."""
     try:
-        response = session.get(url, timeout=60, stream=True)
-        response.raise_for_status()
+        size = filepath.stat().st_size
+        if size < len(PDF_HEADER) + len(PDF_TRAILER):
+            return False
+        with open(filepath, 'rb') as f:
+            if f.read(len(PDF_HEADER)) != PDF_HEADER:
+                return False
+            f.seek(max(0, size - PDF_TRAILER_WINDOW))
+            return PDF_TRAILER in f.read()
+    except OSError:
+        return False
+
+
+def is_valid_pdf_bytes(data: bytes) -> bool:
+    """In-memory version of is_valid_pdf()."""
+    return data.startswith(PDF_HEADER) and PDF_TRAILER in data[-PDF_TRAILER_WINDOW:]
+
+
+def part_path(filepath: Path) -> Path:
+    """Temporary path a PDF is downloaded to before the atomic rename."""
+    return filepath.with_name(filepath.name + '.part')
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Jittered exponential backoff before retry number `attempt` (0-based)."""
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def finish_download(part: Path, filepath: Path) -> bool:
+    """Move a complete, valid .part file into place; discard it if it is corrupt."""
+    if is_valid_pdf(part):
+        os.replace(part, filepath)
+        return True
+    part.unlink(missing_ok=True)
+    return False
+
+
+def download_pdf(session: requests.Session, url: str, filepath: Path, retries: int = DOWNLOAD_RETRIES) -> bool:
+    """Download a PDF file to the specified path.
+    
+    Bytes go to a .part file that is renamed into place only once it has a
+    %PDF header and %%EOF trailer, so a truncated file never sits at
+    `filepath`. Interrupted transfers resume with an HTTP Range request and
+    failures are retried with jittered exponential backoff.
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    part = part_path(filepath)
+    
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff_delay(attempt - 1))
         
-        filepath.parent.mkdir(parents=True, exist_ok=True)
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
         
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        try:
+            with request_attempt(attempt):
+                response = session.get(url, headers=headers, timeout=60, stream=True)
+            if response.status_code == 416:
+                # Nothing left to send: the .part file is already complete (or junk)
+                if finish_download(part, filepath):
+                    return True
+                continue
+            if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+                return False
+            response.raise_for_status()
+            
+            mode = 'ab' if offset and response.status_code == 206 else 'wb'
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    f.write(chunk)
+            
+        except requests.RequestException:
+            # Keep the partial file; the next attempt resumes from its end
+            continue
         
-        return True
+        if finish_download(part, filepath):
+            return True
+    
+    return False
+
+
+def fetch_pdf_bytes(session: requests.Session, url: str, retries: int = DOWNLOAD_RETRIES) -> Optional[bytes]:
+    """Download a PDF into memory, retrying like download_pdf(); None if no valid PDF arrived."""
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff_delay(attempt - 1))
+        try:
+            with request_attempt(attempt):
+                response = session.get(url, timeout=60)
+            if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+                return None
+            response.raise_for_status()
+        except requests.RequestException:
+            continue
         
-    except requests.RequestException:
-        return False
+        if is_valid_pdf_bytes(response.content):
+            return response.content
+    
+    return None
+
+
+def write_pdf(data: bytes, filepath: Path):
+    """Archive downloaded PDF bytes, atomically via a .part file."""
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    part = part_path(filepath)
+    part.write_bytes(data)
+    os.replace(part, filepath)
 
 
 class Stats:
@@ -434,131 +1103,338 @@ class Stats:
         self.pdfs_downloaded = 0
         self.pdfs_skipped = 0
         self.pdfs_failed = 0
+        self.pages_unchanged = 0
+        self.pdfs_imported = 0
+        self.counties_failed = 0
+        self.kennels_failed = 0
+        self.rows_dropped = 0
     
-    def add(self, kennels=0, downloaded=0, skipped=0, failed=0):
+    def add(self, kennels=0, downloaded=0, skipped=0, failed=0, unchanged=0, imported=0,
+            counties_failed=0, kennels_failed=0, rows_dropped=0):
         with self.lock:
+            self.rows_dropped += rows_dropped
+            self.pdfs_imported += imported
+            self.counties_failed += counties_failed
+            self.kennels_failed += kennels_failed
             self.kennels_found += kennels
             self.pdfs_downloaded += downloaded
             self.pdfs_skipped += skipped
             self.pdfs_failed += failed
+            self.pages_unchanged += unchanged
+    
+    def snapshot(self) -> dict:
+        """Current counters as a dict (for telemetry)."""
+        with self.lock:
+            return {
+                'kennels': self.kennels_found,
+                'pdfs_downloaded': self.pdfs_downloaded,
+                'pdfs_skipped': self.pdfs_skipped,
+                'pdfs_failed': self.pdfs_failed,
+                'pages_unchanged': self.pages_unchanged,
+                'pdfs_imported': self.pdfs_imported,
+                'counties_failed': self.counties_failed,
+                'kennels_failed': self.kennels_failed,
+                'db_rows_dropped': self.rows_dropped,
+            }
 
 
-def collect_all_kennels(start_county: int, end_county: int) -> list[dict]:
-    """Collect all kennels from all counties first."""
-    all_kennels = []
-    session = create_session()
+def watch_crawl(telemetry: Telemetry, stats: Stats, limiter: Optional[AdaptiveRateLimiter], writer: 'DBWriter',
+                frontier: Optional[Frontier] = None, queues: Optional[Callable[[], dict]] = None,
+                clock: Optional[StageClock] = None):
+    """Expose a running crawl's throughput, rate limit and queue depths as metrics."""
+    def queue_depths() -> dict:
+        depths = {'db_writer': writer.depth}
+        if frontier is not None:
+            counts = frontier.counts()
+            for name in ('kennels', 'pdfs'):
+                depths[f'{name}_pending'] = counts[name].get('pending', 0)
+                depths[f'{name}_leased'] = counts[name].get('leased', 0)
+        if queues:
+            depths.update(queues())
+        return depths
+    
+    telemetry.collect('scraper_items_total', 'Crawl items finished, by outcome', stats.snapshot, 'counter', 'item')
+    telemetry.collect('scraper_queue_depth', 'Work waiting in each queue', queue_depths, 'gauge', 'queue')
+    telemetry.collect('scraper_db_rows_total', 'Kennel and inspection rows written, by table and outcome',
+                      lambda: {f'{table}_{outcome}': n for table, c in list(writer.row_counts.items())
+                               for outcome, n in c.items()}, 'counter', 'rows')
+    if limiter:
+        telemetry.collect('scraper_rate_limit_per_second', 'Current adaptive request rate', lambda: limiter.rate)
+    if clock is not None:
+        telemetry.collect('scraper_stage_utilisation', 'Share of each stage\'s slots in use since the crawl started',
+                          clock.utilisation, 'gauge', 'stage')
+        telemetry.collect('scraper_stage_busy_seconds_total', 'Busy time per crawl stage',
+                          lambda: dict(clock.busy), 'counter', 'stage')
+
+
+def collect_all_kennels(start_county: int, end_county: int, limiter: Optional[AdaptiveRateLimiter] = None,
+                        on_found=None, skip_counties=(), on_failed=None) -> list[dict]:
+    """Search all counties concurrently under a shared adaptive rate limit.
     
-    console.print("\n[bold cyan]Phase 1:[/bold cyan] Collecting kennel list from all counties...\n")
+    Each county's results are passed to `on_found(county_id, kennels)` as soon
+    as its search returns, so Phase 2 can start before Phase 1 ends; a county
+    whose search failed after its retries goes to `on_failed(county_id)`
+    instead. Counties in `skip_counties` (already searched by an interrupted
+    run) are left out.
+    """
+    all_kennels = []
+    results_lock = Lock()
+    limiter = limiter or AdaptiveRateLimiter(rate=1 / SEARCH_INTERVAL)
     
-    for county_id in range(start_county, end_county + 1):
+    def search(county_id: int):
         county_name = COUNTIES.get(county_id, f"County_{county_id}")
-        console.print(f"  🔍 Searching [yellow]{county_name}[/yellow]...", end="")
+        kennels = search_county(create_session(limiter), county_id)
+        telemetry = get_telemetry()
+        if kennels is None:
+            if telemetry:
+                telemetry.event('county_search_failed', county_id=county_id)
+            if on_failed:
+                on_failed(county_id)
+            return
+        if telemetry:
+            telemetry.event('county_searched', county_id=county_id, kennels=len(kennels))
         
-        kennels = search_county(session, county_id)
+        with results_lock:
+            all_kennels.extend(kennels)
+        if on_found:
+            on_found(county_id, kennels)
         
         if kennels:
-            all_kennels.extend(kennels)
-            console.print(f" [green]Found {len(kennels)} kennels[/green]")
+            log(f"  🔍 [yellow]{county_name}[/yellow]: [green]Found {len(kennels)} kennels[/green]")
         else:
-            console.print(f" [dim]No kennels[/dim]")
-        
-        time.sleep(0.3)
+            log(f"  🔍 [yellow]{county_name}[/yellow]: [dim]No kennels[/dim]")
+    
+    county_ids = [c for c in range(start_county, end_county + 1) if c not in skip_counties]
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        for future in as_completed([executor.submit(search, county_id) for county_id in county_ids]):
+            try:
+                future.result()
+            except Exception as e:
+                log(f"[red]Search error: {e}[/red]")
     
-    console.print(f"\n[bold green]✓[/bold green] Total kennels found: [bold]{len(all_kennels)}[/bold]\n")
     return all_kennels
 
 
-def process_kennel(worker_id: int, kennel: dict, progress: Progress, overall_task, stats: Stats, delay: float):
-    """Process a single kennel - download its details and all PDFs."""
-    session = create_session()
-    county_name = kennel['county_name']
+def process_kennel(worker_id: int, kennel: dict, progress: Progress, overall_task, stats: Stats,
+                   session: requests.Session, writer: DBWriter, frontier: Frontier,
+                   validators: Optional[PageValidators] = None, output: Optional[PdfOutput] = None,
+                   parser: Optional[ParsePool] = None):
+    """Process a single leased kennel - save its details and queue its PDFs.
     
-    # Create directory structure
-    county_dir = OUTPUT_DIR / sanitize_filename(county_name)
-    kennel_folder = f"{sanitize_filename(kennel['license_number'])}_{sanitize_filename(kennel['name'])}"
-    kennel_dir = county_dir / kennel_folder
-    kennel_dir.mkdir(parents=True, exist_ok=True)
+    PDFs not already on disk go into the frontier, where any worker can lease
+    them. Passing the validators stored by a previous run makes this a delta
+    fetch: an unchanged details page skips parsing and the PDF loop entirely.
+    With a PdfOutput, what counts as already fetched is its `done` set
+    rather than a file on disk.
+    """
+    county_name = kennel['county_name']
+    kennel_id = kennel['kennel_id']
     
     # Update progress
     progress.update(overall_task, description=f"[cyan]W{worker_id}[/cyan] 📥 {kennel['name'][:30]}...")
     
-    time.sleep(delay)
+    # Fetch the details page once for both the kennel record and its PDF links
+    page = fetch_kennel_page(session, kennel['details_url'], county_name, validators, parser)
+    if page is None:
+        # Back to the frontier for another attempt unless it is out of attempts
+        if frontier.kennel_failed(kennel_id):
+            stats.add(kennels=1, kennels_failed=1)
+            progress.advance(overall_task)
+        return 0
+    
+    if page.unchanged:
+        frontier.kennel_done(kennel_id)
+        writer.mark_checked(kennel_id)
+        stats.add(kennels=1, unchanged=1)
+        progress.advance(overall_task)
+        return 0
     
-    # Parse and save kennel details
-    details = parse_kennel_details(session, kennel['details_url'], county_name)
-    if details:
-        save_kennel_to_db(details)
+    if page.details:
+        writer.save_kennel(page.details)
     
-    # Get and download PDFs
-    pdfs = get_inspection_pdfs(session, kennel['details_url'])
+    # Create directory structure
+    county_dir = OUTPUT_DIR / sanitize_filename(county_name)
+    kennel_folder = f"{sanitize_filename(kennel['license_number'])}_{sanitize_filename(kennel['name'])}"
+    kennel_dir = county_dir / kennel_folder
+    if output is None:
+        kennel_dir.mkdir(parents=True, exist_ok=True)
     
-    kennel_downloaded = 0
     kennel_skipped = 0
+    to_fetch = []
     
-    for pdf in pdfs:
+    for pdf in page.pdfs:
         date_clean = pdf['date'].replace('/', '-')
         filename = f"inspection_{date_clean}.pdf"
         filepath = kennel_dir / filename
         
-        if filepath.exists():
-            save_inspection_to_db(kennel['kennel_id'], pdf['date'], pdf['url'], str(filepath), True)
+        if output is not None:
+            if (kennel_id, pdf['date']) in output.done:
+                kennel_skipped += 1
+                continue
+        elif filepath.exists() and is_valid_pdf(filepath):
+            writer.save_inspection(kennel_id, pdf['date'], pdf['url'], str(filepath), True)
             kennel_skipped += 1
             continue
         
-        time.sleep(delay)
-        
-        if download_pdf(session, pdf['url'], filepath):
-            kennel_downloaded += 1
-            save_inspection_to_db(kennel['kennel_id'], pdf['date'], pdf['url'], str(filepath), True)
-        else:
-            stats.add(failed=1)
-            save_inspection_to_db(kennel['kennel_id'], pdf['date'], pdf['url'], str(filepath), False)
+        to_fetch.append((pdf['date'], pdf['url'], str(filepath)))
     
-    stats.add(kennels=1, downloaded=kennel_downloaded, skipped=kennel_skipped)
+    # Validators are only stored once every PDF on the page is saved, so failures are retried
+    if frontier.kennel_done(kennel_id, to_fetch, asdict(page.validators)):
+        writer.save_validators(kennel_id, page.validators)
+    
+    stats.add(kennels=1, skipped=kennel_skipped)
     progress.advance(overall_task)
+    return len(to_fetch)
 
 
-def scrape_all_parallel(num_workers: int = 5, start_county: int = 1, end_county: int = 69, delay: float = 0.5):
-    """Main scraping function with parallel workers and progress display."""
+def process_pdf(item: dict, stats: Stats, session: requests.Session, writer: DBWriter, frontier: Frontier,
+                output: Optional[PdfOutput] = None):
+    """Download one leased PDF and record the outcome.
+    
+    With a PdfOutput the bytes are held in memory: packed into the store (or
+    written to the tree) for archival and, in pipeline mode, handed straight
+    to pdftotext and the parser, with the parsed data written right behind
+    the inspection row.
+    """
+    pdf_path, pdf_sha256, parsed = item['pdf_path'], None, None
+    if output is None:
+        ok = download_pdf(session, item['pdf_url'], Path(item['pdf_path']))
+    else:
+        # A valid file left by the original tree layout is reused rather than downloaded again
+        filepath = Path(item['pdf_path'])
+        reused = is_valid_pdf(filepath)
+        data = filepath.read_bytes() if reused else fetch_pdf_bytes(session, item['pdf_url'])
+        ok = data is not None
+        if ok and output.archive and output.store is not None:
+            pdf_sha256 = output.store.put(data)
+            pdf_path = ""
+        elif ok and output.archive:
+            if not reused:
+                # Fetched bytes replace whatever is there, e.g. a truncated earlier download
+                write_pdf(data, filepath)
+        else:
+            pdf_path = ""
+        if ok and output.parse:
+            parsed = parse_inspection_bytes(data)
+    
+    final, validators = frontier.pdf_finished(item['id'], ok)
+    
+    if ok or final:
+        writer.save_inspection(item['kennel_id'], item['inspection_date'], item['pdf_url'], pdf_path, ok, pdf_sha256)
+        if parsed:
+            writer.save_inspection_data(item['kennel_id'], item['inspection_date'], parsed)
+        stats.add(downloaded=1 if ok else 0, failed=0 if ok else 1, imported=1 if parsed else 0)
+    if validators:
+        writer.save_validators(item['kennel_id'], PageValidators(**validators))
+    return final
+
+
+def scrape_all_parallel(num_workers: int = 5, start_county: int = 1, end_county: int = 69, delay: float = 0.5,
+                        delta: bool = False, db_batch: int = 500, max_rate: float = 10.0, resume: bool = False,
+                        pipeline: bool = False, archive: bool = True, pdf_store: str = 'pack',
+                        shard: Optional[tuple[int, int]] = None, schedule: bool = False,
+                        budget: Optional[int] = None, listing_only: bool = False, parse_workers: int = 0,
+                        repair: bool = False):
+    """Main scraping function with parallel workers and progress display.
+    
+    `delay` sets the starting request spacing; from there one shared
+    AdaptiveRateLimiter paces every request between 0.2 and `max_rate` per second.
+    Work flows through the persistent Frontier: with `resume`, counties
+    already searched are skipped and unfinished kennels and PDFs are picked
+    up where the previous run stopped. PDFs go into the packed store
+    (`pdf_store='pack'`) or one file each under OUTPUT_DIR ('tree'). With
+    `pipeline`, PDFs are parsed and imported into dog_counts/inspection_items
+    as they download, and kept only if `archive` is set. A `shard` of
+    (index, count) keeps only kennels with kennel_id % count == index, so
+    several nodes can split the same counties (see cluster.py). With
+    `schedule`, known kennels are visited stalest first (see recrawl.py);
+    a request `budget` also limits the run to the kennels it is expected to
+    cover and stops leasing kennels once that many requests have been sent.
+    Every county search is saved as a listing snapshot (see listings.py);
+    with `listing_only`, only kennels that are new, changed status or
+    disappeared since the last snapshot get their details page fetched.
+    With `parse_workers`, details pages are parsed in that many processes
+    instead of the worker threads; either way the summary reports how busy
+    the worker threads ('fetch', which includes waiting on a parse) and the
+    parsers were. With `repair`, no counties are searched: the PDFs that
+    pdf_verify.py queued as corrupt are moved aside and downloaded again.
+    """
     
     # Initialize
     init_database()
     OUTPUT_DIR.mkdir(exist_ok=True)
+    output = None
+    if pdf_store == 'pack' or pipeline:
+        store = PdfStore() if pdf_store == 'pack' else None
+        if pipeline:
+            update_database_schema(DB_FILE)
+        output = PdfOutput(
+            store=store,
+            archive=archive,
+            parse=pipeline,
+            done=load_imported_inspections() if pipeline else load_stored_inspections()
+        )
     stats = Stats()
+    limiter = AdaptiveRateLimiter(rate=1 / delay if delay > 0 else max_rate, max_rate=max_rate)
+    known_validators = load_page_validators() if delta else {}
+    
+    frontier = Frontier(DB_FILE)
+    if resume:
+        frontier.release_leases()
+        frontier.recover_lost_writes(pack=output is not None and output.store is not None)
+    else:
+        frontier.reset()
+    repairs = []
+    if repair:
+        # Files stored under their own path need one to be written back to
+        repairs = [r for r in pending_repairs(DB_FILE) if r[3] or output is not None]
+        for _, _, _, pdf_path in repairs:
+            quarantine(pdf_path)
+        frontier.requeue_pdfs(repairs)
+    searched = set(range(start_county, end_county + 1)) if repair else frontier.searched_counties()
+    counts = frontier.counts()
+    listings = CountyListings(DB_FILE)
+    listing_changes = {'new': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+    clock = StageClock()
+    clock.set_slots('fetch', num_workers)
+    if not parse_workers:
+        clock.set_slots('parse', num_workers)
+    parser = ParsePool(parse_workers, clock)
     
     total_counties = end_county - start_county + 1
     
+    forecasts, plan = {}, None
+    if schedule or budget:
+        forecasts = forecast_kennels(DB_FILE, counties={
+            COUNTIES.get(c, f"County_{c}").upper() for c in range(start_county, end_county + 1)
+        })
+        plan = plan_recrawl(forecasts, budget, total_counties - len(searched))
+    
     # Print header
     console.print()
     console.print(Panel.fit(
         "[bold cyan]🐕 PA Kennel Inspection Scraper[/bold cyan]\n"
         f"Counties: {start_county}-{end_county} ({total_counties} total)\n"
-        f"Workers: {num_workers} | Delay: {delay}s",
+        f"Workers: {num_workers} | Start delay: {delay}s | Max rate: {max_rate}/s"
+        + (f" | Parse processes: {parse_workers}" if parse_workers else "")
+        + (f"\nDelta: revalidating {len(known_validators)} known kennel pages" if delta else "")
+        + (f"\nShard: kennel_id % {shard[1]} == {shard[0]}" if shard else "")
+        + (f"\nSchedule: {len(plan.priorities)} of {len(forecasts)} known kennels, stalest first"
+           + (f" (budget {budget} requests, ~{plan.expected_requests:.0f} planned)" if budget else "")
+           if plan else "")
+        + ("\nListing only: visiting new, changed and disappeared kennels" if listing_only else "")
+        + (f"\nRepair: re-downloading {len(repairs)} PDFs queued by pdf_verify.py" if repair else "")
+        + (f"\nResuming: {len(searched)} counties searched, "
+           f"{sum(counts['kennels'].values())} kennels and {sum(counts['pdfs'].values())} PDFs in frontier"
+           if resume else "")
+        + (f"\nPDF store: {STORE_DIR}/ (packed), {len(output.done)} PDFs stored"
+           if output and output.store is not None and not pipeline else "")
+        + (f"\nPipeline: importing PDFs as they download"
+           f"{'' if archive else ' (no archive)'}, {len(output.done)} already imported"
+           if pipeline else ""),
         border_style="cyan"
     ))
     
-    # PHASE 1: Collect all kennels from all counties
-    all_kennels = collect_all_kennels(start_county, end_county)
-    
-    if not all_kennels:
-        console.print("[yellow]No kennels found to process.[/yellow]")
-        return
-    
-    # PHASE 2: Process kennels in parallel
-    console.print(f"[bold cyan]Phase 2:[/bold cyan] Processing {len(all_kennels)} kennels with {num_workers} workers...\n")
-    
-    kennel_index = 0
-    kennel_lock = Lock()
-    
-    def get_next_kennel():
-        nonlocal kennel_index
-        with kennel_lock:
-            if kennel_index < len(all_kennels):
-                kennel = all_kennels[kennel_index]
-                kennel_index += 1
-                return kennel
-            return None
-    
     # Create progress display
     progress = Progress(
         SpinnerColumn(),
@@ -571,6 +1447,11 @@ def scrape_all_parallel(num_workers: int = 5, start_county: int = 1, end_county:
         expand=False
     )
     
+    # PHASE 1 and PHASE 2 overlap: county searches feed the frontier as they finish
+    console.print(f"\n[bold cyan]Phase 1+2:[/bold cyan] Searching counties and processing kennels with {num_workers} workers...\n")
+    
+    search_done = Event()
+    
     with progress:
         # Create a task for each worker
         worker_tasks = {}
@@ -578,43 +1459,168 @@ def scrape_all_parallel(num_workers: int = 5, start_county: int = 1, end_county:
             task_id = progress.add_task(f"[cyan]W{i+1}[/cyan] Waiting...", total=1)
             worker_tasks[i] = task_id
         
-        # Main overall progress
+        # Overall progress; totals grow as county searches and kennel pages return
+        kennels_finished = counts['kennels'].get('done', 0) + counts['kennels'].get('failed', 0)
+        pdfs_finished = counts['pdfs'].get('done', 0) + counts['pdfs'].get('failed', 0)
         overall_task = progress.add_task(
             "[bold magenta]Processing Kennels[/bold magenta]", 
-            total=len(all_kennels)
+            total=sum(counts['kennels'].values()),
+            completed=kennels_finished
+        )
+        pdf_task = progress.add_task(
+            "[bold magenta]Downloading PDFs[/bold magenta]",
+            total=sum(counts['pdfs'].values()),
+            completed=pdfs_finished
         )
+        totals_lock = Lock()
+        rate_task = progress.add_task(f"[yellow]⏱ Rate[/yellow] [dim]{limiter.rate:.1f} req/s[/dim]", total=None)
+        
+        # All database writes go through one batching writer thread
+        writer_task = progress.add_task("[blue]💾 DB writer[/blue]", total=None)
+        writer = DBWriter(batch_size=db_batch, stats=stats, on_flush=lambda w: progress.update(
+            writer_task, description=f"[blue]💾 DB writer[/blue] [dim]{w.depth} queued, {w.rows_written} written[/dim]"
+        )).start()
+        
+        telemetry = get_telemetry()
+        if telemetry:
+            watch_crawl(telemetry, stats, limiter, writer, frontier, clock=clock)
+            telemetry.event('crawl_start', engine='threads', start_county=start_county, end_county=end_county,
+                            workers=num_workers, resume=resume, pipeline=pipeline, shard=shard)
+        crawl_started = time.monotonic()
+        
+        def grow(task_id, count: int):
+            with totals_lock:
+                progress.update(task_id, total=progress.tasks[task_id].total + count)
+        
+        def on_found(county_id: int, kennels: list[dict]):
+            listing = kennels
+            if listing_only:
+                diff = listings.diff(county_id, COUNTIES.get(county_id, f"County_{county_id}"), kennels)
+                kennels = diff.to_visit
+                with totals_lock:
+                    for key in ('new', 'changed', 'removed'):
+                        listing_changes[key] += len(getattr(diff, key))
+                    listing_changes['unchanged'] += diff.unchanged
+                if diff.to_visit:
+                    log(f"  📋 [yellow]{COUNTIES.get(county_id, county_id)}[/yellow]: {len(diff.new)} new, "
+                        f"{len(diff.changed)} changed, {len(diff.removed)} gone")
+                if telemetry:
+                    telemetry.event('listing_diff', county_id=county_id, new=len(diff.new),
+                                    changed=len(diff.changed), removed=len(diff.removed),
+                                    unchanged=diff.unchanged)
+            if shard:
+                kennels = [k for k in kennels if k['kennel_id'] % shard[1] == shard[0]]
+            if plan is not None:
+                # Kennels new to the database have never been checked: they go first
+                kennels = [dict(k, priority=plan.priorities.get(k['kennel_id'], 1.0)) for k in kennels
+                           if k['kennel_id'] in plan.priorities or k['kennel_id'] not in forecasts]
+            frontier.add_county_results(county_id, kennels)
+            listings.save(county_id, listing)
+            grow(overall_task, len(kennels))
+        
+        def on_failed(county_id: int):
+            # Left unsearched in the frontier (and its listing untouched) for --resume to try again
+            frontier.county_failed(county_id)
+            stats.add(counties_failed=1)
+        
+        def producer():
+            try:
+                collect_all_kennels(start_county, end_county, limiter, on_found=on_found, skip_counties=searched,
+                                    on_failed=on_failed)
+            finally:
+                search_done.set()
         
         def worker_task(worker_id: int):
+            owner = f"{socket.gethostname()}:{os.getpid()}:W{worker_id+1}"
+            session = create_session(limiter)
             processed = 0
             while True:
-                kennel = get_next_kennel()
-                if kennel is None:
+                # Drain PDFs first so the frontier stays shallow
+                item = frontier.lease_pdf(owner)
+                if item:
+                    progress.update(
+                        worker_tasks[worker_id],
+                        description=f"[cyan]W{worker_id+1}[/cyan] 📄 {item['inspection_date']}"
+                    )
+                    try:
+                        with clock.timed('fetch'):
+                            final = process_pdf(item, stats, session, writer, frontier, output)
+                    except Exception as e:
+                        log(f"[red]Worker error on {item['pdf_url']}: {e}[/red]")
+                        final, _ = frontier.pdf_finished(item['id'], False)
+                    if final:
+                        progress.advance(pdf_task)
+                    continue
+                
+                over_budget = budget is not None and limiter.sent >= budget
+                kennel = None if over_budget else frontier.lease_kennel(owner)
+                if kennel:
+                    progress.update(
+                        worker_tasks[worker_id],
+                        description=f"[cyan]W{worker_id+1}[/cyan] {kennel['name'][:25]}..."
+                    )
+                    try:
+                        with clock.timed('fetch'):
+                            queued = process_kennel(worker_id + 1, kennel, progress, overall_task, stats, session,
+                                                    writer, frontier, known_validators.get(kennel['kennel_id']),
+                                                    output, parser)
+                    except Exception as e:
+                        log(f"[red]Worker error on {kennel['details_url']}: {e}[/red]")
+                        if frontier.kennel_failed(kennel['kennel_id']):
+                            stats.add(kennels=1, kennels_failed=1)
+                            progress.advance(overall_task)
+                        queued = 0
+                    grow(pdf_task, queued)
+                    processed += 1
+                    progress.update(rate_task, description=f"[yellow]⏱ Rate[/yellow] [dim]{limiter.rate:.1f} req/s[/dim]")
+                    continue
+                
+                # Nothing to lease: finished once searches are done and no one holds work
+                if search_done.is_set() and frontier.active() == 0:
                     progress.update(
                         worker_tasks[worker_id], 
                         description=f"[green]W{worker_id+1} ✓ Done ({processed} kennels)[/green]"
                     )
                     break
-                
-                progress.update(
-                    worker_tasks[worker_id],
-                    description=f"[cyan]W{worker_id+1}[/cyan] {kennel['name'][:25]}..."
-                )
-                
-                process_kennel(worker_id + 1, kennel, progress, overall_task, stats, delay)
-                processed += 1
+                time.sleep(0.2)
             
             return processed
         
-        # Run workers
-        with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(worker_task, i) for i in range(num_workers)]
+        search_thread = Thread(target=producer, daemon=True)
+        search_thread.start()
+        
+        # Run workers; the writer flushes whatever is still queued on the way out
+        try:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [executor.submit(worker_task, i) for i in range(num_workers)]
+                
+                # Wait for all to complete
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        log(f"[red]Worker error: {e}[/red]")
             
-            # Wait for all to complete
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    log(f"[red]Worker error: {e}[/red]")
+            search_thread.join()
+        finally:
+            writer.close()
+    
+    counts = frontier.counts()
+    repaired = finish_repairs(DB_FILE) if repair else {}
+    frontier.close()
+    listings.close()
+    parser.close()
+    if output and output.store is not None:
+        output.store.close()
+    if telemetry:
+        telemetry.event('crawl_end', engine='threads', seconds=round(time.monotonic() - crawl_started, 3),
+                        **stats.snapshot(), kennels_gave_up=counts['kennels'].get('failed', 0),
+                        pdfs_gave_up=counts['pdfs'].get('failed', 0), rows=writer.row_counts,
+                        utilisation={k: round(v, 3) for k, v in clock.utilisation().items()})
+    
+    if not counts['kennels'] and not counts['pdfs'] and not stats.counties_failed:
+        console.print("[yellow]No kennels found to process.[/yellow]")
+        return stats
     
     # Print summary
     console.print()
@@ -624,13 +1630,31 @@ def scrape_all_parallel(num_workers: int = 5, start_county: int = 1, end_county:
         f"   Kennels processed: [cyan]{stats.kennels_found}[/cyan]\n"
         f"   PDFs downloaded: [green]{stats.pdfs_downloaded}[/green]\n"
         f"   PDFs skipped (existing): [yellow]{stats.pdfs_skipped}[/yellow]\n"
-        f"   PDFs failed: [red]{stats.pdfs_failed}[/red]\n\n"
+        f"   PDFs failed: [red]{stats.pdfs_failed}[/red]\n"
+        + (f"   PDFs imported: [green]{stats.pdfs_imported}[/green]\n" if pipeline else "") +
+        f"   Pages unchanged: [dim]{stats.pages_unchanged}[/dim]\n"
+        f"   Gave up after retries: [red]{stats.counties_failed}[/red] county searches, "
+        f"[red]{counts['kennels'].get('failed', 0)}[/red] kennels, "
+        f"[red]{counts['pdfs'].get('failed', 0)}[/red] PDFs"
+        + (" [dim](--resume searches the counties again)[/dim]" if stats.counties_failed else "") + "\n"
+        f"   Rows: [dim]{writer.rows_summary()}[/dim]\n"
+        + (f"   Deferred by schedule: [dim]{plan.skipped + counts['kennels'].get('pending', 0)}[/dim] kennels, "
+           f"{limiter.sent} requests sent\n" if plan else "")
+        + (f"   Listing changes: [green]{listing_changes['new']}[/green] new, "
+           f"[yellow]{listing_changes['changed']}[/yellow] changed, [red]{listing_changes['removed']}[/red] gone, "
+           f"[dim]{listing_changes['unchanged']}[/dim] unchanged\n" if listing_only else "")
+        + (f"   Repairs: [green]{repaired.get('done', 0)}[/green] re-downloaded, "
+           f"[red]{repaired.get('failed', 0)}[/red] failed, {repaired.get('pending', 0)} still queued\n"
+           if repair else "") + "\n"
         f"💾 [bold]Output:[/bold]\n"
         f"   Database: [cyan]{DB_FILE}[/cyan]\n"
-        f"   PDFs: [cyan]{OUTPUT_DIR}/[/cyan]",
+        f"   PDFs: [cyan]{STORE_DIR if output and output.store is not None else OUTPUT_DIR}/[/cyan]",
         title="[bold]Summary[/bold]",
         border_style="green"
     ))
+    console.print(clock.table())
+    
+    return stats
 
 
 if __name__ == "__main__":
@@ -640,22 +1664,162 @@ if __name__ == "__main__":
     parser.add_argument('--workers', type=int, default=5, help='Number of parallel workers (default: 5)')
     parser.add_argument('--start', type=int, default=1, help='Starting county ID (1-69)')
     parser.add_argument('--end', type=int, default=69, help='Ending county ID (1-69)')
-    parser.add_argument('--delay', type=float, default=0.5, help='Delay between requests in seconds')
+    parser.add_argument('--delay', type=float, default=0.5,
+                        help='Starting delay between requests in seconds; adapts from there '
+                             '(default: 0.5; 0 starts at --max-rate)')
+    parser.add_argument('--max-rate', type=float, default=10.0,
+                        help='Ceiling for the adaptive request rate per second, for either engine (default: 10); '
+                             'raise it only for a server that can take it, e.g. a local stand-in')
     parser.add_argument('--county', type=int, help='Scrape only a specific county ID')
+    parser.add_argument('--delta', action='store_true',
+                        help='Revalidate details pages and skip kennels whose page is unchanged')
+    parser.add_argument('--db-batch', type=int, default=500,
+                        help='Rows per database commit from the writer thread (default: 500)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted crawl from the persisted frontier instead of starting over')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                        help='Crawl engine: thread workers or a single asyncio event loop (default: threads)')
+    parser.add_argument('--concurrency', type=int, default=100,
+                        help='Async engine: maximum in-flight requests overall (default: 100)')
+    parser.add_argument('--per-host', type=int, default=20,
+                        help='Async engine: maximum in-flight requests per host (default: 20)')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help='Async engine: site root, e.g. a local stand-in server for benchmarking')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Threads engine: parse each PDF as it downloads and import it into '
+                             'dog_counts/inspection_items in the same run')
+    parser.add_argument('--no-archive', action='store_true',
+                        help='With --pipeline: do not keep the PDFs at all')
+    parser.add_argument('--pdf-store', choices=['pack', 'tree'], default='pack',
+                        help='Keep PDFs in the packed content-addressed store (pdf_store.py) '
+                             'or one file each under kennel_inspections/ (default: pack)')
+    parser.add_argument('--html-parser', choices=sorted(html_backends.BACKENDS), default=html_backends.DEFAULT_BACKEND,
+                        help=f'HTML parsing backend for search and details pages (default: {html_backends.DEFAULT_BACKEND})')
+    parser.add_argument('--schedule', action='store_true',
+                        help='Threads engine: visit known kennels stalest first (expected new reports, see recrawl.py)')
+    parser.add_argument('--budget', type=int, metavar='REQUESTS',
+                        help='Threads engine: spend at most this many requests, on the stalest kennels (implies --schedule)')
+    parser.add_argument('--listing-only', action='store_true',
+                        help='Threads engine: fetch details only for kennels new, changed or gone since the last search')
+    parser.add_argument('--repair', action='store_true',
+                        help='Threads engine: only re-download the corrupt PDFs queued by pdf_verify.py')
+    parser.add_argument('--parse-workers', type=int, default=0, metavar='N',
+                        help='Parse details pages in N processes instead of the network workers (default: 0)')
+    parser.add_argument('--no-html-archive', action='store_true',
+                        help='Do not keep fetched search and details pages in html_archive/ (see html_archive.py)')
+    parser.add_argument('--events', metavar='FILE',
+                        help='Append JSON-lines telemetry (one event per request) to FILE, or - for stdout')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Serve Prometheus metrics on this port at /metrics while the crawl runs')
+    parser.add_argument('--headless', action='store_true',
+                        help='No progress display, for cron; events go to stdout unless --events is given')
+    transport_group = parser.add_mutually_exclusive_group()
+    transport_group.add_argument('--record', metavar='CASSETTE',
+                                 help='Threads engine: record every response into a .jsonl.gz cassette')
+    transport_group.add_argument('--replay', metavar='CASSETTE',
+                                 help='Threads engine: serve responses from a cassette, no network access')
     
     args = parser.parse_args()
     
-    if args.county:
+    start_county, end_county = (args.county, args.county) if args.county else (args.start, args.end)
+    
+    if args.resume and args.engine == 'async':
+        parser.error('--resume is only supported by the threads engine')
+    if args.pipeline and args.engine == 'async':
+        parser.error('--pipeline is only supported by the threads engine')
+    if (args.schedule or args.budget) and args.engine == 'async':
+        parser.error('--schedule/--budget are only supported by the threads engine')
+    if args.repair and args.engine == 'async':
+        parser.error('--repair is only supported by the threads engine')
+    if args.listing_only and args.engine == 'async':
+        parser.error('--listing-only is only supported by the threads engine')
+    if args.listing_only and (args.schedule or args.budget):
+        parser.error('--listing-only cannot be combined with --schedule/--budget')
+    if args.no_archive and not args.pipeline:
+        parser.error('--no-archive requires --pipeline')
+    if (args.record or args.replay) and args.engine == 'async':
+        parser.error('--record/--replay are only supported by the threads engine; '
+                     'replay a cassette to the async engine through standin_server.py and --base-url')
+    
+    html_backends.set_backend(args.html_parser)
+    
+    telemetry = None
+    if args.events or args.metrics_port or args.headless:
+        telemetry = Telemetry(events=args.events or ('-' if args.headless else None))
+        if args.metrics_port:
+            telemetry.serve(args.metrics_port)
+        use_telemetry(telemetry)
+    if args.headless:
+        console.quiet = True
+    
+    html_archive = None
+    if not args.no_html_archive:
+        html_archive = HtmlArchive()
+        use_archive(html_archive)
+    
+    cassette = None
+    if args.record or args.replay:
+        from transport import recording, replaying
+        factory, cassette = recording(args.record) if args.record else replaying(args.replay)
+        use_transport(factory)
+    
+    if args.engine == 'async':
+        from async_scraper import scrape_all_async
+        scrape_all_async(
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            start_county=start_county,
+            end_county=end_county,
+            delay=args.delay,
+            base_url=args.base_url,
+            delta=args.delta,
+            db_batch=args.db_batch,
+            max_rate=args.max_rate,
+            pdf_store=args.pdf_store,
+            parse_workers=args.parse_workers
+        )
+    elif args.county:
         scrape_all_parallel(
             num_workers=1,
             start_county=args.county, 
             end_county=args.county, 
-            delay=args.delay
+            delay=args.delay,
+            delta=args.delta,
+            db_batch=args.db_batch,
+            max_rate=args.max_rate,
+            resume=args.resume,
+            pipeline=args.pipeline,
+            archive=not args.no_archive,
+            pdf_store=args.pdf_store,
+            schedule=args.schedule,
+            budget=args.budget,
+            listing_only=args.listing_only,
+            parse_workers=args.parse_workers,
+            repair=args.repair
         )
     else:
         scrape_all_parallel(
             num_workers=args.workers,
             start_county=args.start, 
             end_county=args.end, 
-            delay=args.delay
+            delay=args.delay,
+            delta=args.delta,
+            db_batch=args.db_batch,
+            max_rate=args.max_rate,
+            resume=args.resume,
+            pipeline=args.pipeline,
+            archive=not args.no_archive,
+            pdf_store=args.pdf_store,
+            schedule=args.schedule,
+            budget=args.budget,
+            listing_only=args.listing_only,
+            parse_workers=args.parse_workers,
+            repair=args.repair
         )
+    
+    if cassette is not None:
+        cassette.close()
+    if html_archive is not None:
+        html_archive.close()
+    if telemetry is not None:
+        telemetry.close()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the PDA kennel inspection site
+Serves search, details and PDF responses - replayed from a recorded cassette
+or generated synthetically - with configurable latency and error rates, so
+the scraper engines can be exercised and benchmarked without the live site.
+"""
+
+import asyncio
+import random
+from threading import Thread, Event
+from typing import Optional
+
+from aiohttp import web
+
+from scraper import SEARCH_PATH, COUNTIES
+from transport import Cassette, SKIP_HEADERS, request_key, entry_body
+
+DETAILS_PATH = "/PADogLawPublicKennelInspectionSearch/KennelInspections/Details"
+PDF_PATH = "/standin/pdf"
+
+
+class SyntheticSite:
+    """Deterministic fake site: every county has the same number of kennels and PDFs."""
+    def __init__(self, kennels_per_county: int = 20, pdfs_per_kennel: int = 3, pdf_size: int = 50_000):
+        self.kennels_per_county = kennels_per_county
+        self.pdfs_per_kennel = pdfs_per_kennel
+        self.pdf_size = pdf_size
+        self.filler = b"0" * pdf_size
+
+    @staticmethod
+    def kennel_id(county_id: int, index: int) -> int:
+        return county_id * 10_000 + index
+
+    def search_page(self, county_id: int) -> str:
+        county = COUNTIES.get(county_id, f"County_{county_id}").upper()
+        rows = []
+        for i in range(1, self.kennels_per_county + 1):
+            kennel_id = self.kennel_id(county_id, i)
+            rows.append(
+                f"<tr><td>{i}</td><td>{kennel_id}</td>"
+                f"<td>Kennel {kennel_id}<br/>{i} Main Street<br/>Town PA 17000<br/>County: {county}<br/></td>"
+                f"<td>Open</td><td><a href=\"{DETAILS_PATH}/{kennel_id}\">Details</a></td></tr>"
+            )
+        return (
+            "<html><body><table class=\"table\">"
+            "<tr><th>#</th><th>License Number</th><th>Kennel</th><th>Status</th><th></th></tr>"
+            + "".join(rows) + "</table></body></html>"
+        )
+
+    def pdf(self, kennel_id: int, number: int) -> bytes:
+        """A minimal one-page PDF of about pdf_size bytes, distinct per inspection.
+
+        It has a real xref table and trailer, so it passes pdf_verify.py; a
+        comment line pads it to size.
+        """
+        out = f"%PDF-1.4\n%{kennel_id}/{number}\n".encode()
+        offsets = []
+        for body in (b"<< /Type /Catalog /Pages 2 0 R >>",
+                     b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+                     b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"):
+            offsets.append(len(out))
+            out += f"{len(offsets)} 0 obj\n".encode() + body + b"\nendobj\n"
+        out += b"%" + self.filler[:max(0, self.pdf_size - len(out) - 200)] + b"\n"
+        xref = len(out)
+        out += b"xref\n0 4\n0000000000 65535 f \n" + b"".join(b"%010d 00000 n \n" % o for o in offsets)
+        out += f"trailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return out
+
+    def report_text(self, kennel_id: int, number: int, items: int = 30, remark_lines: int = 12) -> str:
+        """pdftotext -layout style text of an inspection report, for timing the PDF parsers.
+
+        Like the real layout output, labels and values sit in wide, space-padded columns.
+        """
+        county = COUNTIES.get(kennel_id // 10_000, "Unknown").upper()
+        results = ('Satisfactory', 'Satisfactory', 'Unsatisfactory', 'Not Applicable')
+        row = lambda left, right: f"   {left:<90}{right}"
+        rows = [row(f"21.{20 + n}{'abc'[n % 3]}    Requirement {n} for kennel housing",
+                    results[(kennel_id + number + n) % 4]) for n in range(items)]
+        remarks = [f"   Remark line {n}: the kennel area was inspected with the owner present."
+                   for n in range(remark_lines)]
+        if number % 2:
+            remarks.append("   A reinspection will take place within 30 days.")
+        return "\n".join([
+            f"{'Pennsylvania Department of Agriculture':^110}",
+            f"{'Bureau of Dog Law Enforcement':^110}",
+            "",
+            "Kennel",
+            f"   Kennel {kennel_id}",
+            "Owner(s)",
+            f"   Owner {kennel_id}",
+            "   1 Main Street Town PA 17000",
+            row("License Number", kennel_id),
+            "License Year/Class",
+            "   2024 : K1",
+            row("Kennel County", county),
+            row("Kennel Township", "Standin"),
+            f"   {'Inspection Date':<30}{(number - 1) % 12 + 1:02d}/15/{2010 + number}"
+            f"{'':<30}Inspected By          INSPECTOR , PAT",
+            row("Person Interviewed", "Owner"),
+            "Title",
+            "   Owner",
+            row("Inspection Action", "Satisfactory"),
+            "",
+            "Dog Counts",
+            row("CurrYr: Boarding", number),
+            row("CurrYr: Breeding", kennel_id % 50),
+            row("CurrYr: Other", 2),
+            row("CurrYr: Transfer", 1),
+            row("On Prem", kennel_id % 50 + 3),
+            row("Off Site", 0),
+            row("PrevYr: Boarding", 0),
+            row("PrevYr: Breeding", kennel_id % 40),
+            row("PrevYr: Other", 1),
+            row("PrevYr: Transfer", 0),
+            "",
+            row("Inspection Category", "Result"),
+            "Kennel Regulations",
+            *rows,
+            "Kennel Acts",
+            row("455.8    Rabies Vaccination", "Yes"),
+            row("459.207  Dog Licenses", "Not"),
+            row("", "Applicable"),
+            "Inspection Category",
+            "Miscellaneous",
+            row("Reinspection Required", 'Yes' if number % 2 else 'No'),
+            row("Other", "Satisfactory"),
+            "",
+            "Remarks",
+            *remarks,
+            "",
+        ])
+
+    def details_page(self, kennel_id: int) -> str:
+        county = COUNTIES.get(kennel_id // 10_000, "Unknown").upper()
+        inspections = "".join(
+            f"<tr><td>{n}</td><td>{(n - 1) % 12 + 1:02d}/15/{2010 + n}</td>"
+            f"<td><a href=\"{PDF_PATH}/{kennel_id}/{n}\">View</a></td></tr>"
+            for n in range(1, self.pdfs_per_kennel + 1)
+        )
+        return (
+            "<html><body><div class=\"container\"><div><h4>Kennel Inspections</h4>"
+            f"<p>KENNEL</p><p>Kennel {kennel_id}</p><p>1 Main Street</p><p>Town PA 17000</p>"
+            f"<p>County: {county}</p><p>Township: Standin</p>"
+            f"<p>LICENSE NUMBER</p><p>{kennel_id}</p><p>LAST STATUS</p><p>Open</p>"
+            "<p>LAST ISSUED LICENSE YEAR</p><p>2024</p><p>LAST LICENSE CLASS</p><p>K1: 26-50 dogs</p>"
+            "<table class=\"table\"><tr><th>#</th><th>Date</th><th>Report</th></tr>"
+            + inspections + "</table></div></div></body></html>"
+        )
+
+
+class StandInServer:
+    """aiohttp server answering like the PDA site, with injected latency and errors."""
+    def __init__(self, site: Optional[SyntheticSite] = None, cassette: Optional[Cassette] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.site = site or SyntheticSite()
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.host = host
+        self.port = port
+        self.url = ""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[Thread] = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+
+    def _respond(self, body: bytes, status: int = 200, headers: Optional[dict] = None,
+                 content_type: Optional[str] = None) -> web.Response:
+        self.bytes_sent += len(body)
+        return web.Response(body=body, status=status, headers=headers, content_type=content_type)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        if self.cassette is not None:
+            return await self._replay(request)
+        return await self._synthetic(request)
+
+    async def _replay(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        entry = self.cassette.get(request_key(request.method, request.path_qs, body))
+        if entry is None:
+            return web.Response(status=404, text="Not in cassette")
+        headers = {k: v for k, v in entry['headers'].items() if k.lower() not in SKIP_HEADERS}
+        return self._respond(entry_body(entry), entry['status'], headers)
+
+    async def _synthetic(self, request: web.Request) -> web.Response:
+        path = request.path
+        if request.method == "POST" and path == SEARCH_PATH:
+            form = await request.post()
+            county_id = int(form.get("County") or 0)
+            return self._respond(self.site.search_page(county_id).encode(), content_type="text/html")
+        if path.startswith(DETAILS_PATH + "/"):
+            kennel_id = int(path.rsplit("/", 1)[-1])
+            return self._respond(self.site.details_page(kennel_id).encode(), content_type="text/html")
+        if path.startswith(PDF_PATH + "/"):
+            kennel_id, number = path[len(PDF_PATH) + 1:].split("/")[:2]
+            return self._respond(self.site.pdf(int(kennel_id), int(number)), content_type="application/pdf")
+        return web.Response(status=404, text="Not found")
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self.url = f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Serve from a background thread; returns the base URL."""
+        ready = Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the PDA kennel inspection site')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--cassette', help='Serve responses recorded with scraper.py --record instead of synthetic ones')
+    parser.add_argument('--kennels-per-county', type=int, default=20, help='Synthetic kennels per county (default: 20)')
+    parser.add_argument('--pdfs-per-kennel', type=int, default=3, help='Synthetic PDFs per kennel (default: 3)')
+    parser.add_argument('--pdf-size', type=int, default=50_000, help='Synthetic PDF size in bytes (default: 50000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 503 (default: 0)')
+
+    args = parser.parse_args()
+
+    server = StandInServer(
+        site=SyntheticSite(args.kennels_per_county, args.pdfs_per_kennel, args.pdf_size),
+        cassette=Cassette(args.cassette) if args.cassette else None,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        host=args.host,
+        port=args.port
+    )
+    url = server.start()
+    print(f"Stand-in server on {url} ({'cassette ' + args.cassette if args.cassette else 'synthetic'}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
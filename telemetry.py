@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Crawl telemetry for the PA Kennel Inspection scraper
+Structured JSON-lines events (one per request, plus crawl milestones) and a
+Prometheus text endpoint with request latency histograms, in-flight
+requests, queue depths and throughput counters, so a crawl running headless
+under cron can be watched and alerted on.
+"""
+
+import sys
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+KINDS = ('search', 'details', 'pdf')
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Retry number of the request being sent (0 = first try), set by the retry loops
+ATTEMPT: ContextVar[int] = ContextVar('attempt', default=0)
+
+
+@contextmanager
+def request_attempt(number: int):
+    """Tag requests sent inside the block as retry number `number`."""
+    token = ATTEMPT.set(number)
+    try:
+        yield
+    finally:
+        ATTEMPT.reset(token)
+
+
+def url_kind(url: str) -> str:
+    """URL class of a crawl request: 'search', 'details' or 'pdf'."""
+    path = urlsplit(url).path
+    if path.endswith('/SearchForm'):
+        return 'search'
+    if '/KennelInspections/Details' in path:
+        return 'details'
+    return 'pdf'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}'
+
+
+class Telemetry:
+    """Thread-safe request metrics, event log and Prometheus exposition.
+
+    Engines report each request with request_started()/request_finished();
+    anything else worth exposing (queue depths, rate limit, Stats counters)
+    is registered with collect() as a callable read at scrape time.
+    """
+    def __init__(self, events: Optional[str] = None):
+        self.lock = Lock()
+        self.started = time.time()
+        self.in_flight = dict.fromkeys(KINDS, 0)
+        self.requests: dict[tuple[str, str], int] = {}
+        self.retries = dict.fromkeys(KINDS, 0)
+        self.bytes = dict.fromkeys(KINDS, 0)
+        self.latency = {kind: Histogram() for kind in KINDS}
+        self.collectors: dict[str, tuple[str, str, str, Callable]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._events = None
+        if events == '-':
+            self._events = sys.stdout
+        elif events:
+            self._events = open(events, 'a', buffering=1, encoding='utf-8')
+
+    # --- events -------------------------------------------------------------
+
+    def event(self, name: str, **fields):
+        """Write one JSON-lines event (no-op without an event sink)."""
+        if self._events is None:
+            return
+        line = json.dumps({'ts': round(time.time(), 3), 'event': name, **fields}, default=str)
+        with self.lock:
+            self._events.write(line + '\n')
+            self._events.flush()
+
+    # --- requests -----------------------------------------------------------
+
+    def request_started(self, url: str) -> str:
+        kind = url_kind(url)
+        with self.lock:
+            self.in_flight[kind] += 1
+        return kind
+
+    def request_finished(self, kind: str, method: str, url: str, status: Optional[int],
+                         nbytes: int, latency: float, error: Optional[str] = None, attempt: Optional[int] = None):
+        """Record a finished request; status None means it failed before a response.
+
+        `attempt` defaults to the retry number set with request_attempt().
+        """
+        attempt = ATTEMPT.get() if attempt is None else attempt
+        status_label = str(status) if status is not None else 'error'
+        with self.lock:
+            self.in_flight[kind] -= 1
+            self.requests[(kind, status_label)] = self.requests.get((kind, status_label), 0) + 1
+            self.bytes[kind] += nbytes
+            if attempt:
+                self.retries[kind] += 1
+            self.latency[kind].observe(latency)
+        fields = {'kind': kind, 'method': method, 'url': url, 'status': status, 'bytes': nbytes,
+                  'latency': round(latency, 4), 'retries': attempt}
+        if error:
+            fields['error'] = error
+        self.event('request', **fields)
+
+    # --- metrics ------------------------------------------------------------
+
+    def collect(self, name: str, help_text: str, fn: Callable, metric_type: str = 'gauge', label: str = None):
+        """Expose fn() at scrape time; a dict result becomes one sample per key under `label`.
+
+        Registering the same name again replaces the previous collector, so
+        each crawl in a long-lived process reports its own objects.
+        """
+        with self.lock:
+            self.collectors[name] = (help_text, metric_type, label, fn)
+
+    def render(self) -> str:
+        """Current metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, help_text, metric_type):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        with self.lock:
+            header('scraper_requests_total', 'Requests finished, by URL class and HTTP status', 'counter')
+            for (kind, status), count in sorted(self.requests.items()):
+                lines.append(f"scraper_requests_total{_labels(kind=kind, status=status)} {count}")
+
+            header('scraper_request_retries_total', 'Requests that were retries of an earlier attempt', 'counter')
+            for kind in KINDS:
+                lines.append(f"scraper_request_retries_total{_labels(kind=kind)} {self.retries[kind]}")
+
+            header('scraper_response_bytes_total', 'Response body bytes received', 'counter')
+            for kind in KINDS:
+                lines.append(f"scraper_response_bytes_total{_labels(kind=kind)} {self.bytes[kind]}")
+
+            header('scraper_requests_in_flight', 'Requests sent and not yet finished', 'gauge')
+            for kind in KINDS:
+                lines.append(f"scraper_requests_in_flight{_labels(kind=kind)} {self.in_flight[kind]}")
+
+            header('scraper_request_duration_seconds', 'Request latency', 'histogram')
+            for kind in KINDS:
+                hist = self.latency[kind]
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f"scraper_request_duration_seconds_bucket{_labels(kind=kind, le=bound)} {count}")
+                lines.append(f"scraper_request_duration_seconds_bucket{_labels(kind=kind, le='+Inf')} {hist.count}")
+                lines.append(f"scraper_request_duration_seconds_sum{_labels(kind=kind)} {hist.sum:.6f}")
+                lines.append(f"scraper_request_duration_seconds_count{_labels(kind=kind)} {hist.count}")
+
+            header('scraper_start_time_seconds', 'Unix time the scraper process started', 'gauge')
+            lines.append(f"scraper_start_time_seconds {self.started:.3f}")
+
+            collectors = list(self.collectors.items())
+
+        for name, (help_text, metric_type, label, fn) in collectors:
+            try:
+                value = fn()
+            except Exception:
+                continue  # the object behind it is gone (e.g. a finished crawl's frontier)
+            header(name, help_text, metric_type)
+            if isinstance(value, dict):
+                for key, sample in value.items():
+                    lines.append(f"{name}{_labels(**{label: key})} {sample}")
+            else:
+                lines.append(f"{name} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int, host: str = '0.0.0.0') -> int:
+        """Serve /metrics from a background thread; returns the bound port."""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = telemetry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._events is not None and self._events is not sys.stdout:
+            self._events.close()
+        self._events = None
+
+
+# Telemetry the engines report to; None (the default) costs nothing
+_telemetry: Optional[Telemetry] = None
+
+
+def use_telemetry(telemetry: Optional[Telemetry]):
+    """Report requests and crawl progress to `telemetry` from now on; None turns it off."""
+    global _telemetry
+    _telemetry = telemetry
+
+
+def get_telemetry() -> Optional[Telemetry]:
+    return _telemetry
@@ -0,0 +1,7 @@
+"""Shared test setup: import the top-level modules from the repository root."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
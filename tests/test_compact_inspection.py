@@ -0,0 +1,77 @@
+"""CompactInspection, the form parsed reports take from import workers to the importer."""
+
+import pickle
+import random
+import sqlite3
+
+import pytest
+
+import scraper
+from db_importer import update_database_schema, import_inspection_blob
+from pdf_parser import InspectionData, CompactInspection, compact, parse_inspection_text, COUNT_FIELDS
+from standin_server import SyntheticSite
+from test_pdf_parser import mutate
+
+SITE = SyntheticSite()
+
+
+def reports():
+    rng = random.Random(2025)
+    for kennel_id in range(10001, 10021):
+        text = SITE.report_text(kennel_id, kennel_id % 7 + 1)
+        yield parse_inspection_text(text)
+        yield parse_inspection_text(mutate(text, rng))
+
+
+@pytest.mark.parametrize('data', list(reports()), ids=lambda data: data.kennel_name or 'blank')
+def test_round_trip(data):
+    packed = compact(data)
+    assert isinstance(packed, CompactInspection)
+    assert packed.to_data() == data
+    assert pickle.loads(pickle.dumps(packed)) == packed
+    assert compact(packed) is packed
+
+
+def test_unknown_section_and_result_pass_through():
+    data = InspectionData(kennel_name='Kennel', inspection_items=[
+        {'section': 'New Section', 'code': '1.1', 'name': 'Something new', 'result': 'Deferred'},
+    ])
+    packed = compact(data)
+    assert packed.curr_counts == packed.prev_counts == ()
+    assert packed.item_rows() == [('New Section', '1.1', 'Something new', 'Deferred')]
+    assert packed.to_data() == data
+
+
+def test_pickles_smaller():
+    data = max(reports(), key=lambda data: len(data.inspection_items))
+    assert len(pickle.dumps(compact(data))) < len(pickle.dumps(data))
+
+
+def test_import_writes_the_parsed_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scraper.init_database()
+    update_database_schema(scraper.DB_FILE)
+    conn = sqlite3.connect(scraper.DB_FILE)
+    conn.execute("INSERT INTO inspections (kennel_id, inspection_date, pdf_sha256) VALUES (1, '2024-01-01', 'sha')")
+    conn.commit()
+    conn.close()
+
+    data = parse_inspection_text(SITE.report_text(10001, 3))
+    assert import_inspection_blob(scraper.DB_FILE, compact(data), 'sha') == 1
+
+    conn = sqlite3.connect(scraper.DB_FILE)
+    counts = conn.execute(
+        'SELECT year_type, boarding, breeding, other_count, transfer, on_prem, off_site FROM dog_counts ORDER BY year_type'
+    ).fetchall()
+    items = conn.execute(
+        'SELECT category_section, category_code, category_name, result FROM inspection_items ORDER BY id'
+    ).fetchall()
+    inspector, = conn.execute('SELECT inspector_name FROM inspections').fetchone()
+    conn.close()
+
+    assert counts == [
+        ('current', *(data.curr_year_counts[name] for name in COUNT_FIELDS)),
+        ('previous', *(data.prev_year_counts[name] for name in COUNT_FIELDS)),
+    ]
+    assert items == [(item['section'], item['code'], item['name'], item['result']) for item in data.inspection_items]
+    assert inspector == data.inspector_name
@@ -0,0 +1,62 @@
+"""DBWriter batches: a bad row loses only itself, a locked database is waited out."""
+
+import sqlite3
+
+import pytest
+
+import scraper
+from scraper import DBWriter, KennelDetails, Stats
+
+
+def kennel(kennel_id: int) -> KennelDetails:
+    return KennelDetails(kennel_id, f'Kennel {kennel_id}', '1 Main Street', 'Town', 'PA', '17000', 'Adams',
+                         'Standin', str(kennel_id), 'Open', '2024', 'K1: 26-50 dogs', f'https://example.test/{kennel_id}')
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, 'backoff_delay', lambda attempt, base=1.0, cap=30.0: 0)
+    scraper.init_database()
+    return scraper.DB_FILE
+
+
+def kennel_ids(db: str) -> list[int]:
+    conn = sqlite3.connect(db)
+    rows = conn.execute('SELECT kennel_id FROM kennels ORDER BY kennel_id').fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def test_bad_row_drops_only_itself(db):
+    stats = Stats()
+    writer = DBWriter(db, batch_size=100, flush_interval=60, stats=stats)
+    writer.save_kennel(kennel(1))
+    writer.queue.put(('INSERT INTO no_such_table VALUES (?)', (1,)))
+    writer.save_kennel(kennel(2))
+    writer.start().close()
+
+    assert kennel_ids(db) == [1, 2]
+    assert writer.rows_dropped == 1 and stats.rows_dropped == 1
+    assert writer.rows_written == 2
+    assert 'dropped' in writer.rows_summary()
+
+
+def test_locked_database_is_retried(db, monkeypatch):
+    writer = DBWriter(db)
+    write = writer._write
+    attempts = []
+
+    def locked_twice(conn, batch):
+        attempts.append(len(batch))
+        if len(attempts) <= 2:
+            raise sqlite3.OperationalError('database is locked')
+        write(conn, batch)
+
+    monkeypatch.setattr(writer, '_write', locked_twice)
+    writer.save_kennel(kennel(1))
+    writer.save_kennel(kennel(2))
+    writer.start().close()
+
+    assert attempts == [2, 2, 2]
+    assert kennel_ids(db) == [1, 2] and writer.rows_dropped == 0
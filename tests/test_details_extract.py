@@ -0,0 +1,140 @@
+"""parse_details_page (one parse per details page, either HTML backend) against the
+BeautifulSoup parsing the scraper did before html_backends existed."""
+
+import re
+from pathlib import Path
+from urllib.parse import urljoin
+
+import pytest
+from bs4 import BeautifulSoup
+
+import html_backends
+from scraper import BASE_URL, KennelDetails, parse_details_page
+from standin_server import SyntheticSite
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "kennel_details.html"
+DETAILS_URL = f"{BASE_URL}/PADogLawPublicKennelInspectionSearch/KennelInspections/Details/21894"
+REPORT_URL = f"{BASE_URL}/PADogLawPublicKennelInspectionSearch/KennelInspections/GetInspectionReport"
+
+
+@pytest.fixture(params=['bs4', 'lxml'])
+def backend(request):
+    if request.param not in html_backends.BACKENDS:
+        pytest.skip(f"{request.param} is not installed")
+    previous = html_backends.current_backend()
+    html_backends.set_backend(request.param)
+    yield request.param
+    html_backends.set_backend(previous)
+
+
+def baseline_details(html: str, details_url: str, county_name: str) -> KennelDetails:
+    """The original parse_kennel_details, minus the request."""
+    soup = BeautifulSoup(html, 'html.parser')
+    kennel_id = int(details_url.split('/')[-1])
+    lines = []
+    name = address = city = zip_code = township = ""
+    license_number = last_status = last_issued_year = last_license_class = ""
+    state = "PA"
+
+    kennel_section = soup.find('h4', string=re.compile('Kennel Inspections', re.I))
+    parent = kennel_section.find_parent()
+    all_text = []
+    for elem in parent.children:
+        if elem.name == 'table':
+            break
+        if hasattr(elem, 'get_text'):
+            all_text.append(elem.get_text(separator='\n', strip=True))
+        elif isinstance(elem, str) and elem.strip():
+            all_text.append(elem.strip())
+    lines = [l.strip() for l in '\n'.join(all_text).split('\n') if l.strip()]
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line == 'KENNEL' and i + 1 < len(lines):
+            name = lines[i + 1]
+            i += 2
+            addr_parts = []
+            while i < len(lines) and not lines[i].startswith('County:'):
+                addr_parts.append(lines[i])
+                i += 1
+            if addr_parts:
+                address = addr_parts[0]
+                if len(addr_parts) > 1:
+                    match = re.match(r'(.+?)\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)', addr_parts[-1])
+                    if match:
+                        city, state, zip_code = match.group(1).strip(), match.group(2), match.group(3)
+            continue
+        if line == 'LICENSE NUMBER':
+            license_number = next((l for l in lines[i + 1:i + 5] if re.match(r'^\d+$', l)), license_number)
+        if line == 'LAST STATUS':
+            last_status = next((l for l in lines[i + 1:i + 5] if 'Closed' in l or 'Open' in l
+                                or l == 'Application/License Refused'), last_status)
+        if line == 'LAST ISSUED LICENSE YEAR':
+            last_issued_year = next((l for l in lines[i + 1:i + 5] if re.match(r'^\d{4}$', l)), last_issued_year)
+        if line == 'LAST LICENSE CLASS':
+            last_license_class = next((l for l in lines[i + 1:i + 5]
+                                       if re.match(r'^[A-Z]+\d*:', l) or 'dogs' in l.lower()), last_license_class)
+        i += 1
+
+    for line in lines:
+        if line.startswith('County:') and line.replace('County:', '').strip():
+            county_name = line.replace('County:', '').strip()
+        if line.startswith('Township:'):
+            township = line.replace('Township:', '').strip()
+
+    return KennelDetails(kennel_id, name, address, city, state, zip_code, county_name, township, license_number,
+                         last_status, last_issued_year, last_license_class, details_url)
+
+
+def baseline_pdfs(html: str) -> list[dict]:
+    """The original get_inspection_pdfs, minus the request."""
+    table = BeautifulSoup(html, 'html.parser').find('table', class_='table')
+    pdfs = []
+    for row in table.find_all('tr')[1:]:
+        cells = row.find_all('td')
+        if len(cells) >= 3:
+            link = cells[2].find('a')
+            if link and link.get('href'):
+                pdfs.append({'date': cells[1].get_text(strip=True), 'url': urljoin(BASE_URL, link['href'])})
+    return pdfs
+
+
+def test_saved_details_page(backend):
+    html = FIXTURE.read_text(encoding='utf-8')
+    details, pdfs = parse_details_page(html, DETAILS_URL, 'Unknown')
+
+    assert details == KennelDetails(
+        kennel_id=21894,
+        name='Hillside Acres Kennel & Boarding',
+        address='1234 Old Mill Road',
+        city='Gettysburg',
+        state='PA',
+        zip_code='17325-8012',
+        county='Adams',
+        township='Cumberland',
+        license_number='21894',
+        last_status='Closed - Voluntarily',
+        last_issued_license_year='2023',
+        last_license_class='K2: 51-100 dogs',
+        details_url=DETAILS_URL
+    )
+    # The row without a report link is skipped
+    assert pdfs == [
+        {'date': '11/02/2023', 'url': f"{REPORT_URL}/90211"},
+        {'date': '03/09/2021', 'url': f"{REPORT_URL}/77040?download=1"},
+    ]
+    assert (details, pdfs) == (baseline_details(html, DETAILS_URL, 'Unknown'), baseline_pdfs(html))
+
+
+@pytest.mark.parametrize('pdfs_per_kennel', [0, 1, 12])
+def test_synthetic_details_pages(backend, pdfs_per_kennel):
+    site = SyntheticSite(pdfs_per_kennel=pdfs_per_kennel)
+    for county_id in (1, 36, 67):
+        kennel_id = site.kennel_id(county_id, 0)
+        url = f"{BASE_URL}/PADogLawPublicKennelInspectionSearch/KennelInspections/Details/{kennel_id}"
+        html = site.details_page(kennel_id)
+        details, pdfs = parse_details_page(html, url, 'Unknown')
+        assert (details, pdfs) == (baseline_details(html, url, 'Unknown'), baseline_pdfs(html))
+        assert details.license_number == str(kennel_id)
+        assert len(pdfs) == pdfs_per_kennel
@@ -0,0 +1,51 @@
+"""County listing snapshots and the diffs listing-only crawls are driven by."""
+
+import sqlite3
+
+import pytest
+
+from listings import CountyListings
+
+
+def kennel(kennel_id: int, status: str = 'Active') -> dict:
+    return {'kennel_id': kennel_id, 'license_number': f'L{kennel_id}', 'name': f'Kennel {kennel_id}',
+            'status': status, 'details_url': f'https://example.test/Details/{kennel_id}',
+            'county_id': 1, 'county_name': 'Adams'}
+
+
+@pytest.fixture
+def listings(tmp_path):
+    db_path = str(tmp_path / 'crawl.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE kennels (kennel_id INTEGER, license_number TEXT, name TEXT, last_status TEXT, '
+                 'details_url TEXT, county TEXT)')
+    conn.executemany('INSERT INTO kennels VALUES (?, ?, ?, ?, ?, ?)',
+                     [(k['kennel_id'], k['license_number'], k['name'], k['status'], k['details_url'], 'ADAMS')
+                      for k in (kennel(1), kennel(2))])
+    conn.commit()
+    conn.close()
+    listings = CountyListings(db_path)
+    yield listings
+    listings.close()
+
+
+def test_first_diff_is_against_the_kennels_table(listings):
+    diff = listings.diff(1, 'Adams', [kennel(1), kennel(2, 'Revoked'), kennel(3)])
+    assert [k['kennel_id'] for k in diff.new] == [3]
+    assert [k['kennel_id'] for k in diff.changed] == [2]
+    assert diff.removed == [] and diff.unchanged == 1
+
+
+def test_diff_is_against_the_last_snapshot(listings):
+    listings.save(1, [kennel(1), kennel(3)])
+    diff = listings.diff(1, 'Adams', [kennel(1), kennel(3)])
+    assert diff.to_visit == [] and diff.unchanged == 2
+
+
+def test_empty_snapshot_is_not_a_fallback(listings):
+    diff = listings.diff(1, 'Adams', [])
+    assert sorted(k['kennel_id'] for k in diff.removed) == [1, 2]
+
+    listings.save(1, [])
+    assert listings.previous(1, 'Adams') == {}
+    assert listings.diff(1, 'Adams', []).to_visit == []
@@ -0,0 +1,62 @@
+"""Selecting the PDFs that an older parser version imported, for --outdated."""
+
+import sqlite3
+
+import pytest
+
+import scraper
+from db_importer import update_database_schema, get_outdated_imports, import_inspection_blob
+from pdf_parser import parse_inspection_text, PARSER_VERSION
+from standin_server import SyntheticSite
+
+# (pdf_path, pdf_sha256, inspector_name, parser_version)
+INSPECTIONS = [
+    ('a.pdf', 'sha-a', 'Inspector A', None),            # imported before versioning
+    ('b.pdf', 'sha-b', 'Inspector B', PARSER_VERSION - 1),
+    ('c.pdf', 'sha-c', 'Inspector C', PARSER_VERSION),  # current
+    ('d.pdf', 'sha-d', None, None),                     # never imported
+    ('', 'sha-e', 'Inspector E', None),                 # pack only
+    ('f.pdf', None, 'Inspector F', None),               # tree only
+    ('b.pdf', 'sha-b', 'Inspector B', PARSER_VERSION - 1),  # second inspection of the same PDF
+]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scraper.init_database()
+    update_database_schema(scraper.DB_FILE)
+    conn = sqlite3.connect(scraper.DB_FILE)
+    conn.executemany(
+        'INSERT INTO inspections (kennel_id, inspection_date, pdf_path, pdf_sha256, inspector_name, parser_version) '
+        'VALUES (1, ?, ?, ?, ?, ?)',
+        [(f'2024-01-{day:02d}', *row) for day, row in enumerate(INSPECTIONS, 1)]
+    )
+    conn.commit()
+    conn.close()
+    return scraper.DB_FILE
+
+
+def test_tree_selects_older_versions_by_path(db):
+    assert get_outdated_imports(db, PARSER_VERSION, 'tree') == ['a.pdf', 'b.pdf', 'f.pdf']
+
+
+def test_pack_selects_older_versions_by_sha256(db):
+    assert get_outdated_imports(db, PARSER_VERSION, 'pack') == ['sha-a', 'sha-b', 'sha-e']
+
+
+def test_nothing_is_older_than_the_first_version(db):
+    assert get_outdated_imports(db, 0, 'tree') == ['a.pdf', 'f.pdf']
+
+
+def test_reimport_stamps_the_current_version(db):
+    data = parse_inspection_text(SyntheticSite().report_text(10001, 1))
+    assert data.parser_version == PARSER_VERSION and data.text_sha256
+
+    assert import_inspection_blob(db, data, 'sha-b') == 2
+    assert get_outdated_imports(db, PARSER_VERSION, 'pack') == ['sha-a', 'sha-e']
+
+    conn = sqlite3.connect(db)
+    stamps = conn.execute("SELECT DISTINCT parser_version, text_sha256 FROM inspections WHERE pdf_sha256 = 'sha-b'").fetchall()
+    conn.close()
+    assert stamps == [(PARSER_VERSION, data.text_sha256)]
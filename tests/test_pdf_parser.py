@@ -0,0 +1,71 @@
+"""The single-pass report parser against the legacy multi-pass one it replaced."""
+
+import random
+
+import pytest
+
+from pdf_parser import parse_text_legacy, parse_text_single_pass, parse_inspection_text, PARSER_VERSION
+from standin_server import SyntheticSite
+
+SITE = SyntheticSite()
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    """A report with a few lines dropped, duplicated, re-spaced or cut off, as pdftotext layouts vary."""
+    lines = text.split('\n')
+    for _ in range(rng.randint(1, 4)):
+        i = rng.randrange(len(lines))
+        change = rng.choice(('drop', 'duplicate', 'respace', 'compact', 'blank', 'truncate'))
+        if change == 'drop':
+            del lines[i]
+        elif change == 'duplicate':
+            lines.insert(i, lines[i])
+        elif change == 'respace':
+            lines[i] = ' '.join(lines[i].split()) if rng.random() < 0.5 else '  ' + lines[i]
+        elif change == 'compact':
+            lines[i] = lines[i].replace('CurrYr: ', 'CurrYr:').replace('PrevYr: ', 'PrevYr:')
+        elif change == 'blank':
+            lines.insert(i, '')
+        else:
+            lines = lines[:max(i, 1)]
+        if not lines:
+            break
+    return '\n'.join(lines)
+
+
+@pytest.mark.parametrize('items', [0, 1, 5, 30, 120])
+@pytest.mark.parametrize('remark_lines', [0, 3, 12])
+def test_synthetic_reports(items, remark_lines):
+    for number in range(1, 6):
+        text = SITE.report_text(10001 + number, number, items=items, remark_lines=remark_lines)
+        assert parse_text_single_pass(text) == parse_text_legacy(text)
+
+
+def test_mutated_reports():
+    rng = random.Random(2021)
+    for n in range(500):
+        text = mutate(SITE.report_text(10001 + n, n % 7 + 1, items=rng.choice((3, 30, 60))), rng)
+        assert parse_text_single_pass(text) == parse_text_legacy(text), text
+
+
+@pytest.mark.parametrize('text', ['', '\n\n', 'not an inspection report'])
+def test_non_reports(text):
+    assert parse_text_single_pass(text) == parse_text_legacy(text)
+
+
+def test_fields_extracted():
+    data = parse_text_single_pass(SITE.report_text(10001, 1, items=5, remark_lines=2))
+    assert data.license_number == '10001'
+    assert data.inspection_date == '01/15/2011'
+    assert data.curr_year_counts['boarding'] == 1
+    items = {(item['section'], item['code'], item['name'], item['result']) for item in data.inspection_items}
+    assert ('Kennel Regulations', '21.20a', 'Requirement 0 for kennel housing', 'Unsatisfactory') in items
+    assert ('Kennel Acts', '459.207', 'Dog Licenses', 'Not Applicable') in items  # result wrapped onto the next line
+    assert ('Miscellaneous', '', 'Reinspection Required', 'Yes') in items
+    assert data.reinspection_required
+
+
+def test_both_parsers_selectable():
+    text = SITE.report_text(10001, 1)
+    assert parse_inspection_text(text, 'legacy') == parse_inspection_text(text, 'single-pass')
+    assert parse_inspection_text(text).parser_version == PARSER_VERSION
@@ -0,0 +1,44 @@
+"""Read-only PdfStore opens, as used by parser worker processes."""
+
+import sqlite3
+
+import pytest
+
+from pdf_store import PdfStore
+
+PDF = b'%PDF-1.4 report\n%%EOF'
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / 'pdf_store', str(tmp_path / 'crawl.db')
+
+
+def test_reader_does_not_wait_for_a_writing_crawl(paths):
+    root, db_path = paths
+    writer = PdfStore(root, db_path)
+    sha256 = writer.put(PDF)
+    writer.flush()
+
+    crawl = sqlite3.connect(db_path, timeout=0)
+    crawl.execute('BEGIN IMMEDIATE')  # a crawl holding the write lock
+    reader = PdfStore(root, db_path, readonly=True)
+    assert reader.get(sha256) == PDF
+    with pytest.raises(PermissionError):
+        reader.put(PDF)
+    reader.close()
+    crawl.rollback()
+    crawl.close()
+    writer.close()
+
+
+def test_reader_creates_nothing(paths):
+    root, db_path = paths
+    sqlite3.connect(db_path).close()
+    reader = PdfStore(root, db_path, readonly=True)
+    reader.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT name FROM sqlite_master').fetchall() == []
+    conn.close()
+    assert not root.exists()
@@ -0,0 +1,36 @@
+"""AdaptiveRateLimiter's reaction to slow responses, per URL class."""
+
+from scraper import AdaptiveRateLimiter
+
+
+def limiter() -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(rate=5.0, max_rate=10.0, cooldown=0.0)
+
+
+def test_slow_pdfs_do_not_throttle_against_html_latency():
+    rate_limiter = limiter()
+    for _ in range(5):
+        rate_limiter.record(200, 0.05, kind='details')
+    rate = rate_limiter.rate
+
+    rate_limiter.record(200, 2.0, kind='pdf')
+    assert rate_limiter.rate > rate
+
+
+def test_slow_response_of_the_same_class_cuts_the_rate():
+    rate_limiter = limiter()
+    for _ in range(5):
+        rate_limiter.record(200, 0.05, kind='details')
+        rate_limiter.record(200, 2.0, kind='pdf')
+    rate = rate_limiter.rate
+
+    rate_limiter.record(200, 1.0, kind='details')
+    assert rate_limiter.rate == rate * rate_limiter.decrease
+    rate_limiter.record(200, 10.0, kind='pdf')
+    assert rate_limiter.rate == rate * rate_limiter.decrease ** 2
+
+
+def test_failures_cut_the_rate():
+    rate_limiter = limiter()
+    rate_limiter.record(503, 0.05, kind='search')
+    assert rate_limiter.rate == 5.0 * rate_limiter.decrease
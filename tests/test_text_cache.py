@@ -0,0 +1,95 @@
+"""Extracted-text cache keyed by PDF SHA-256 and extractor version."""
+
+import hashlib
+
+import pytest
+
+import pdf_parser
+import text_cache
+from text_cache import TextCache
+
+SHA = hashlib.sha256(b'%PDF-1.4 report').hexdigest()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TextCache(str(tmp_path / 'cache.db'))
+    yield cache
+    cache.close()
+
+
+def test_text_is_keyed_by_version(cache):
+    cache.put(SHA, 'pdftotext version 22.02.0', 'old layout')
+
+    assert cache.get(SHA, 'pdftotext version 22.02.0') == 'old layout'
+    assert cache.get(SHA, 'pdftotext version 24.02.0') is None
+    assert cache.has(SHA, 'pdftotext version 22.02.0')
+    assert not cache.has(SHA, 'pdftotext version 24.02.0')
+    assert cache.get('0' * 64, 'pdftotext version 22.02.0') is None
+
+
+def test_missing_version_falls_back_to_newest_text(cache):
+    cache.put(SHA, 'v1', 'first')
+    cache.put(SHA, 'v2', 'second')
+    cache.conn.execute("UPDATE pdf_texts SET cached_at = '2020-01-01' WHERE version = 'v1'")
+    cache.conn.commit()
+
+    assert cache.get(SHA, None) == 'second'
+    assert cache.get('0' * 64, None) is None
+
+
+def test_prune_keeps_one_version(cache):
+    cache.put(SHA, 'v1', 'first')
+    cache.put(SHA, 'v2', 'second')
+    cache.put('0' * 64, 'v2', 'other')
+
+    assert cache.prune('v2') == 1
+    assert cache.get(SHA, 'v1') is None
+    assert cache.get(SHA, 'v2') == 'second'
+    assert [(version, pdfs) for version, pdfs, *_ in cache.stats()] == [('v2', 2)]
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    """pdf_parser extracting with a counting stand-in for pdftotext, caching into tmp_path."""
+    calls = []
+    version = {'current': 'stand-in 1'}
+
+    def layout(pdf_bytes):
+        calls.append(pdf_bytes)
+        return f"text from {version['current']}"
+
+    monkeypatch.setitem(pdf_parser.EXTRACTORS, 'pdftotext', (layout, lambda: version['current']))
+    monkeypatch.setattr(pdf_parser, '_extractor', 'pdftotext')
+    previous = text_cache._cache_path
+    text_cache.use_cache(str(tmp_path / 'cache.db'))
+    yield calls, version
+    if text_cache._cache is not None:
+        text_cache._cache.close()
+    text_cache.use_cache(previous)
+
+
+def test_extraction_reuses_cached_text(extractor):
+    calls, version = extractor
+    pdf_bytes = b'%PDF-1.4 report'
+
+    assert pdf_parser.extract_pdf_text_from_bytes(pdf_bytes) == 'text from stand-in 1'
+    assert pdf_parser.extract_pdf_text_from_bytes(pdf_bytes) == 'text from stand-in 1'
+    assert len(calls) == 1
+
+    version['current'] = 'stand-in 2'
+    assert pdf_parser.extract_pdf_text_from_bytes(pdf_bytes) == 'text from stand-in 2'
+    assert len(calls) == 2
+
+
+def test_unknown_version_uses_any_cached_text_and_caches_nothing(extractor):
+    calls, version = extractor
+    pdf_bytes = b'%PDF-1.4 report'
+    pdf_parser.extract_pdf_text_from_bytes(pdf_bytes)
+
+    version['current'] = None
+    assert pdf_parser.extract_pdf_text_from_bytes(pdf_bytes) == 'text from stand-in 1'
+    assert len(calls) == 1
+
+    assert pdf_parser.extract_pdf_text_from_bytes(b'%PDF-1.4 another') == 'text from None'
+    assert [version for version, *_ in text_cache.get_cache().stats()] == ['stand-in 1']
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Extracted-text cache for PA Kennel Inspection PDFs
+Keeps the -layout text of every PDF, zlib-compressed in its own SQLite file
+and keyed by the PDF's SHA-256 and the version of the extractor that produced
+it (pdftotext, or the poppler bindings), so re-parsing the corpus after a
+parser change reads text instead of extracting every file again. pdf_parser
+consults it before extracting and fills it after; `python text_cache.py
+prewarm` fills it for every stored PDF in parallel. The cache is
+disposable: deleting the file only costs time.
+"""
+
+import os
+import zlib
+import hashlib
+import sqlite3
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+CACHE_FILE = "pdf_text_cache.db"
+DB_FILE = "kennel_inspections.db"
+INSPECTIONS_DIR = Path("kennel_inspections")
+CHUNK_SIZE = 16  # PDFs per task sent to a prewarm worker
+
+
+@lru_cache(maxsize=1)
+def pdftotext_version() -> Optional[str]:
+    """First line of `pdftotext -v` (e.g. 'pdftotext version 22.02.0'); None when pdftotext is missing."""
+    try:
+        result = subprocess.run(['pdftotext', '-v'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    lines = (result.stderr or result.stdout).strip().splitlines()
+    return lines[0].strip() if lines else None
+
+
+class TextCache:
+    """Extracted text by (PDF SHA-256, extractor version); safe to share between threads."""
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pdf_texts (
+                sha256 TEXT NOT NULL,
+                version TEXT NOT NULL,
+                text BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (sha256, version)
+            )
+        ''')
+        self.conn.commit()
+
+    def get(self, sha256: str, version: Optional[str]) -> Optional[str]:
+        """Cached text of a PDF; with no extractor version (pdftotext missing) any cached version will do."""
+        with self.lock:
+            if version is None:
+                row = self.conn.execute(
+                    'SELECT text FROM pdf_texts WHERE sha256 = ? ORDER BY cached_at DESC LIMIT 1', (sha256,)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    'SELECT text FROM pdf_texts WHERE sha256 = ? AND version = ?', (sha256, version)
+                ).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def has(self, sha256: str, version: str) -> bool:
+        with self.lock:
+            return self.conn.execute(
+                'SELECT 1 FROM pdf_texts WHERE sha256 = ? AND version = ?', (sha256, version)
+            ).fetchone() is not None
+
+    def put(self, sha256: str, version: str, text: str):
+        self.put_many([(sha256, version, compress(text), len(text))])
+
+    def put_many(self, rows: list[tuple[str, str, bytes, int]]):
+        """Store (sha256, version, compressed text, text length) rows."""
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO pdf_texts (sha256, version, text, size) VALUES (?, ?, ?, ?)', rows
+            )
+            self.conn.commit()
+
+    def prune(self, keep_version: str) -> int:
+        """Drop text extracted by any other extractor version; returns the rows removed."""
+        with self.lock:
+            removed = self.conn.execute('DELETE FROM pdf_texts WHERE version != ?', (keep_version,)).rowcount
+            self.conn.commit()
+            self.conn.execute('VACUUM')
+        return removed
+
+    def stats(self) -> list[tuple[str, int, int, int]]:
+        """(version, PDFs, text bytes, stored bytes) per extractor version."""
+        with self.lock:
+            return self.conn.execute('''
+                SELECT version, COUNT(*), SUM(size), SUM(LENGTH(text)) FROM pdf_texts
+                GROUP BY version ORDER BY MAX(cached_at) DESC
+            ''').fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def compress(text: str) -> bytes:
+    return zlib.compress(text.encode('utf-8'), 6)
+
+
+# Each process opens its own connection on first use (never one inherited across fork)
+_cache_path: Optional[str] = CACHE_FILE
+_cache: Optional[TextCache] = None
+_cache_pid = 0
+
+
+def use_cache(path: Optional[str]):
+    """Cache extracted text in `path` from now on; None turns the cache off."""
+    global _cache_path, _cache
+    _cache_path = path
+    _cache = None
+
+
+def get_cache() -> Optional[TextCache]:
+    global _cache, _cache_pid
+    if _cache_path is None:
+        return None
+    if _cache is None or _cache_pid != os.getpid():
+        _cache = TextCache(_cache_path)
+        _cache_pid = os.getpid()
+    return _cache
+
+
+# --- Prewarming ---------------------------------------------------------------
+
+_store = None
+
+
+def _extract_chunk(items: list[tuple[str, str]], extractor: str,
+                   version: str) -> list[tuple[str, Optional[bytes], int]]:
+    """Extract ('file', path) or ('blob', sha256) items not cached yet (runs in a worker).
+
+    Returns (sha256, compressed text, text length) per extracted PDF, with
+    None for PDFs the extractor could not read; already cached PDFs are left out.
+    """
+    global _store
+    from pdf_parser import extract_layout
+
+    cache = get_cache()
+    results = []
+    for kind, key in items:
+        if kind == 'blob':
+            if cache.has(key, version):
+                continue
+            if _store is None:
+                from pdf_store import PdfStore
+                _store = PdfStore(readonly=True)
+            pdf_bytes = _store.get(key)
+            sha256 = key
+        else:
+            try:
+                pdf_bytes = Path(key).read_bytes()
+            except OSError:
+                pdf_bytes = None
+            sha256 = hashlib.sha256(pdf_bytes).hexdigest() if pdf_bytes is not None else key
+            if pdf_bytes is not None and cache.has(sha256, version):
+                continue
+        text = extract_layout(pdf_bytes, extractor) if pdf_bytes is not None else ""
+        results.append((sha256, compress(text) if text else None, len(text)))
+    return results
+
+
+def prewarm_items(source: str, db_path: str = DB_FILE, directory: Path = INSPECTIONS_DIR) -> list[tuple[str, str]]:
+    """What prewarm() extracts: the pack store's PDFs, the tree's files, or both."""
+    items = []
+    if source in ('pack', 'both'):
+        try:
+            conn = sqlite3.connect(db_path)
+            items += [('blob', row[0]) for row in conn.execute('SELECT sha256 FROM pdf_blobs ORDER BY pack, offset')]
+            conn.close()
+        except sqlite3.OperationalError:
+            pass
+    if source in ('tree', 'both'):
+        items += [('file', str(pdf)) for pdf in sorted(Path(directory).glob("**/inspection_*.pdf"))]
+    return items
+
+
+def prewarm(items: list[tuple[str, str]], workers: Optional[int] = None, on_progress=None,
+            extractor: Optional[str] = None) -> dict[str, int]:
+    """Extract the text of every uncached PDF in `items` with `workers` processes and cache it.
+
+    Uses pdf_parser's selected extractor unless `extractor` names one.
+    Returns counts of PDFs 'extracted', 'failed' (the extractor produced no
+    text) and 'cached' (already there).
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from pdf_parser import current_extractor, extractor_version
+
+    extractor = extractor or current_extractor()
+    version = extractor_version(extractor)
+    if version is None:
+        raise RuntimeError(f"{extractor} extractor is not available")
+    cache = get_cache()
+    counts = {'extracted': 0, 'failed': 0, 'cached': 0}
+    chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                             initializer=use_cache, initargs=(cache.path,)) as executor:
+        futures = {executor.submit(_extract_chunk, chunk, extractor, version): len(chunk) for chunk in chunks}
+        for future in as_completed(futures):
+            results = future.result()
+            cache.put_many([(sha256, version, text, size) for sha256, text, size in results if text is not None])
+            failed = sum(1 for _, text, _ in results if text is None)
+            counts['extracted'] += len(results) - failed
+            counts['failed'] += failed
+            counts['cached'] += futures[future] - len(results)
+            if on_progress:
+                on_progress(futures[future])
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+    from rich.console import Console
+    from rich.progress import Progress, BarColumn, MofNCompleteColumn, TextColumn, TimeElapsedColumn
+    from rich.table import Table
+
+    from pdf_parser import EXTRACTORS, DEFAULT_EXTRACTOR, extractor_version
+
+    console = Console()
+
+    parser = argparse.ArgumentParser(description='Manage the cache of text extracted from PDFs')
+    parser.add_argument('command', choices=['stats', 'prewarm', 'prune'],
+                        help='stats: show cache size; prewarm: extract every stored PDF not cached yet; '
+                             'prune: drop text from other extractor versions')
+    parser.add_argument('--source', choices=['pack', 'tree', 'both'], default='both',
+                        help='Prewarm: PDFs from the pack store, the kennel_inspections/ tree or both (default: both)')
+    parser.add_argument('--workers', type=int, default=None, help='Prewarm: worker processes (default: CPU count)')
+    parser.add_argument('--extractor', choices=sorted(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help=f'Prewarm/prune: text extractor to cache for (default: {DEFAULT_EXTRACTOR})')
+    parser.add_argument('--cache', default=CACHE_FILE, help=f'Cache file (default: {CACHE_FILE})')
+    parser.add_argument('--db', default=DB_FILE, help=f'Database with the PDF store index (default: {DB_FILE})')
+
+    args = parser.parse_args()
+    use_cache(args.cache)
+    cache = get_cache()
+    version = extractor_version(args.extractor)
+
+    if args.command == 'prewarm':
+        if version is None:
+            console.print(f"[red]{args.extractor} extractor is not available[/red]")
+            sys.exit(1)
+        items = prewarm_items(args.source, args.db)
+        started = time.monotonic()
+        with Progress(TextColumn("[progress.description]{task.description}"), BarColumn(), MofNCompleteColumn(),
+                      TimeElapsedColumn(), console=console) as progress:
+            task = progress.add_task("Extracting text", total=len(items))
+            counts = prewarm(items, args.workers, lambda n: progress.advance(task, n), args.extractor)
+        elapsed = time.monotonic() - started
+        console.print(f"[green]✓[/green] {counts['extracted']:,} PDFs extracted in {elapsed:.1f}s, "
+                      f"{counts['cached']:,} already cached"
+                      + (f", [red]{counts['failed']:,} unreadable[/red]" if counts['failed'] else ""))
+    elif args.command == 'prune':
+        if version is None:
+            console.print(f"[red]{args.extractor} extractor is not available; not pruning[/red]")
+            sys.exit(1)
+        console.print(f"[green]✓[/green] Removed {cache.prune(version):,} texts from other extractor versions")
+
+    table = Table(title="PDF Text Cache", show_header=True, header_style="bold magenta")
+    table.add_column("Extractor", style="cyan")
+    table.add_column("PDFs", justify="right", style="green")
+    table.add_column("Text", justify="right")
+    table.add_column("Stored", justify="right")
+    for row_version, pdfs, size, stored in cache.stats():
+        label = row_version + (" (selected)" if row_version == version else "")
+        table.add_row(label, f"{pdfs:,}", f"{size / 1_000_000:,.1f} MB", f"{stored / 1_000_000:,.1f} MB")
+    console.print(table)
+    cache.close()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTTP transports for the PA Kennel Inspection scraper
+requests adapters that create_session() mounts underneath every session:
+record real responses into a gzip-compressed JSON-lines cassette, replay a
+cassette without touching the network, or forward requests meant for the
+live site to a local stand-in server.
+"""
+
+import io
+import gzip
+import json
+import base64
+import hashlib
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers that describe the wire encoding rather than the stored body
+SKIP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+
+# Partial and not-modified responses depend on request headers the key ignores
+UNRECORDED_STATUSES = (206, 304)
+
+
+def request_key(method: str, url: str, body=None) -> str:
+    """Cassette key for a request: method, path and query, plus a hash of the body.
+
+    The host is left out so a cassette recorded against the live site can be
+    served by the stand-in server on any address.
+    """
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    digest = hashlib.sha1(body).hexdigest() if body else ""
+    return f"{method.upper()} {path} {digest}".rstrip()
+
+
+class Cassette:
+    """Recorded responses, appended to a gzip JSON-lines file as they arrive."""
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = Lock()
+        self.entries: dict[str, dict] = {}
+        self._file = None
+        if self.path.exists():
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry['key']] = entry
+            except (EOFError, json.JSONDecodeError):
+                # A recording that was killed mid-write: keep what is complete
+                pass
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.entries.get(key)
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response):
+        """Store a response; later recordings of the same request win."""
+        entry = {
+            'key': request_key(request.method, request.url, request.body),
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS},
+            'body': base64.b64encode(response.content).decode('ascii'),
+        }
+        with self.lock:
+            self.entries[entry['key']] = entry
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = gzip.open(self.path, 'at', encoding='utf-8')
+            self._file.write(json.dumps(entry) + '\n')
+            # Sync flush so everything up to here survives a crash
+            self._file.flush()
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def entry_body(entry: dict) -> bytes:
+    return base64.b64decode(entry['body'])
+
+
+def build_response(request: requests.PreparedRequest, entry: dict) -> requests.Response:
+    """Turn a cassette entry back into a requests.Response for `request`."""
+    content = entry_body(entry)
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.reason = entry.get('reason', '')
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.headers['Content-Length'] = str(len(content))
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response.raw = io.BytesIO(content)
+    response._content = content
+    response._content_consumed = True
+    return response
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests for real and records every full response into a cassette."""
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code not in UNRECORDED_STATUSES:
+            # Reads the whole body; iter_content() then serves it from memory
+            self.cassette.record(request, response)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from a cassette; anything unrecorded is a connection error."""
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.cassette.get(request_key(request.method, request.url, request.body))
+        if entry is None:
+            raise requests.ConnectionError(f"No recorded response for {request.method} {request.url}", request=request)
+        return build_response(request, entry)
+
+    def close(self):
+        pass
+
+
+class ForwardingAdapter(HTTPAdapter):
+    """Sends every request to `target` instead of its own host, keeping path and query."""
+    def __init__(self, target: str, **kwargs):
+        super().__init__(**kwargs)
+        self.target = target.rstrip('/')
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = self.target + parts.path + (f"?{parts.query}" if parts.query else "")
+        return super().send(request, **kwargs)
+
+
+def recording(path) -> tuple[Callable[[], BaseAdapter], Cassette]:
+    """Adapter factory that records into the cassette at `path` (appending)."""
+    cassette = Cassette(path)
+    return (lambda: RecordingAdapter(cassette)), cassette
+
+
+def replaying(path) -> tuple[Callable[[], BaseAdapter], Cassette]:
+    """Adapter factory that serves responses from the cassette at `path`."""
+    cassette = Cassette(path)
+    return (lambda: ReplayAdapter(cassette)), cassette
+
+
+def forwarding(target: str) -> Callable[[], BaseAdapter]:
+    """Adapter factory that redirects all traffic to `target`, e.g. the stand-in server."""
+    return lambda: ForwardingAdapter(target)